@@ -0,0 +1,13 @@
+"""
+Benchmarks for pycffdrs.
+
+Every public calculator, and the end-to-end FWI and FBP chains, are timed at production
+scales on a synthetic workload, with their peak memory. Run with:
+
+    python -m benchmarks                  # all benchmarks, all sizes; compare to the baseline
+    python -m benchmarks --sizes 100 10000 --only fbp ROScalc
+    python -m benchmarks --save benchmarks/baseline.json
+
+The baseline is only meaningful on the machine it was recorded on: record a new one before
+making changes, then compare against it.
+"""
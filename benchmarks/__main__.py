@@ -0,0 +1,5 @@
+""" Run the benchmarks: python -m benchmarks --help """
+import sys
+from benchmarks.suite import main
+
+sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+Benchmark runner: times each benchmark, measures its peak memory, and compares the results
+against a stored baseline.
+"""
+import argparse
+import json
+import platform
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Tuple
+from numpy import ndarray
+import numpy as np
+from benchmarks.workload import workload
+from pycffdrs.BEcalc import BEcalc
+from pycffdrs.BROScalc import BROScalc
+from pycffdrs.C6calc import C6calc
+from pycffdrs.CFBcalc import CFBcalc
+from pycffdrs.DISTtcalc import DISTtcalc
+from pycffdrs.FIcalc import FIcalc
+from pycffdrs.FMCcalc import FMCcalc
+from pycffdrs.FROScalc import FROScalc
+from pycffdrs.ISIcalc import ISIcalc
+from pycffdrs.ROScalc import ROScalc
+from pycffdrs.TFCcalc import TFCcalc
+from pycffdrs.buiCalc import buiCalc
+from pycffdrs.dcCalc import dcCalc
+from pycffdrs.dmcCalc import dmcCalc
+from pycffdrs.fbp import fbp
+from pycffdrs.ffmcCalc import ffmcCalc
+from pycffdrs.fwiCalc import fwiCalc
+
+SIZES = (100, 10_000, 1_000_000, 10_000_000)
+
+BASELINE = Path(__file__).parent / 'baseline.json'
+
+# Timing: calls are repeated until a measurement takes at least MIN_TIME seconds, and the
+# best of REPEAT measurements is kept.
+MIN_TIME = 0.2
+REPEAT = 3
+
+# A benchmark regresses if it takes TIME_TOLERANCE times as long as the baseline, or needs
+# MEMORY_TOLERANCE times as much memory (plus MEMORY_SLACK bytes, for small sizes).
+TIME_TOLERANCE = 1.5
+MEMORY_TOLERANCE = 1.1
+MEMORY_SLACK = 64 * 1024
+
+
+def fwi(ffmc_yda: ndarray,  # pylint: disable=too-many-arguments
+        dmc_yda: ndarray,
+        dc_yda: ndarray,
+        temp: ndarray,
+        rh: ndarray,
+        ws: ndarray,
+        prec: ndarray,
+        lat: ndarray,
+        mon: ndarray) -> Dict[str, ndarray]:
+    """ End-to-end FWI System chain: one day, from yesterday's codes and today's weather. """
+    ffmc = ffmcCalc(ffmc_yda, temp, rh, ws, prec)
+    dmc = dmcCalc(dmc_yda, temp, rh, prec, lat, mon)
+    dc = dcCalc(dc_yda, temp, rh, prec, lat, mon)
+    isi = ISIcalc(ffmc, ws)
+    bui = buiCalc(dmc, dc)
+    return {'FFMC': ffmc, 'DMC': dmc, 'DC': dc, 'ISI': isi, 'BUI': bui,
+            'FWI': fwiCalc(isi, bui)}
+
+
+# Benchmarked function, and the workload inputs it is called with (in argument order)
+BENCHMARKS: Dict[str, Tuple[Callable, Tuple[str, ...]]] = {
+    'ffmcCalc': (ffmcCalc, ('ffmc_yda', 'temp', 'rh', 'ws', 'prec')),
+    'dmcCalc': (dmcCalc, ('dmc_yda', 'temp', 'rh', 'prec', 'lat', 'mon')),
+    'dcCalc': (dcCalc, ('dc_yda', 'temp', 'rh', 'prec', 'lat', 'mon')),
+    'ISIcalc': (ISIcalc, ('FFMC', 'ws')),
+    'buiCalc': (buiCalc, ('dmc_yda', 'dc_yda')),
+    'fwiCalc': (fwiCalc, ('ISI', 'BUI')),
+    'FMCcalc': (FMCcalc, ('LAT', 'LONG', 'ELV', 'DJ', 'D0')),
+    'BEcalc': (BEcalc, ('FUELTYPE', 'BUI')),
+    'ROScalc': (ROScalc, ('FUELTYPE', 'ISI', 'BUI', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH')),
+    'CFBcalc': (CFBcalc, ('FUELTYPE', 'FMC', 'SFC', 'ROS', 'CBH')),
+    'C6calc': (C6calc, ('FUELTYPE', 'ISI', 'BUI', 'FMC', 'SFC', 'CBH')),
+    'BROScalc': (BROScalc, ('FUELTYPE', 'FFMC', 'BUI', 'WSV', 'FMC', 'SFC', 'PC', 'PDF', 'CC',
+                            'CBH')),
+    'FROScalc': (FROScalc, ('ROS', 'BROS', 'LB')),
+    'DISTtcalc': (DISTtcalc, ('FUELTYPE', 'ROS', 'HR', 'CFB')),
+    'TFCcalc': (TFCcalc, ('FUELTYPE', 'CFL', 'CFB', 'SFC', 'PC', 'PDF')),
+    'FIcalc': (FIcalc, ('FC', 'ROS')),
+    'fwi': (fwi, ('ffmc_yda', 'dmc_yda', 'dc_yda', 'temp', 'rh', 'ws', 'prec', 'lat', 'mon')),
+    'fbp': (fbp, ('FUELTYPE', 'FFMC', 'BUI', 'WSV', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH',
+                  'LB', 'HR')),
+}
+
+Results = Dict[str, Dict[str, Dict[str, float]]]
+
+
+def _seconds(call: Callable[[], object]) -> float:
+    """ Best time of a call, in seconds. """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_TIME:
+            break
+        number *= 10
+    for _ in range(REPEAT - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed / number
+
+
+def _peak_bytes(call: Callable[[], object]) -> int:
+    """ Peak memory allocated by a call (NumPy reports its array allocations to tracemalloc),
+    including its result. """
+    tracemalloc.start()
+    try:
+        call()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(name: str, size: int, timed: bool = True) -> Dict[str, float]:
+    """
+    Run one benchmark at one size.
+
+    Keyword arguments:
+    name -- Name of the benchmark (a key of BENCHMARKS)
+    size -- Number of elements
+    timed -- Measure time, as well as peak memory
+
+    Returns:
+    Dictionary of seconds (per call; None unless timed) and peak_bytes.
+    """
+    function, names = BENCHMARKS[name]
+    inputs = workload(names, size)
+    args = tuple(inputs[input_name] for input_name in names)
+
+    def call():
+        return function(*args)
+    peak_bytes = _peak_bytes(call)
+    return {'seconds': _seconds(call) if timed else None, 'peak_bytes': peak_bytes}
+
+
+def run(names: Iterable[str] = tuple(BENCHMARKS),
+        sizes: Iterable[int] = SIZES,
+        timed: bool = True,
+        report: Callable[[str, int, Dict[str, float]], None] = None) -> Results:
+    """
+    Run benchmarks at each size.
+
+    Returns:
+    Results by benchmark name and (string) size, as measure returns them.
+    """
+    results: Results = {}
+    for name in names:
+        for size in sizes:
+            result = results.setdefault(name, {})[str(size)] = measure(name, size, timed)
+            if report is not None:
+                report(name, size, result)
+    return results
+
+
+def compare(results: Results,
+            baseline: Results,
+            time_tolerance: float = TIME_TOLERANCE,
+            memory_tolerance: float = MEMORY_TOLERANCE) -> List[str]:
+    """
+    Compare results against a baseline. Benchmarks and sizes missing from either are skipped.
+
+    Returns:
+    A description of each regression.
+    """
+    regressions = []
+    for name, sizes in results.items():
+        for size, result in sizes.items():
+            base = baseline.get(name, {}).get(size)
+            if base is None:
+                continue
+            if (result['seconds'] is not None and base['seconds'] is not None
+                    and result['seconds'] > base['seconds'] * time_tolerance):
+                regressions.append(f'{name} at {size}: {result["seconds"]:.3g}s, '
+                                   f'baseline {base["seconds"]:.3g}s')
+            if result['peak_bytes'] > base['peak_bytes'] * memory_tolerance + MEMORY_SLACK:
+                regressions.append(f'{name} at {size}: {result["peak_bytes"]} bytes, '
+                                   f'baseline {base["peak_bytes"]} bytes')
+    return regressions
+
+
+def _environment() -> Dict[str, str]:
+    return {'python': platform.python_version(), 'numpy': np.__version__,
+            'machine': platform.machine(), 'processor': platform.processor()}
+
+
+def main(argv: List[str] = None) -> int:
+    """ Command line entry point. Returns 1 if there are regressions, else 0. """
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    parser.add_argument('--only', nargs='+', choices=tuple(BENCHMARKS), default=BENCHMARKS,
+                        help='benchmarks to run (default: all)')
+    parser.add_argument('--sizes', nargs='+', type=lambda value: int(float(value)),
+                        default=SIZES, help='numbers of elements (default: %(default)s)')
+    parser.add_argument('--baseline', type=Path, default=BASELINE,
+                        help='baseline to compare against (default: %(default)s)')
+    parser.add_argument('--save', type=Path, help='save the results, e.g. as a new baseline')
+    parser.add_argument('--tolerance', type=float, default=TIME_TOLERANCE,
+                        help='time regression tolerance (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    def report(name: str, size: int, result: Dict[str, float]):
+        print(f'{name:>10} {size:>10} {result["seconds"] * 1e3:12.4f} ms '
+              f'{result["peak_bytes"] / 2**20:10.2f} MB', flush=True)
+    results = run(args.only, args.sizes, report=report)
+
+    if args.save:
+        args.save.write_text(json.dumps({'environment': _environment(), 'results': results},
+                                        indent=4) + '\n')
+    if not args.baseline.exists():
+        return 0
+    baseline = json.loads(args.baseline.read_text())['results']
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
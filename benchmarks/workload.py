@@ -0,0 +1,95 @@
+"""
+Synthetic benchmark workload.
+
+The value ranges are those of the generators in test_fixtures/src/generate_fixtures.py, which
+the fixtures are generated from, so that the benchmarks exercise the same branches as the
+tests. These are vectorised, so that they can generate 1e7 elements, and are made a little
+more realistic: fuel types follow a typical landscape mix rather than being uniform, and it
+rains on only some days.
+"""
+from typing import Callable, Dict, Iterable
+from numpy import ndarray
+import numpy as np
+from pycffdrs.fueltypes import FuelType
+
+# Share of each fuel type in the landscape: mostly conifer and mixedwood, some deciduous,
+# slash and grass.
+FUEL_MIX = {
+    FuelType.C1: 0.02, FuelType.C2: 0.20, FuelType.C3: 0.15, FuelType.C4: 0.03,
+    FuelType.C5: 0.04, FuelType.C6: 0.03, FuelType.C7: 0.05, FuelType.D1: 0.10,
+    FuelType.M1: 0.08, FuelType.M2: 0.08, FuelType.M3: 0.02, FuelType.M4: 0.02,
+    FuelType.S1: 0.02, FuelType.S2: 0.02, FuelType.S3: 0.01, FuelType.O1A: 0.07,
+    FuelType.O1B: 0.06,
+}
+
+# Share of days with rain
+RAIN_DAYS = 0.3
+
+
+def _uniform(low: float, high: float) -> Callable[[np.random.Generator, int], ndarray]:
+    return lambda rng, size: rng.uniform(low, high, size)
+
+
+def _fuel(rng: np.random.Generator, size: int) -> ndarray:
+    codes = np.array(list(FUEL_MIX), dtype=np.uint8)
+    return rng.choice(codes, size, p=np.array(list(FUEL_MIX.values())))
+
+
+def _prec(rng: np.random.Generator, size: int) -> ndarray:
+    return np.where(rng.random(size) < RAIN_DAYS, rng.uniform(0, 100, size), 0)
+
+
+# Generator of each input, by the argument name the calculators use
+GENERATORS: Dict[str, Callable[[np.random.Generator, int], ndarray]] = {
+    'FUELTYPE': _fuel,
+    'FFMC': _uniform(0, 100),
+    'BUI': _uniform(0, 110),
+    'FMC': _uniform(0, 100),
+    'SFC': _uniform(0, 100),
+    'PC': _uniform(0, 100),
+    'PDF': _uniform(0, 100),
+    'CBH': _uniform(2, 7),
+    'CC': _uniform(0, 100),
+    'ISI': _uniform(0, 100),
+    'ROS': _uniform(0, 10000),
+    'BROS': _uniform(0, 10000),
+    'CFB': _uniform(0, 100),
+    'CFL': _uniform(0, 2),
+    'RSC': _uniform(0, 100),
+    'HR': _uniform(0, 100),
+    'WSV': _uniform(0, 100),
+    'FC': _uniform(0, 100),
+    'LAT': _uniform(-90, 90),
+    'LONG': _uniform(-180, 180),
+    'ELV': _uniform(0, 10000),
+    'DJ': _uniform(1, 365),
+    'D0': lambda rng, size: np.zeros(size),
+    'LB': _uniform(0, 100),
+    'ffmc_yda': _uniform(0, 100),
+    'dmc_yda': _uniform(0, 200),
+    'dc_yda': _uniform(0, 800),
+    'temp': _uniform(-50, 50),
+    'rh': _uniform(0, 100),
+    'ws': _uniform(0, 100),
+    'prec': _prec,
+    'lat': _uniform(-90, 90),
+    'mon': lambda rng, size: rng.integers(1, 13, size),
+}
+
+
+def workload(names: Iterable[str], size: int, seed: int = 42) -> Dict[str, ndarray]:
+    """
+    Generate inputs.
+
+    Keyword arguments:
+    names -- Names of the inputs to generate (keys of GENERATORS)
+    size -- Number of elements
+    seed -- Random seed. Each input is generated from its own stream, so that an input has
+            the same values whichever other inputs are generated with it.
+
+    Returns:
+    Dictionary of input arrays, by name.
+    """
+    names = set(names)
+    return {name: GENERATORS[name](np.random.default_rng([seed, index]), size)
+            for index, name in enumerate(GENERATORS) if name in names}
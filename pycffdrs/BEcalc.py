@@ -8,35 +8,84 @@ Fire Danger Group (FCFDG) (1992). Development and Structure of the
 Canadian Forest Fire Behavior Prediction System." Technical Report
 ST-X-3, Forestry Canada, Ottawa, Ontario."
 """
-from numpy import exp, log, ndarray, array
+from numpy import ndarray
 import numpy as np
+from pycffdrs.fueltypes import FUEL_PARAMETERS, fuel_codes
+from pycffdrs.instrument import instrumented
+from pycffdrs.partition import FuelPartition, check_order, selected
+from pycffdrs.workspace import Workspace, as_arrays, float_dtype, output, workspace_or_new
 
 
-def BEcalc(FUELTYPE: ndarray, BUI: ndarray) -> ndarray:
+def _BEfuel(fuel: int, BUI: ndarray, out: ndarray, workspace: Workspace) -> ndarray:
+    """ BEcalc of one fuel type, with its parameters as scalars. """
+    BUIo, Q50log = (out.dtype.type(FUEL_PARAMETERS[name][fuel]) for name in ('BUIo', 'Q50log'))
+    if BUIo <= 0:
+        out.fill(1)
+        return out
+    # Eq. 54 (FCFDG 1992) The Buildup Effect
+    # BE = np.where(BUI > 0, exp(50 * log(Q) * (1 / BUI - 1 / BUIo)), 1)
+    # Only evaluated where BUI > 0
+    mask, = workspace.scratch('_BEfuel', 1, out.shape, bool)
+    np.greater(BUI, 0, out=mask)
+    np.divide(1, BUI, out=out, where=mask)
+    np.subtract(out, 1 / BUIo, out=out, where=mask)
+    np.multiply(Q50log, out, out=out, where=mask)
+    np.exp(out, out=out, where=mask)
+    np.logical_not(mask, out=mask)
+    np.copyto(out, 1, where=mask)
+    return out
+
+
+@instrumented
+def BEcalc(FUELTYPE: ndarray,
+           BUI: ndarray,
+           out: ndarray = None,
+           workspace: Workspace = None,
+           dtype=None,
+           partition: FuelPartition = None) -> ndarray:
     """
     Computes the Buildup Effect on Fire Spread Rate.
 
     Keyword arguments:
-    FUELTYPE -- The Fire Behaviour Prediction FuelType
+    FUELTYPE -- The Fire Behaviour Prediction FuelType (strings or FuelType codes)
     BUI -- The Buildup Index value
+    out -- Optional array to write the result to (may be BUI)
+    workspace -- Optional Workspace to reuse scratch arrays from
+    dtype -- np.float64 or np.float32 (default: see pycffdrs.workspace)
+    partition -- Optional FuelPartition that FUELTYPE and BUI are ordered by, to calculate
+                 one fuel type at a time (see pycffdrs.partition). Inputs not in its order
+                 raise ValueError.
     """
-    # Fuel Type String represenations
-    d = ("C1", "C2", "C3", "C4", "C5", "C6", "C7", "D1", "M1", "M2", "M3",
-         "M4", "S1", "S2", "S3", "O1A", "O1B")
-    # The average BUI for the fuel type - as referenced by the "d" list above
-    BUIo = (72, 64, 62, 66, 56, 62, 106, 32, 50, 50, 50, 50, 38, 63, 31, 1, 1)
-    # Proportion of maximum possible spread rate that is reached at a standard BUI
-    Q = (0.9, 0.7, 0.75, 0.8, 0.8, 0.8, 0.85, 0.9, 0.8, 0.8, 0.8, 0.8, 0.75,
-         0.75, 0.75, 1.0, 1.0)
-
-    BUIo = dict(zip(d, BUIo))
-    Q = dict(zip(d, Q))
-
-    BUIo = array([BUIo[key] for key in FUELTYPE])
-    Q = array([Q[key] for key in FUELTYPE])
+    check_order(partition, FUELTYPE, BUI)
+    FUELTYPE = fuel_codes(FUELTYPE)
+    dtype = float_dtype(dtype)
+    BUI, = as_arrays(BUI, dtype=dtype)
+    shape = np.broadcast(FUELTYPE, BUI).shape
+    workspace = workspace_or_new(workspace)
+    if partition is not None:
+        BE = output(out, shape, dtype)
+        for fuel in partition.fuels():
+            group = partition.group(fuel)
+            _BEfuel(fuel, selected(BUI, group), BE[group], workspace)
+        return BE
+    BUIo, t = workspace.scratch('BEcalc', 2, shape, dtype)
+    mask, buio_positive = workspace.scratch('BEcalc', 2, shape, bool)
+    np.take(FUEL_PARAMETERS['BUIo'], np.broadcast_to(FUELTYPE, shape), out=BUIo)
 
     # Eq. 54 (FCFDG 1992) The Buildup Effect
-    BE = np.where((BUI > 0) & (BUIo > 0), exp(50 * log(Q) *
-                                              (1 / BUI - 1 / BUIo)), 1)
+    # BE = np.where((BUI > 0) & (BUIo > 0), exp(50 * log(Q) * (1 / BUI - 1 / BUIo)), 1)
+    np.greater(BUI, 0, out=mask)
+    np.logical_and(mask, np.greater(BUIo, 0, out=buio_positive), out=mask)
+    # Only evaluated where both are positive
+    np.divide(1, BUI, out=t, where=mask)
+    np.divide(1, BUIo, out=BUIo, where=mask)
+    np.subtract(t, BUIo, out=t, where=mask)
+    Q50log = BUIo
+    np.take(FUEL_PARAMETERS['Q50log'], np.broadcast_to(FUELTYPE, shape), out=Q50log)
+    np.multiply(Q50log, t, out=t, where=mask)
+    BE = output(out, shape, dtype)
+    np.exp(t, out=BE, where=mask)
+    np.logical_not(mask, out=mask)
+    np.copyto(BE, 1, where=mask)
 
     return BE
@@ -1,11 +1,33 @@
 """
 All code is based on the R project: https://cran.r-project.org/package=cffdrs
 """
-from numpy import ndarray, exp
+from numpy import ndarray
+import numpy as np
+from pycffdrs.ISIcalc import fFcalc
 from pycffdrs.ROScalc import ROScalc
+from pycffdrs.instrument import instrumented
+from pycffdrs.partition import FuelPartition, check_order
+from pycffdrs.workspace import Workspace, as_arrays, output, workspace_or_new
 
 
-def BROScalc(  # pylint: disable=too-many-arguments
+def _BISIcalc(fF: ndarray, WSV: ndarray, out: ndarray = None) -> ndarray:
+    """ ISI associated with the back fire spread rate, given the FFMC function fF. """
+    # Eq. 75 (FCFDG 1992)
+    # Calculate the Back fire wind function
+    # BfW = exp(-0.05039 * WSV)
+    BISI = output(out, np.broadcast(fF, WSV).shape)
+    np.multiply(-0.05039, WSV, out=BISI)
+    np.exp(BISI, out=BISI)
+    # Calculate the ISI associated with the back fire spread rate
+    # Eq. 76 (FCFDG 1992)
+    # BISI = 0.208 * BfW * fF
+    np.multiply(0.208, BISI, out=BISI)
+    np.multiply(BISI, fF, out=BISI)
+    return BISI
+
+
+@instrumented
+def BROScalc(  # pylint: disable=too-many-arguments, too-many-locals
         FUELTYPE: ndarray,
         FFMC: ndarray,
         BUI: ndarray,
@@ -15,7 +37,11 @@ def BROScalc(  # pylint: disable=too-many-arguments
         PC: ndarray,
         PDF: ndarray,
         CC: ndarray,
-        CBH: ndarray):
+        CBH: ndarray,
+        out: ndarray = None,
+        workspace: Workspace = None,
+        approx: bool = False,
+        partition: FuelPartition = None):
     """
       Description:
        Calculate the Back Fire Spread Rate.
@@ -26,7 +52,7 @@ def BROScalc(  # pylint: disable=too-many-arguments
        ST-X-3, Forestry Canada, Ottawa, Ontario.
 
      Args:
-       FUELTYPE: The Fire Behaviour Prediction FuelType
+       FUELTYPE: The Fire Behaviour Prediction FuelType (strings or FuelType codes)
        FFMC:     Fine Fuel Moisture Code
        BUI:      Buildup Index
        WSV:      Wind Speed Vector
@@ -36,22 +62,28 @@ def BROScalc(  # pylint: disable=too-many-arguments
        PDF:      Percent Dead Balsam Fir
        CC:       Degree of Curing (just "C" in FCFDG 1992)
        CBH:      Crown Base Height
+       out:      Optional array to write the result to
+       workspace: Optional Workspace to reuse scratch arrays from
+       approx:   Approximate the FFMC function and the Initial Rate of Spread (see fFcalc
+                 and RSIcalc)
+       partition: Optional FuelPartition that all inputs are ordered by, to calculate by
+                 fuel type (see pycffdrs.partition). Inputs not in its order raise
+                 ValueError.
 
      Returns:
        BROS:     Back Fire Spread Rate
     """
-    # Eq. 46 (FCFDG 1992)
+    check_order(partition, FUELTYPE, FFMC, BUI, WSV, FMC, SFC, PC, PDF, CC, CBH)
+    FFMC, WSV = as_arrays(FFMC, WSV)
+    workspace = workspace_or_new(workspace)
+    fF, BISI = workspace.scratch('BROScalc', 2, np.broadcast(FFMC, WSV).shape)
+    # Eqs. 45 & 46 (FCFDG 1992)
     # Calculate the FFMC function from the ISI equation
-    m = 147.2 * (101 - FFMC) / (59.5 + FFMC)
-    # Eq. 45 (FCFDG 1992)
-    fF = 91.9 * exp(-0.1386 * m) * (1.0 + (m**5.31) / 4.93e7)
-    # Eq. 75 (FCFDG 1992)
-    # Calculate the Back fire wind function
-    BfW = exp(-0.05039 * WSV)
-    # Calculate the ISI associated with the back fire spread rate
-    # Eq. 76 (FCFDG 1992)
-    BISI = 0.208 * BfW * fF
+    fF = fFcalc(np.broadcast_to(FFMC, fF.shape), fF, workspace, approx=approx)
+    # Eqs. 75 & 76 (FCFDG 1992)
+    BISI = _BISIcalc(fF, WSV, BISI)
     # Eq. 77 (FCFDG 1992)
     # Calculate final Back fire spread rate
-    BROS = ROScalc(FUELTYPE, BISI, BUI, FMC, SFC, PC, PDF, CC, CBH)
+    BROS = ROScalc(FUELTYPE, BISI, BUI, FMC, SFC, PC, PDF, CC, CBH, out, workspace,
+                   approx=approx, partition=partition)
     return BROS
@@ -2,12 +2,96 @@
 All code and comments based on the R project: https://cran.r-project.org/package=cffdrs
 """
 import numpy as np
-from numpy import ndarray, exp
+from numpy import ndarray
 from pycffdrs.BEcalc import BEcalc
-from pycffdrs.CFBcalc import CFBcalc
+from pycffdrs.CFBcalc import CFBcalc, _CFBcalc
+from pycffdrs.instrument import instrumented
+from pycffdrs.partition import FuelPartition, check_order
+from pycffdrs.workspace import Workspace, as_arrays, float_dtype, output, workspace_or_new
 
 
-def C6calc(  # pylint: disable=too-many-arguments
+def _RSIcalc(ISI: ndarray, out: ndarray = None) -> ndarray:
+    """ Eq. 62 (FCFDG 1992) Intermediate surface fire spread rate """
+    # RSI = 30 * (1 - exp(-0.08 * ISI))**3.0
+    RSI = output(out, np.shape(ISI), np.result_type(ISI))
+    np.multiply(-0.08, ISI, out=RSI)
+    np.exp(RSI, out=RSI)
+    np.subtract(1, RSI, out=RSI)
+    np.power(RSI, 3.0, out=RSI)
+    np.multiply(30, RSI, out=RSI)
+    return RSI
+
+
+def _RSCcalc(ISI: ndarray,
+             FMC: ndarray,
+             out: ndarray = None,
+             workspace: Workspace = None) -> ndarray:
+    """ Eq. 64 (FCFDG 1992) Crown fire spread rate (m/min) """
+    # Average foliar moisture effect
+    FMEavg = 0.778
+    # Eq. 59 (FCFDG 1992) Crown flame temperature (degrees K)
+    # tt = 1500 - 2.75 * FMC
+    # Eq. 60 (FCFDG 1992) Head of ignition (kJ/kg)
+    # H = 460 + 25.9 * FMC
+    # Eq. 61 (FCFDG 1992) Average foliar moisture effect
+    # FME = ((1.5 - 0.00275 * FMC)**4.0)/(460 + 25.9 * FMC) * 1000
+    shape = np.broadcast(ISI, FMC).shape
+    dtype = np.result_type(ISI, FMC)
+    FME, H = workspace_or_new(workspace).scratch('_RSCcalc', 2, np.shape(FMC), dtype)
+    np.multiply(0.00275, FMC, out=FME)
+    np.subtract(1.5, FME, out=FME)
+    np.power(FME, 4.0, out=FME)
+    np.multiply(25.9, FMC, out=H)
+    np.add(460, H, out=H)
+    np.divide(FME, H, out=FME)
+    np.multiply(FME, 1000, out=FME)
+    # RSC = 60 * (1 - exp(-0.0497 * ISI)) * FME / FMEavg
+    RSC = output(out, shape, dtype)
+    np.multiply(-0.0497, ISI, out=RSC)
+    np.exp(RSC, out=RSC)
+    np.subtract(1, RSC, out=RSC)
+    np.multiply(60, RSC, out=RSC)
+    np.multiply(RSC, FME, out=RSC)
+    np.divide(RSC, FMEavg, out=RSC)
+    return RSC
+
+
+def _C6calc(ISI: ndarray,
+            BE: ndarray,
+            FMC: ndarray,
+            RSO: ndarray,
+            workspace: Workspace = None):
+    """ C6 Crown Fraction Burned and Rate of Spread, given the Buildup Effect (BE) and the
+    Surface fire rate of spread (RSO) for crowning.
+
+    Returns:
+      (CFB, ROS)
+    """
+    workspace = workspace_or_new(workspace)
+    shape = np.broadcast(ISI, BE, FMC, RSO).shape
+    RSS, RSC = workspace.scratch('_C6calc', 2, shape, np.result_type(ISI, BE, FMC, RSO))
+    surface, crowning = workspace.scratch('_C6calc', 2, shape, bool)
+    # Eq. 63 (FCFDG 1992) Surface fire spread rate (m/min)
+    np.multiply(_RSIcalc(ISI, RSS), BE, out=RSS)
+    RSC = _RSCcalc(ISI, FMC, RSC, workspace)
+    np.greater(RSC, RSS, out=crowning)
+    np.logical_not(crowning, out=surface)
+    # Crown Fraction Burned
+    # CFB = np.where(RSC > RSS, _CFBcalc(RSS, RSO), 0)
+    CFB = _CFBcalc(RSS, RSO, None, workspace)
+    np.copyto(CFB, 0, where=surface)
+    # Eq. 65 (FCFDG 1992) Calculate Rate of spread (m/min)
+    # ROS = np.where(RSC > RSS, RSS + (CFB)*(RSC-RSS), RSS)
+    # Only evaluated where crowning
+    ROS = RSS.copy()
+    np.subtract(RSC, RSS, out=RSC, where=crowning)
+    np.multiply(CFB, RSC, out=RSC, where=crowning)
+    np.add(RSS, RSC, out=ROS, where=crowning)
+    return CFB, ROS
+
+
+@instrumented
+def C6calc(  # pylint: disable=too-many-arguments, too-many-locals
         FUELTYPE: ndarray,
         ISI: ndarray,
         BUI: ndarray,
@@ -17,7 +101,11 @@ def C6calc(  # pylint: disable=too-many-arguments
         ROS: ndarray = None,
         CFB: ndarray = None,
         RSC: ndarray = None,
-        option: str = "CFB"):
+        option: str = "CFB",
+        out: ndarray = None,
+        workspace: Workspace = None,
+        dtype=None,
+        partition: FuelPartition = None):
     """
       Calculate c6 (Conifer plantation) Fire Spread. C6 is a special case, and
         thus has it's own function. To calculate C6 fire spread, this function
@@ -30,7 +118,7 @@ def C6calc(  # pylint: disable=too-many-arguments
       ST-X-3, Forestry Canada, Ottawa, Ontario.
 
     Args:
-      FUELTYPE: The Fire Behaviour Prediction FuelType
+      FUELTYPE: The Fire Behaviour Prediction FuelType (strings or FuelType codes)
       ISI:      Initial Spread Index
       BUI:      Buildup Index
       FMC:      Foliar Moisture Content
@@ -40,35 +128,56 @@ def C6calc(  # pylint: disable=too-many-arguments
       CFB:      Crown Fraction Burned
       RSC:      Crown Fire Spread Rate (m/min)
       option:   Which variable to calculate(ROS, CFB, RSC, or RSI)
+      out:      Optional array to write the result to
+      workspace: Optional Workspace to reuse scratch arrays from
+      dtype:    np.float64 or np.float32 (default: see pycffdrs.workspace)
+      partition: Optional FuelPartition that all inputs are ordered by, to calculate the
+                Buildup Effect by fuel type (see pycffdrs.partition). Inputs not in its
+                order raise ValueError.
 
     Returns:
       ROS, CFB, RSC or RSI depending on which option was selected
     """
-    # Average foliar moisture effect
-    FMEavg = 0.778
-    # Eq. 59 (FCFDG 1992) Crown flame temperature (degrees K)
-    # tt = 1500 - 2.75 * FMC
-    # Eq. 60 (FCFDG 1992) Head of ignition (kJ/kg)
-    # H = 460 + 25.9 * FMC
-    # Eq. 61 (FCFDG 1992) Average foliar moisture effect
-    FME = ((1.5 - 0.00275 * FMC)**4.0)/(460 + 25.9 * FMC) * 1000
+    check_order(partition, FUELTYPE, ISI, BUI, FMC, SFC, CBH, ROS, CFB, RSC)
+    dtype = float_dtype(dtype)
+    ISI, BUI, FMC, SFC, CBH = as_arrays(ISI, BUI, FMC, SFC, CBH, dtype=dtype)
+    workspace = workspace_or_new(workspace)
     # Eq. 62 (FCFDG 1992) Intermediate surface fire spread rate
-    RSI = 30 * (1 - exp(-0.08 * ISI))**3.0
-    # Return at this point, if specified by caller
     if option == "RSI":
-        return RSI
-    # Eq. 63 (FCFDG 1992) Surface fire spread rate (m/min)
-    RSS = RSI * BEcalc(FUELTYPE, BUI)
+        # Return at this point, if specified by caller
+        return _RSIcalc(ISI, out)
     # Eq. 64 (FCFDG 1992) Crown fire spread rate (m/min)
-    RSC = 60 * (1 - exp(-0.0497 * ISI)) * FME / FMEavg
-    # Return at this point, if specified by caller
     if option == "RSC":
-        return RSC
+        # Return at this point, if specified by caller
+        return _RSCcalc(ISI, FMC, out, workspace)
+    shape = np.broadcast(np.asarray(FUELTYPE), ISI, BUI, FMC, SFC, CBH).shape
+    RSI, = workspace.scratch('C6calc.RSI', 1, ISI.shape, dtype)
+    RSI = _RSIcalc(ISI, RSI)
+    # Eq. 63 (FCFDG 1992) Surface fire spread rate (m/min), in the shape of all the inputs
+    RSS = BEcalc(FUELTYPE, np.broadcast_to(BUI, shape), workspace=workspace, dtype=dtype,
+                 partition=partition)
+    np.multiply(RSI, RSS, out=RSS)
+    RSC, = workspace.scratch('C6calc.RSC', 1, np.broadcast(ISI, FMC).shape, dtype)
+    RSC = _RSCcalc(ISI, FMC, RSC, workspace)
+    surface, crowning = workspace.scratch('C6calc', 2, np.broadcast(RSC, RSS).shape, bool)
+    np.greater(RSC, RSS, out=crowning)
+    np.logical_not(crowning, out=surface)
     # Crown Fraction Burned
-    CFB = np.where(RSC > RSS, CFBcalc(FUELTYPE, FMC, SFC, RSS, CBH), 0)
-    # Return at this point, if specified by caller
+    # CFB = np.where(RSC > RSS, CFBcalc(FUELTYPE, FMC, SFC, RSS, CBH), 0)
     if option == "CFB":
+        # Return at this point, if specified by caller
+        CFB = CFBcalc(FUELTYPE, FMC, SFC, RSS, CBH, out=out, workspace=workspace,
+                      dtype=dtype)
+        np.copyto(CFB, 0, where=surface)
         return CFB
+    CFB = CFBcalc(FUELTYPE, FMC, SFC, RSS, CBH, workspace=workspace, dtype=dtype)
+    np.copyto(CFB, 0, where=surface)
     # Eq. 65 (FCFDG 1992) Calculate Rate of spread (m/min)
-    ROS = np.where(RSC > RSS, RSS + (CFB)*(RSC-RSS), RSS)
+    # ROS = np.where(RSC > RSS, RSS + (CFB)*(RSC-RSS), RSS)
+    # Only evaluated where crowning
+    ROS = output(out, shape, dtype)
+    np.copyto(ROS, RSS)
+    np.subtract(RSC, RSS, out=ROS, where=crowning)
+    np.multiply(CFB, ROS, out=ROS, where=crowning)
+    np.add(RSS, ROS, out=ROS, where=crowning)
     return ROS
@@ -4,12 +4,64 @@ All code is based on the R project: https://cran.r-project.org/package=cffdrs
 """
 import numpy as np
 from numpy import ndarray
-from numpy import exp
+from pycffdrs.instrument import instrumented
+from pycffdrs.workspace import Workspace, as_arrays, float_dtype, output, workspace_or_new
 
 
-def CFBcalc(FUELTYPE: ndarray,  # pylint: disable=unused-argument
+def _CSIcalc(FMC: ndarray,
+             CBH: ndarray,
+             out: ndarray = None,
+             workspace: Workspace = None) -> ndarray:
+    """ Eq. 56 (FCFDG 1992) Critical surface intensity """
+    # CSI = 0.001 * (CBH**1.5) * (460 + 25.9 * FMC)**1.5
+    shape = np.broadcast(FMC, CBH).shape
+    dtype = np.result_type(FMC, CBH)
+    t, = workspace_or_new(workspace).scratch('_CSIcalc', 1, shape, dtype)
+    np.multiply(25.9, FMC, out=t)
+    np.add(460, t, out=t)
+    np.power(t, 1.5, out=t)
+    CSI = output(out, shape, dtype)
+    np.power(CBH, 1.5, out=CSI)
+    np.multiply(0.001, CSI, out=CSI)
+    np.multiply(CSI, t, out=CSI)
+    return CSI
+
+
+def _RSOcalc(CSI: ndarray, SFC: ndarray, out: ndarray = None) -> ndarray:
+    """ Eq. 57 (FCFDG 1992) Surface fire rate of spread (m/min) """
+    # RSO = CSI / (300 * SFC)
+    RSO = output(out, np.broadcast(CSI, SFC).shape, np.result_type(CSI, SFC))
+    np.multiply(300, SFC, out=RSO)
+    np.divide(CSI, RSO, out=RSO)
+    return RSO
+
+
+def _CFBcalc(ROS: ndarray,
+             RSO: ndarray,
+             out: ndarray = None,
+             workspace: Workspace = None) -> ndarray:
+    """ Eq. 58 (FCFDG 1992) Crown fraction burned """
+    # CFB = np.where(ROS > RSO, 1 - exp(-0.23 * (ROS - RSO)), 0)
+    shape = np.broadcast(ROS, RSO).shape
+    crowning, = workspace_or_new(workspace).scratch('_CFBcalc', 1, shape, bool)
+    np.greater(ROS, RSO, out=crowning)
+    CFB = output(out, shape, np.result_type(ROS, RSO))
+    # Only evaluated where crowning
+    CFB.fill(0)
+    np.subtract(ROS, RSO, out=CFB, where=crowning)
+    np.multiply(-0.23, CFB, out=CFB, where=crowning)
+    np.exp(CFB, out=CFB, where=crowning)
+    np.subtract(1, CFB, out=CFB, where=crowning)
+    return CFB
+
+
+@instrumented
+def CFBcalc(FUELTYPE: ndarray,  # pylint: disable=unused-argument, too-many-arguments
             FMC: ndarray, SFC: ndarray, ROS: ndarray, CBH: ndarray,
-            option: str = "CFB") -> ndarray:
+            option: str = "CFB",
+            out: ndarray = None,
+            workspace: Workspace = None,
+            dtype=None) -> ndarray:
     """
     Calculate Calculate Crown Fraction Burned. To calculate CFB, we also
       need to calculate Critical surface intensity (CSI), and Surface fire
@@ -23,27 +75,33 @@ def CFBcalc(FUELTYPE: ndarray,  # pylint: disable=unused-argument
     ST-X-3, Forestry Canada, Ottawa, Ontario.
 
     Keyword arguments:
-    FUELTYPE -- The Fire Behaviour Prediction FuelType
+    FUELTYPE -- The Fire Behaviour Prediction FuelType (strings or FuelType codes)
     FMC -- Foliar Moisture Content
     SFC -- Surface Fuel Consumption
     CBH -- Crown Base Height
     ROS -- Rate of Spread
     option -- Which variable to calculate(ROS, CFB, RSC, or RSI)
+    out -- Optional array to write the result to
+    workspace -- Optional Workspace to reuse scratch arrays from
+    dtype -- np.float64 or np.float32 (default: see pycffdrs.workspace)
 
     Returns:
     CFB, CSI, RSO depending on which option was selected.
     """
-    CFB = 0
+    dtype = float_dtype(dtype)
+    FMC, SFC, ROS, CBH = as_arrays(FMC, SFC, ROS, CBH, dtype=dtype)
+    workspace = workspace_or_new(workspace)
     # Eq. 56 (FCFDG 1992) Critical surface intensity
-    CSI = 0.001 * (CBH**1.5) * (460 + 25.9 * FMC)**1.5
-    # Return at this point, if specified by caller
     if option == "CSI":
-        return CSI
+        # Return at this point, if specified by caller
+        return _CSIcalc(FMC, CBH, out, workspace)
+    CSI, = workspace.scratch('CFBcalc.CSI', 1, np.broadcast(FMC, CBH).shape, dtype)
+    CSI = _CSIcalc(FMC, CBH, CSI, workspace)
     # Eq. 57 (FCFDG 1992) Surface fire rate of spread (m/min)
-    RSO = CSI / (300 * SFC)
-    # Return at this point, if specified by caller
     if option == "RSO":
-        return RSO
+        # Return at this point, if specified by caller
+        return _RSOcalc(CSI, SFC, out)
+    RSO, = workspace.scratch('CFBcalc.RSO', 1, np.broadcast(CSI, SFC).shape, dtype)
+    RSO = _RSOcalc(CSI, SFC, RSO)
     # Eq. 58 (FCFDG 1992) Crown fraction burned
-    CFB = np.where(ROS > RSO, 1 - exp(-0.23 * (ROS - RSO)), CFB)
-    return CFB
+    return _CFBcalc(ROS, RSO, out, workspace)
@@ -1,11 +1,84 @@
 """
 All code is based on the R project: https://cran.r-project.org/package=cffdrs
 """
-from numpy import exp, ndarray
+from numpy import ndarray
 import numpy as np
+from pycffdrs.fueltypes import ALPHA_CONSTANT, FUEL_PARAMETERS, fuel_codes
+from pycffdrs.instrument import instrumented
+from pycffdrs.partition import FuelPartition, check_order, selected
+from pycffdrs.workspace import Workspace, as_arrays, output, workspace_or_new
 
+# Fuel types with a constant alpha, by FuelType code
+_CONSTANT_ALPHA = FUEL_PARAMETERS['alpha'] == ALPHA_CONSTANT
 
-def DISTtcalc(FUELTYPE: ndarray, ROSeq: ndarray, HR: ndarray, CFB: ndarray):
+
+def _alpha_constant(HR: ndarray, out: ndarray) -> ndarray:
+    """ _DISTtfactor of the fuel types with a constant alpha. """
+    alpha = out.dtype.type(0.115)
+    # factor = HR + exp(-alpha * HR) / alpha - 1 / alpha
+    np.multiply(-alpha, HR, out=out)
+    np.exp(out, out=out)
+    np.divide(out, alpha, out=out)
+    np.add(HR, out, out=out)
+    np.subtract(out, 1 / alpha, out=out)
+    return out
+
+
+def _DISTtfactor(FUELTYPE: ndarray,  # pylint: disable=too-many-arguments
+                 HR: ndarray,
+                 CFB: ndarray,
+                 out: ndarray = None,
+                 workspace: Workspace = None,
+                 partition: FuelPartition = None) -> ndarray:
+    """ The acceleration adjusted elapsed time of Eq. 71, such that DISTt = ROSeq * factor. """
+    FUELTYPE = fuel_codes(FUELTYPE)
+    HR, CFB = as_arrays(HR, CFB)
+    shape = np.broadcast(FUELTYPE, HR, CFB).shape
+    workspace = workspace_or_new(workspace)
+    if partition is not None:
+        factor = output(out, shape)
+        for fuel in partition.fuels():
+            group = partition.group(fuel)
+            if _CONSTANT_ALPHA[fuel]:
+                _alpha_constant(selected(HR, group), factor[group])
+            else:
+                _DISTtfactor(FUELTYPE[group], selected(HR, group), selected(CFB, group),
+                             factor[group], workspace)
+        return factor
+    alpha, t = workspace.scratch('_DISTtfactor', 2, shape)
+    constant, = workspace.scratch('_DISTtfactor', 1, shape, bool)
+    # Eq. 72 (FCFDG 1992)
+    # Calculate the alpha constant for the DISTt calculation
+    # alpha = np.where(alpha class is constant, 0.115,
+    #                  0.115 - 18.8 * (CFB**2.5) * exp(-8 * CFB))
+    np.power(CFB, 2.5, out=alpha)
+    np.multiply(18.8, alpha, out=alpha)
+    np.multiply(-8, CFB, out=t)
+    np.exp(t, out=t)
+    np.multiply(alpha, t, out=alpha)
+    np.subtract(0.115, alpha, out=alpha)
+    np.take(_CONSTANT_ALPHA, np.broadcast_to(FUELTYPE, shape), out=constant)
+    np.copyto(alpha, 0.115, where=constant)
+    # factor = HR + exp(-alpha * HR) / alpha - 1 / alpha
+    factor = output(out, shape)
+    np.negative(alpha, out=t)
+    np.multiply(t, HR, out=t)
+    np.exp(t, out=t)
+    np.divide(t, alpha, out=t)
+    np.add(HR, t, out=factor)
+    np.divide(1, alpha, out=t)
+    np.subtract(factor, t, out=factor)
+    return factor
+
+
+@instrumented
+def DISTtcalc(FUELTYPE: ndarray,  # pylint: disable=too-many-arguments
+              ROSeq: ndarray,
+              HR: ndarray,
+              CFB: ndarray,
+              out: ndarray = None,
+              workspace: Workspace = None,
+              partition: FuelPartition = None):
     """
      Description:
        Calculate the Head fire spread distance at time t. In the documentation
@@ -17,20 +90,25 @@ def DISTtcalc(FUELTYPE: ndarray, ROSeq: ndarray, HR: ndarray, CFB: ndarray):
        ST-X-3, Forestry Canada, Ottawa, Ontario.
 
      Args:
-       FUELTYPE: The Fire Behaviour Prediction FuelType
+       FUELTYPE: The Fire Behaviour Prediction FuelType (strings or FuelType codes)
        ROSeq:    The predicted equilibrium rate of spread (m/min)
        HR (t):   The elapsed time (min)
        CFB:      Crown Fraction Burned
+       out:      Optional array to write the result to
+       workspace: Optional Workspace to reuse scratch arrays from
+       partition: Optional FuelPartition that all inputs are ordered by, to calculate by
+                 fuel type (see pycffdrs.partition). Inputs not in its order raise
+                 ValueError.
 
      Returns:
        DISTt:    Head fire spread distance at time t
     """
-    # Eq. 72 (FCFDG 1992)
-    # Calculate the alpha constant for the DISTt calculation
-    alpha = np.where(np.isin(FUELTYPE, ("C1", "O1A", "O1B", "S1", "S2", "S3", "D1")),
-                     0.115,
-                     0.115 - 18.8 * (CFB**2.5) * exp(-8 * CFB))
-    # Eq. 71 (FCFDG 1992) Calculate Head fire spread distance
-    DISTt = ROSeq * (HR + exp(-alpha * HR) / alpha - 1 / alpha)
+    # Eqs. 71 & 72 (FCFDG 1992) Calculate Head fire spread distance
+    # DISTt = ROSeq * _DISTtfactor(FUELTYPE, HR, CFB)
+    check_order(partition, FUELTYPE, ROSeq, HR, CFB)
+    ROSeq, = as_arrays(ROSeq)
+    factor = _DISTtfactor(FUELTYPE, HR, CFB, workspace=workspace, partition=partition)
+    DISTt = output(out, np.broadcast(ROSeq, factor).shape)
+    np.multiply(ROSeq, factor, out=DISTt)
 
     return DISTt
@@ -2,9 +2,13 @@
 All code and comments based on the R project: https://cran.r-project.org/package=cffdrs
 """
 from numpy import ndarray
+import numpy as np
+from pycffdrs.instrument import instrumented
+from pycffdrs.workspace import output
 
 
-def FIcalc(FC: ndarray, ROS: ndarray):
+@instrumented
+def FIcalc(FC: ndarray, ROS: ndarray, out: ndarray = None):
     """
      Description:
        Calculate the Predicted Fire Intensity
@@ -17,9 +21,14 @@ def FIcalc(FC: ndarray, ROS: ndarray):
      Args:
        FC:   Fuel Consumption (kg/m^2)
        ROS:  Rate of Spread (m/min)
+       out:  Optional array to write the result to (may be FC)
 
      Returns:
        FI:   Fire Intensity (kW/m)
     """
     # Eq. 69 (FCFDG 1992) Fire Intensity (kW/m)
-    return 300 * FC * ROS
+    # FI = 300 * FC * ROS
+    FI = output(out, np.broadcast(FC, ROS).shape)
+    np.multiply(300, FC, out=FI)
+    np.multiply(FI, ROS, out=FI)
+    return FI
@@ -1,12 +1,142 @@
 """
 All code and comments based on the R project: https://cran.r-project.org/package=cffdrs
 """
-from numpy import ndarray, exp, round  # pylint: disable=redefined-builtin
+from numpy import ndarray
 import numpy as np
+from pycffdrs.instrument import instrumented
+from pycffdrs.workspace import Workspace, as_arrays, output, workspace_or_new
+
+
+@instrumented
+def D0calc(LAT: ndarray,  # pylint: disable=too-many-arguments
+           LONG: ndarray,
+           ELV: ndarray,
+           D0: ndarray = 0,
+           out: ndarray = None,
+           workspace: Workspace = None) -> ndarray:
+    """
+     Description:
+       Calculate the date of minimum foliar moisture content (Eqs. 1-4, FCFDG 1992). It
+       depends only on location, so a grid's D0 can be calculated once, and reused for every
+       day of the season (see FMCLayer).
+
+     Args:
+       LAT:    Latitude (decimal degrees)
+       LONG:   Longitude (decimal degrees)
+       ELV:    Elevation (metres)
+       D0:     Date of minimum foliar moisture content, where known (> 0)
+       out:    Optional array to write the result to
+       workspace: Optional Workspace to reuse scratch arrays from
+
+     Returns:
+       D0:     Date of minimum foliar moisture content, rounded to a day
+    """
+    LAT, LONG, ELV, D0 = as_arrays(LAT, LONG, ELV, D0)
+    shape = np.broadcast(LAT, LONG, ELV, D0).shape
+    workspace = workspace_or_new(workspace)
+    LATN, t1, t2 = workspace.scratch('D0calc', 3, shape)
+    unknown, low, high = workspace.scratch('D0calc', 3, shape, bool)
+    # D0 is only calculated where it is not known, for low (ELV <= 0) and high elevations
+    np.less_equal(D0, 0, out=unknown)
+    np.less_equal(ELV, 0, out=low)
+    np.logical_not(low, out=high)
+    np.logical_and(high, unknown, out=high)
+    np.logical_and(low, unknown, out=low)
+    # Calculate Normalized Latitude
+    # Eqs. 1 & 3 (FCFDG 1992)
+    # LATN = np.where(D0 <= 0,
+    #                 np.where(ELV <= 0,
+    #                          46 + 23.4 * exp(-0.0360 * (150 - LONG)),
+    #                          43 + 33.7 * exp(-0.0351 * (150 - LONG))),
+    #                 LATN)
+    np.subtract(150, LONG, out=t1, where=unknown)
+    np.multiply(-0.0360, t1, out=LATN, where=low)
+    np.exp(LATN, out=LATN, where=low)
+    np.multiply(23.4, LATN, out=LATN, where=low)
+    np.add(46, LATN, out=LATN, where=low)
+    np.multiply(-0.0351, t1, out=LATN, where=high)
+    np.exp(LATN, out=LATN, where=high)
+    np.multiply(33.7, LATN, out=LATN, where=high)
+    np.add(43, LATN, out=LATN, where=high)
+    # Calculate Date of minimum foliar moisture content
+    # Eqs. 2 & 4 (FCFDG 1992)
+    # D0 = np.where(D0 <= 0,
+    #               np.where(ELV <= 0,
+    #                        151 * (LAT / LATN),
+    #                        142.1 * (LAT / LATN) + 0.0172 * ELV),
+    #               D0)
+    D = output(out, shape)
+    np.copyto(D, D0)
+    np.divide(LAT, LATN, out=t1, where=unknown)
+    np.multiply(151, t1, out=D, where=low)
+    np.multiply(142.1, t1, out=t1, where=high)
+    np.multiply(0.0172, ELV, out=t2, where=high)
+    np.add(t1, t2, out=D, where=high)
+    # Round D0 to the nearest integer because it is a date
+    np.round(D, 0, out=D)
+    return D
+
+
+@instrumented
+def FMCfromD0(D0: ndarray,
+              DJ: ndarray,
+              out: ndarray = None,
+              workspace: Workspace = None) -> ndarray:
+    """
+     Description:
+       Calculate Foliar Moisture Content on a specified day, from the date of minimum
+       foliar moisture content (Eqs. 5-8, FCFDG 1992).
+
+     Args:
+       D0:     Date of minimum foliar moisture content, as D0calc calculates it
+       DJ:     Day of year. D0 and DJ are broadcast together, so e.g. a (days, 1, 1) DJ and
+               a (rows, columns) D0 give the FMC of every day, shaped (days, rows, columns).
+       out:    Optional array to write the result to
+       workspace: Optional Workspace to reuse scratch arrays from
+
+     Returns:
+       FMC:    Foliar Moisture Content
+    """
+    D0, DJ = as_arrays(D0, DJ)
+    shape = np.broadcast(D0, DJ).shape
+    workspace = workspace_or_new(workspace)
+    ND, t1, t2 = workspace.scratch('FMCfromD0', 3, shape)
+    near, middle, below = workspace.scratch('FMCfromD0', 3, shape, bool)
+    # Number of days between day of year and date of min FMC
+    # Eq. 5 (FCFDG 1992)
+    np.subtract(DJ, D0, out=ND)
+    np.abs(ND, out=ND)
+    # Calculate final FMC
+    # Eqs. 6, 7, & 8 (FCFDG 1992)
+    # FMC = np.where(ND < 30, 85 + 0.0189 * ND**2,
+    #                np.where((ND >= 30) & (ND < 50),
+    #                         32.9 + 3.17 * ND - 0.0288 * ND**2,
+    #                         120))
+    FMC = output(out, shape)
+    FMC.fill(120)
+    np.less(ND, 30, out=near)
+    np.square(ND, out=t1, where=near)
+    np.multiply(0.0189, t1, out=t1, where=near)
+    np.add(85, t1, out=FMC, where=near)
+    np.greater_equal(ND, 30, out=middle)
+    np.logical_and(middle, np.less(ND, 50, out=below), out=middle)
+    np.square(ND, out=t1, where=middle)
+    np.multiply(0.0288, t1, out=t1, where=middle)
+    np.multiply(3.17, ND, out=t2, where=middle)
+    np.add(32.9, t2, out=t2, where=middle)
+    np.subtract(t2, t1, out=FMC, where=middle)
+    return FMC
 
 
 # if D0, date of min FMC, is not known then D0 = NULL.
-def FMCcalc(LAT: ndarray, LONG: ndarray, ELV: ndarray, DJ: ndarray, D0: ndarray):
+@instrumented
+def FMCcalc(LAT: ndarray,  # pylint: disable=too-many-arguments
+            LONG: ndarray,
+            ELV: ndarray,
+            DJ: ndarray,
+            D0: ndarray,
+            out: ndarray = None,
+            workspace: Workspace = None):
     """
      Description:
        Calculate Foliar Moisture Content on a specified day.
@@ -22,36 +152,64 @@ def FMCcalc(LAT: ndarray, LONG: ndarray, ELV: ndarray, DJ: ndarray, D0: ndarray)
        ELV:    Elevation (metres)
        DJ:     Day of year (offeren referred to as julian date)
        D0:     Date of minimum foliar moisture content
+       out:    Optional array to write the result to
+       workspace: Optional Workspace to reuse scratch arrays from
 
      Returns:
        FMC:    Foliar Moisture Content
     """
-    # Initialize vectors
-    LATN = np.full(len(LAT), 0)
-    # Calculate Normalized Latitude
-    # Eqs. 1 & 3 (FCFDG 1992)
-    LATN = np.where(D0 <= 0,
-                    np.where(ELV <= 0,
-                             46 + 23.4 * exp(-0.0360 * (150 - LONG)),
-                             43 + 33.7 * exp(-0.0351 * (150 - LONG))),
-                    LATN)
-    # Calculate Date of minimum foliar moisture content
-    # Eqs. 2 & 4 (FCFDG 1992)
-    D0 = np.where(D0 <= 0,
-                  np.where(ELV <= 0,
-                           151 * (LAT / LATN),
-                           142.1 * (LAT / LATN) + 0.0172 * ELV),
-                  D0)
-    # Round D0 to the nearest integer because it is a date
-    D0 = round(D0, 0)
-    # Number of days between day of year and date of min FMC
-    # Eq. 5 (FCFDG 1992)
-    ND = abs(DJ-D0)
-    # Calculate final FMC
-    # Eqs. 6, 7, & 8 (FCFDG 1992)
-    FMC = np.where(ND < 30, 85 + 0.0189 * ND**2,
-                   np.where((ND >= 30) & (ND < 50),
-                            32.9 + 3.17 * ND - 0.0288 * ND**2,
-                            120))
+    LAT, LONG, ELV, DJ, D0 = as_arrays(LAT, LONG, ELV, DJ, D0)
+    shape = np.broadcast(LAT, LONG, ELV, DJ, D0).shape
+    workspace = workspace_or_new(workspace)
+    D, = workspace.scratch('FMCcalc', 1, np.broadcast(LAT, LONG, ELV, D0).shape)
+    D0calc(LAT, LONG, ELV, D0, out=D, workspace=workspace)
+    return FMCfromD0(D, DJ, out=output(out, shape), workspace=workspace)
 
-    return FMC
+
+class FMCLayer:
+    """
+    Foliar Moisture Content of a grid, day after day.
+
+    The date of minimum foliar moisture content (D0) of each cell is calculated once, when
+    the layer is created, so that each day's FMC only needs Eqs. 5-8.
+
+    Keyword arguments:
+    LAT -- Latitude (decimal degrees)
+    LONG -- Longitude (decimal degrees)
+    ELV -- Elevation (metres)
+    D0 -- Date of minimum foliar moisture content, where known (> 0)
+
+        layer = FMCLayer(LAT, LONG, ELV)
+        FMC = layer.fmc(DJ)                    # one day
+        FMC = layer.days(range(120, 300))      # every day of the season: (days,) + grid
+    """
+
+    def __init__(self, LAT: ndarray, LONG: ndarray, ELV: ndarray, D0: ndarray = 0):
+        self._workspace = Workspace()
+        self.D0 = D0calc(  # pylint: disable=invalid-name
+            LAT, LONG, ELV, D0, workspace=self._workspace)
+
+    def fmc(self, DJ: ndarray, out: ndarray = None) -> ndarray:
+        """
+        Foliar Moisture Content on a day.
+
+        Keyword arguments:
+        DJ -- Day of year, for the whole grid or per cell
+        out -- Optional array to write the result to, e.g. the previous day's
+        """
+        return FMCfromD0(self.D0, DJ, out=out, workspace=self._workspace)
+
+    def days(self, DJ: ndarray, out: ndarray = None) -> ndarray:
+        """
+        Foliar Moisture Content on each of a range of days, in one call.
+
+        Keyword arguments:
+        DJ -- Days of year (1 dimensional)
+        out -- Optional (days,) + grid shaped array to write the result to, e.g. to reuse
+               from one season, or run of days, to the next
+
+        Returns:
+        FMC, shaped (days,) + grid
+        """
+        DJ = np.asarray(DJ).reshape((-1,) + (1,) * self.D0.ndim)
+        return FMCfromD0(self.D0, DJ, out=out, workspace=self._workspace)
@@ -2,9 +2,13 @@
 All code and comments based on the R project: https://cran.r-project.org/package=cffdrs
 """
 from numpy import ndarray
+import numpy as np
+from pycffdrs.instrument import instrumented
+from pycffdrs.workspace import output
 
 
-def FROScalc(ROS: ndarray, BROS: ndarray, LB: ndarray):
+@instrumented
+def FROScalc(ROS: ndarray, BROS: ndarray, LB: ndarray, out: ndarray = None):
     """
     Description:
      Calculate the Flank Fire Spread Rate.
@@ -18,6 +22,7 @@ def FROScalc(ROS: ndarray, BROS: ndarray, LB: ndarray):
      ROS:    Fire Rate of Spread (m/min)
      BROS:   Back Fire Rate of Spread (m/min)
      LB:     Length to breadth ratio
+     out:    Optional array to write the result to (may be ROS or BROS)
 
 
     Returns:
@@ -25,4 +30,9 @@ def FROScalc(ROS: ndarray, BROS: ndarray, LB: ndarray):
 
     """
     # Eq. 89 (FCFDG 1992)
-    return (ROS + BROS) / LB / 2
+    # FROS = (ROS + BROS) / LB / 2
+    FROS = output(out, np.broadcast(ROS, BROS, LB).shape)
+    np.add(ROS, BROS, out=FROS)
+    np.divide(FROS, LB, out=FROS)
+    np.divide(FROS, 2, out=FROS)
+    return FROS
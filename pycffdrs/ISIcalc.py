@@ -18,31 +18,140 @@ Structure of the Canadian Forest Fire Behavior Prediction System."
 Technical ReportST-X-3, Forestry Canada, Ottawa, Ontario."
 """
 from typing import Union
-from numpy import exp, ndarray
+from numpy import ndarray
 import numpy as np
+from pycffdrs import backends
+from pycffdrs.instrument import instrumented
+from pycffdrs.lookup import LookupTable
+from pycffdrs.workspace import Workspace, as_arrays, float_dtype, output, workspace_or_new
 
 
-def ISIcalc(ffmc: ndarray,
-            ws: ndarray,
-            fbpMod: Union[ndarray, None, bool] = False) -> ndarray:
+@instrumented
+def fFcalc(ffmc: ndarray,
+           out: ndarray = None,
+           workspace: Workspace = None,
+           dtype=None,
+           approx: bool = False) -> ndarray:
     """
-    Computes the Initial Spread Index From the FWI System.
+    Computes the Fine Fuel Moisture function of the Initial Spread Index.
 
     Keyword arguments:
     ffmc -- Fine Fuel Moisture Code
+    out -- Optional array to write the result to (may be ffmc)
+    workspace -- Optional Workspace to reuse scratch arrays from
+    dtype -- np.float64 or np.float32 (default: see pycffdrs.workspace)
+    approx -- Interpolate in FF_TABLE, within FF_MAX_ERROR (see pycffdrs.lookup). ffmc is
+              clamped to [0, 101].
+    """
+    dtype = float_dtype(dtype)
+    ffmc, = as_arrays(ffmc, dtype=dtype)
+    if approx:
+        return FF_TABLE(ffmc, out=out, workspace=workspace, dtype=dtype)
+    fm, t = workspace_or_new(workspace).scratch('fFcalc', 2, ffmc.shape, dtype)
+    # Eq. 10 - Moisture content
+    # fm = 147.2 * (101 - ffmc)/(59.5 + ffmc)
+    np.subtract(101, ffmc, out=fm)
+    np.multiply(147.2, fm, out=fm)
+    np.add(59.5, ffmc, out=t)
+    np.divide(fm, t, out=fm)
+    # Eq. 25 - Fine Fuel Moisture
+    # 91.9 * exp(-0.1386 * fm) * (1 + (fm**5.31) / 49300000)
+    fF = output(out, ffmc.shape, dtype)
+    np.multiply(-0.1386, fm, out=t)
+    np.exp(t, out=t)
+    np.multiply(91.9, t, out=t)
+    np.power(fm, 5.31, out=fF)
+    np.divide(fF, 49300000, out=fF)
+    np.add(1, fF, out=fF)
+    np.multiply(t, fF, out=fF)
+    return fF
+
+
+# The FFMC function, tabulated over the whole FFMC scale, and the maximum absolute error of
+# interpolating in the table
+FF_TABLE = LookupTable(lambda ffmc: fFcalc(ffmc, dtype=np.float64), 0, 101, 16384)
+FF_MAX_ERROR = 1e-5
+
+
+@instrumented
+def fWcalc(ws: ndarray,
+           fbpMod: Union[ndarray, None, bool] = False,
+           out: ndarray = None,
+           workspace: Workspace = None,
+           dtype=None) -> ndarray:
+    """
+    Computes the Wind function of the Initial Spread Index.
+
+    Keyword arguments:
     ws -- Wind Speed (km/h)
     fbpMod -- TRUE/FALSE if using the fbp modification at the extreme end
+    out -- Optional array to write the result to (may be ws)
+    workspace -- Optional Workspace to reuse scratch arrays from
+    dtype -- np.float64 or np.float32 (default: see pycffdrs.workspace)
     """
-    # Eq. 10 - Moisture content
-    fm = 147.2 * (101 - ffmc)/(59.5 + ffmc)
+    dtype = float_dtype(dtype)
+    ws, = as_arrays(ws, dtype=dtype)
+    workspace = workspace_or_new(workspace)
+    t, = workspace.scratch('fWcalc', 1, ws.shape, dtype)
+    mask, = workspace.scratch('fWcalc', 1, ws.shape, bool)
     # Eq. 24 - Wind Effect
     # the ifelse, also takes care of the ISI modification for the fbp functions
     # This modification is Equation 53a in FCFDG (1992)
-    # pylint: disable=singleton-comparison
-    fW = np.where((ws >= 40) & (fbpMod == True), 12 *
-                  (1 - exp(-0.0818 * (ws - 28))), exp(0.05039 * ws))
-    # Eq. 25 - Fine Fuel Moisture
-    fF = 91.9 * exp(-0.1386 * fm) * (1 + (fm**5.31) / 49300000)
+    # np.where((ws >= 40) & (fbpMod == True), 12 * (1 - exp(-0.0818 * (ws - 28))),
+    #          exp(0.05039 * ws))
+    np.greater_equal(ws, 40, out=mask)
+    np.logical_and(mask, np.equal(fbpMod, True), out=mask)
+    np.subtract(ws, 28, out=t)
+    np.multiply(-0.0818, t, out=t)
+    np.exp(t, out=t)
+    np.subtract(1, t, out=t)
+    np.multiply(12, t, out=t)
+    fW = output(out, ws.shape, dtype)
+    np.multiply(0.05039, ws, out=fW)
+    np.exp(fW, out=fW)
+    np.copyto(fW, t, where=mask)
+    return fW
+
+
+@instrumented
+def ISIcalc(ffmc: ndarray,  # pylint: disable=too-many-arguments
+            ws: ndarray,
+            fbpMod: Union[ndarray, None, bool] = False,
+            out: ndarray = None,
+            workspace: Workspace = None,
+            dtype=None,
+            approx: bool = False,
+            backend: str = None) -> ndarray:
+    """
+    Computes the Initial Spread Index From the FWI System.
+
+    Keyword arguments:
+    ffmc -- Fine Fuel Moisture Code
+    ws -- Wind Speed (km/h)
+    fbpMod -- TRUE/FALSE if using the fbp modification at the extreme end
+    out -- Optional array to write the result to
+    workspace -- Optional Workspace to reuse scratch arrays from
+    dtype -- np.float64 or np.float32 (default: see pycffdrs.workspace)
+    approx -- Approximate the FFMC function (see fFcalc)
+    backend -- numpy, numexpr, numba or auto (default: see pycffdrs.backends). Approximation
+               is only done with numpy.
+    """
+    dtype = float_dtype(dtype)
+    ffmc, ws = as_arrays(ffmc, ws, dtype=dtype)
+    shape = np.broadcast(ffmc, ws).shape
+    workspace = workspace_or_new(workspace)
+    backend = 'numpy' if approx else backends.resolve(backend)
+    if backend != 'numpy':
+        return backends.isi(backend, ffmc, ws, fbpMod, output(out, shape, dtype))
+    fW, fF = workspace.scratch('ISIcalc', 2, shape, dtype)
+    # Eq. 24 & 53a - Wind Effect
+    fWcalc(np.broadcast_to(ws, shape), fbpMod, out=fW, workspace=workspace, dtype=dtype)
+    # Eqs. 10 & 25 - Fine Fuel Moisture
+    fFcalc(np.broadcast_to(ffmc, shape), out=fF, workspace=workspace, dtype=dtype,
+           approx=approx)
     # Eq. 26 - Spread Index Equation
-    isi = 0.208 * fW * fF
+    # isi = 0.208 * fW * fF
+    isi = output(out, shape, dtype)
+    np.multiply(0.208, fW, out=isi)
+    np.multiply(isi, fF, out=isi)
     return isi
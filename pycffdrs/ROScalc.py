@@ -2,77 +2,141 @@
 All code and comments based on the R project: https://cran.r-project.org/package=cffdrs
 
 """
+from typing import Callable
 from numpy import ndarray, exp
 import numpy as np
+from pycffdrs import backends
 from pycffdrs.BEcalc import BEcalc
-from pycffdrs.C6calc import C6calc
-
-
-d = ("C1", "C2", "C3", "C4", "C5", "C6", "C7", "D1", "M1", "M2", "M3", "M4",
-     "S1", "S2", "S3", "O1A", "O1B")
-a = dict(zip(d, (90, 110, 110, 110, 30, 30, 45, 30, 0, 0, 120, 100, 75, 40, 55, 190,
-                 250)))
-b = dict(zip(d, (0.0649, 0.0282, 0.0444, 0.0293, 0.0697, 0.0800, 0.0305, 0.0232, 0, 0,
-                 0.0572, 0.0404, 0.0297, 0.0438, 0.0829, 0.0310, 0.0350)))
-c0 = dict(zip(d, (4.5, 1.5, 3.0, 1.5, 4.0, 3.0, 2.0, 1.6, 0, 0, 1.4, 1.48, 1.3, 1.7,
-                  3.2, 1.4, 1.7)))
-
-
-def _ROScalc(FUELTYPE: str,  # pylint: disable=too-many-arguments
-             ISI: float,
-             BUI: float,
-             FMC: float,
-             SFC: float,
-             PC: float,
-             PDF: float,
-             CC: float,
-             CBH: float) -> float:
-    """ Compute ROS with scalar input values. Nesting makes working with vectors extremely
-    difficult. """
-    NoBUI = -1
-    RSI = -1
-    # Eq. 26 (FCFDG 1992) - Initial Rate of Spread for Conifer and Slash types
-    if FUELTYPE in ("C1", "C2", "C3", "C4", "C5", "C7", "D1", "S1", "S2", "S3"):
-        RSI = a[FUELTYPE] * (1 - exp(-b[FUELTYPE] * ISI))**c0[FUELTYPE]
+from pycffdrs.fueltypes import FuelType, FUEL_PARAMETERS, fuel_codes
+from pycffdrs.instrument import instrumented
+from pycffdrs.lookup import LookupTable
+from pycffdrs.partition import FuelPartition, check_order, select
+from pycffdrs.workspace import (Workspace, as_arrays, broadcast, float_dtype, output,
+                                workspace_or_new)
+
+
+# Grass types, whose Initial Rate of Spread is scaled by the curing function
+_GRASS = np.isin(np.arange(len(FuelType)), (FuelType.O1A, FuelType.O1B))
+
+
+def _RSI26calc(FUELTYPE: ndarray, ISI: ndarray) -> ndarray:
+    """ Eq. 26 (FCFDG 1992) - Initial Rate of Spread, FUELTYPE being FuelType code(s). """
+    a, b, c0 = (FUEL_PARAMETERS[name].astype(ISI.dtype)[FUELTYPE] for name in ('a', 'b', 'c0'))
+    return a * (1 - exp(-b * ISI))**c0
+
+
+# Eq. 26 of every fuel type, tabulated over ISI up to ISI_MAX (which covers every ISI with the
+# fbp modification), and the maximum absolute error of interpolating in the table
+ISI_MAX = 250
+RSI_TABLE = LookupTable(lambda ISI: _RSI26calc(np.arange(len(FuelType))[:, None], ISI),
+                        0, ISI_MAX, 16384)
+RSI_MAX_ERROR = 1e-3
+
+
+def _RSI26(FUELTYPE: ndarray, ISI: ndarray, approx: bool) -> ndarray:
+    """ Eq. 26, or its approximation: exact above ISI_MAX. """
+    if not approx:
+        return _RSI26calc(FUELTYPE, ISI)
+    RSI = RSI_TABLE(ISI, FUELTYPE, dtype=ISI.dtype)
+    beyond = ISI > ISI_MAX
+    if beyond.any():
+        RSI[beyond] = _RSI26calc(FUELTYPE[beyond] if np.ndim(FUELTYPE) else FUELTYPE,
+                                 ISI[beyond])
+    return RSI
+
+
+@instrumented
+def RSIcalc(FUELTYPE: ndarray,  # pylint: disable=too-many-arguments
+            ISI: ndarray,
+            PC: ndarray,
+            PDF: ndarray,
+            CC: ndarray,
+            out: ndarray = None,
+            dtype=None,
+            approx: bool = False,
+            partition: FuelPartition = None) -> ndarray:
+    """
+    Computes the Initial Rate of Spread (RSI) for all fuel types except C6, which has it's
+    own calculation (see C6calc). C6 elements are set to -1.
+
+    Keyword arguments:
+    FUELTYPE -- FuelType codes (see fuel_codes)
+    ISI -- Intiial Spread Index
+    PC -- Percent Conifer (%)
+    PDF -- Percent Dead Balsam Fir (%)
+    CC -- Constant
+    out -- Optional array to write the result to
+    dtype -- np.float64 or np.float32 (default: see pycffdrs.workspace)
+    approx -- Interpolate the Eq. 26 curves in RSI_TABLE (see pycffdrs.lookup). For PC, PDF
+              and CC within 0-100, RSI is then within RSI_MAX_ERROR.
+    partition -- Optional FuelPartition that all inputs are ordered by, to select fuel types
+                 by slices (see pycffdrs.partition). Inputs not in its order raise ValueError.
+    Returns:
+    RSI: Initial Rate of spread (m/min)
+    """
+    check_order(partition, FUELTYPE, ISI, PC, PDF, CC)
+    dtype = float_dtype(dtype)
+    FUELTYPE = fuel_codes(FUELTYPE)
+    # Fuel types are selected by masks, so inputs are broadcast (as views) to one shape
+    FUELTYPE, ISI, PC, PDF, CC = broadcast(FUELTYPE, *as_arrays(ISI, PC, PDF, CC, dtype=dtype))
+
+    def curve(fuel: FuelType, mask: ndarray) -> ndarray:
+        if fuel is None:
+            return _RSI26(FUELTYPE, ISI, approx)
+        return _RSI26(fuel, ISI[mask], approx)
+    return _RSIcombine(FUELTYPE, curve, PC, PDF, CC, output(out, FUELTYPE.shape, dtype),
+                       partition)
+
+
+def _RSIcombine(FUELTYPE: ndarray,  # pylint: disable=too-many-arguments
+                curve: Callable[[FuelType, ndarray], ndarray],
+                PC: ndarray,
+                PDF: ndarray,
+                CC: ndarray,
+                RSI: ndarray,
+                partition: FuelPartition = None) -> ndarray:
+    """
+    RSIcalc, given the Eq. 26 curves: curve(fuel, mask) is Eq. 26 of fuel type fuel at the
+    elements of mask (a slice given a partition), or of each element's own fuel type at every
+    element if fuel is None.
+    """
+    # Eq. 26 (FCFDG 1992) - Initial Rate of Spread, by each element's own fuel type curve.
+    # This is the final RSI of the Conifer and Slash types; the others are adjusted below.
+    RSI[...] = curve(None, None)
     # Eq. 27 (FCFDG 1992) - Initial Rate of Spread for M1 Mixedwood type
-    elif FUELTYPE == 'M1':
-        RSI = PC/100 * _ROScalc("C2", ISI, NoBUI, FMC, SFC, PC, PDF, CC, CBH) + \
-            (100 - PC) / 100 * _ROScalc("D1", ISI, NoBUI, FMC, SFC, PC, PDF, CC, CBH)
+    mask = select(FUELTYPE, partition, FuelType.M1)
+    _PC = PC[mask]
+    RSI[mask] = _PC/100 * curve(FuelType.C2, mask) + \
+        (100 - _PC) / 100 * curve(FuelType.D1, mask)
     # Eq. 27 (FCFDG 1992) - Initial Rate of Spread for M2 Mixedwood type
-    elif FUELTYPE == 'M2':
-        RSI = PC/100 * _ROScalc("C2", ISI, NoBUI, FMC, SFC, PC, PDF, CC, CBH) + \
-            0.2*(100-PC)/100 * _ROScalc("D1", ISI, NoBUI, FMC, SFC, PC, PDF, CC, CBH)
-    elif FUELTYPE == 'M3':
-        # Initial Rate of Spread for M3 Mixedwood
-        # Eq. 30 (Wotton et. al 2009)
-        RSI_m3 = a["M3"] * ((1 - exp(-b["M3"] * ISI))**c0["M3"])
-        RSI = PDF/100 * RSI_m3 + (1-PDF/100) * _ROScalc("D1", ISI,
-                                                        NoBUI, FMC, SFC, PC, PDF, CC, CBH)
-    elif FUELTYPE == 'M4':
-        # Initial Rate of Spread for M4 Mixedwood
-        # Eq. 30 (Wotton et. al 2009)
-        RSI_m4 = a["M4"] * ((1 - exp(-b["M4"] * ISI))**c0["M4"])
-        # Eq. 33 (Wotton et. al 2009)
-        RSI = PDF / 100 * RSI_m4 + 0.2 * (1 - PDF / 100) * \
-            _ROScalc("D1", ISI, NoBUI, FMC, SFC, PC, PDF, CC, CBH)
-        # Eq. 35b (Wotton et. al. 2009) - Calculate Curing function for grass
-    elif FUELTYPE in ('O1A', 'O1B'):
-        if CC < 58.8:
-            CF = 0.005 * (exp(0.061 * CC) - 1)
-        else:
-            CF = 0.176 + 0.02 * (CC - 58.8)
-        # Eq. 36 (FCFDG 1992) - Calculate Initial Rate of Spread for Grass
-        RSI = a[FUELTYPE] * ((1 - exp(-b[FUELTYPE] * ISI))**c0[FUELTYPE]) * CF
-    if FUELTYPE == 'C6':
-        ROS = C6calc(np.array((FUELTYPE,)), np.array((ISI,)), np.array((BUI,)),
-                     np.array((FMC,)), np.array((SFC,)), np.array((CBH,)), option="ROS")
-    else:
-        ROS = BEcalc(np.array((FUELTYPE,)), np.array((BUI,))) * RSI
-    if ROS < 0:
-        return 0.000001
-    return ROS
+    mask = select(FUELTYPE, partition, FuelType.M2)
+    _PC = PC[mask]
+    RSI[mask] = _PC/100 * curve(FuelType.C2, mask) + \
+        0.2*(100-_PC)/100 * curve(FuelType.D1, mask)
+    # Initial Rate of Spread for M3 Mixedwood
+    # Eq. 30 (Wotton et. al 2009)
+    mask = select(FUELTYPE, partition, FuelType.M3)
+    _PDF = PDF[mask]
+    RSI[mask] = _PDF/100 * curve(FuelType.M3, mask) + \
+        (1-_PDF/100) * curve(FuelType.D1, mask)
+    # Initial Rate of Spread for M4 Mixedwood
+    # Eq. 30 & Eq. 33 (Wotton et. al 2009)
+    mask = select(FUELTYPE, partition, FuelType.M4)
+    _PDF = PDF[mask]
+    RSI[mask] = _PDF / 100 * curve(FuelType.M4, mask) + \
+        0.2 * (1 - _PDF / 100) * curve(FuelType.D1, mask)
+    mask = _GRASS[FUELTYPE] if partition is None else partition.group(FuelType.O1A,
+                                                                      FuelType.O1B)
+    _CC = CC[mask]
+    # Eq. 35b (Wotton et. al. 2009) - Calculate Curing function for grass
+    CF = np.where(_CC < 58.8, 0.005 * (exp(0.061 * _CC) - 1), 0.176 + 0.02 * (_CC - 58.8))
+    # Eq. 36 (FCFDG 1992) - Calculate Initial Rate of Spread for Grass
+    RSI[mask] = RSI[mask] * CF
+    RSI[select(FUELTYPE, partition, FuelType.C6)] = -1.0
+    return RSI
 
 
+@instrumented
 def ROScalc(FUELTYPE: ndarray,  # pylint: disable=too-many-arguments, too-many-locals
             ISI: ndarray,
             BUI: ndarray,
@@ -81,7 +145,13 @@ def ROScalc(FUELTYPE: ndarray,  # pylint: disable=too-many-arguments, too-many-l
             PC: ndarray,
             PDF: ndarray,
             CC: ndarray,
-            CBH: ndarray):
+            CBH: ndarray,
+            out: ndarray = None,
+            workspace: Workspace = None,
+            dtype=None,
+            approx: bool = False,
+            partition: FuelPartition = None,
+            backend: str = None):
     """
     Computes the Rate of Spread prediction based on fuel type and FWI
     conditions. Equations are from listed FCFDG (1992) and Wotton et. al.
@@ -98,7 +168,7 @@ def ROScalc(FUELTYPE: ndarray,  # pylint: disable=too-many-arguments, too-many-l
     Canada. Information Report GLC-X-10, 45p.
 
     Keyword arguments:
-    FUELTYPE -- The Fire Behaviour Prediction FuelType
+    FUELTYPE -- The Fire Behaviour Prediction FuelType (strings or FuelType codes)
     ISI -- Intiial Spread Index
     BUI -- Buildup Index
     FMC -- Foliar Moisture Content
@@ -107,12 +177,76 @@ def ROScalc(FUELTYPE: ndarray,  # pylint: disable=too-many-arguments, too-many-l
     PDF -- Percent Dead Balsam Fir (%)
     CC -- Constant
     CBH -- Crown to base height(m)
+    out -- Optional array to write the result to
+    workspace -- Optional Workspace to reuse scratch arrays from
+    dtype -- np.float64 or np.float32 (default: see pycffdrs.workspace)
+    approx -- Approximate the Initial Rate of Spread (see RSIcalc), for all fuel types but C6
+    partition -- Optional FuelPartition that all inputs are ordered by, to calculate by fuel
+                 type (see pycffdrs.partition). Inputs not in its order raise ValueError.
+    backend -- numpy, numexpr, numba or auto (default: see pycffdrs.backends), for all fuel
+               types but C6. Approximation and partitions are only done with numpy.
     Returns:
     ROS: Rate of spread (m/min)
     """
-    result = np.empty(len(FUELTYPE))
-    for i, (
-            _FUELTYPE, _ISI, _BUI, _FMC, _SFC, _PC, _PDF, _CC, _CBH) in enumerate(
-                zip(FUELTYPE, ISI, BUI, FMC, SFC, PC, PDF, CC, CBH)):
-        result[i] = _ROScalc(_FUELTYPE, _ISI, _BUI, _FMC, _SFC, _PC, _PDF, _CC, _CBH)
-    return result
+    check_order(partition, FUELTYPE, ISI, BUI, FMC, SFC, PC, PDF, CC, CBH)
+    FUELTYPE = fuel_codes(FUELTYPE)
+    dtype = float_dtype(dtype)
+    FUELTYPE, ISI, BUI, FMC, SFC, PC, PDF, CC, CBH = broadcast(
+        FUELTYPE, *as_arrays(ISI, BUI, FMC, SFC, PC, PDF, CC, CBH, dtype=dtype))
+    workspace = workspace_or_new(workspace)
+    backend = 'numpy' if approx or partition is not None else backends.resolve(backend)
+    if backend != 'numpy':
+        ROS = backends.ros(backend, FUELTYPE, ISI, BUI, PC, PDF, CC,
+                           output(out, FUELTYPE.shape, dtype), workspace)
+        return _C6ROScalc(FUELTYPE, ISI, BUI, FMC, SFC, CBH, ROS, workspace, dtype)
+    BE = BEcalc(FUELTYPE, BUI, out, workspace, dtype, partition)
+    return _ROScalc(FUELTYPE, BE, ISI, BUI, FMC, SFC, PC, PDF, CC, CBH, BE, workspace, dtype,
+                    approx, partition)
+
+
+def _ROScalc(FUELTYPE: ndarray,  # pylint: disable=too-many-arguments, too-many-locals
+             BE: ndarray,
+             ISI: ndarray,
+             BUI: ndarray,
+             FMC: ndarray,
+             SFC: ndarray,
+             PC: ndarray,
+             PDF: ndarray,
+             CC: ndarray,
+             CBH: ndarray,
+             out: ndarray,
+             workspace: Workspace,
+             dtype: np.dtype,
+             approx: bool = False,
+             partition: FuelPartition = None) -> ndarray:
+    """ ROScalc, given the Buildup Effect BE (out may be BE). """
+    RSI, = workspace.scratch('ROScalc', 1, FUELTYPE.shape, dtype)
+    ROS = output(out, BE.shape, dtype)
+    np.multiply(BE, RSIcalc(FUELTYPE, ISI, PC, PDF, CC, RSI, dtype, approx, partition),
+                out=ROS)
+    return _C6ROScalc(FUELTYPE, ISI, BUI, FMC, SFC, CBH, ROS, workspace, dtype, partition)
+
+
+def _C6ROScalc(FUELTYPE: ndarray,  # pylint: disable=too-many-arguments
+               ISI: ndarray,
+               BUI: ndarray,
+               FMC: ndarray,
+               SFC: ndarray,
+               CBH: ndarray,
+               ROS: ndarray,
+               workspace: Workspace,
+               dtype: np.dtype,
+               partition: FuelPartition = None) -> ndarray:
+    """ ROScalc's C6 elements, and lower limit, given the other elements' ROS. """
+    # C6 has its own spread rate calculation, which includes crowning
+    mask = select(FUELTYPE, partition, FuelType.C6)
+    C6 = FUELTYPE[mask]
+    if C6.size:
+        # Imported here, so that importing ROScalc doesn't import C6calc and CFBcalc
+        from pycffdrs.C6calc import C6calc  # pylint: disable=import-outside-toplevel
+        ROS[mask] = C6calc(C6, ISI[mask], BUI[mask], FMC[mask], SFC[mask],
+                           CBH[mask], option="ROS", workspace=workspace,
+                           dtype=dtype)
+    negative, = workspace.scratch('ROScalc', 1, ROS.shape, bool)
+    np.copyto(ROS, 0.000001, where=np.less(ROS, 0, out=negative))
+    return ROS
@@ -0,0 +1,76 @@
+"""
+All code and comments based on the R project: https://cran.r-project.org/package=cffdrs
+"""
+from numpy import ndarray
+import numpy as np
+from pycffdrs.fueltypes import FuelType, fuel_codes
+from pycffdrs.instrument import instrumented
+from pycffdrs.workspace import Workspace, as_arrays, output, workspace_or_new
+
+
+@instrumented
+def TFCcalc(  # pylint: disable=too-many-arguments
+        FUELTYPE: ndarray,
+        CFL: ndarray,
+        CFB: ndarray,
+        SFC: ndarray,
+        PC: ndarray,
+        PDF: ndarray,
+        option: str = "TFC",
+        out: ndarray = None,
+        workspace: Workspace = None):
+    """
+     Description:
+       Calculate Total Fuel Consumption (TFC), or if specified by the option
+       parameter, the Crown Fuel Consumption (CFC).
+
+       All variables names are laid out in the same manner as Forestry Canada
+       Fire Danger Group (FCFDG) (1992). Development and Structure of the
+       Canadian Forest Fire Behavior Prediction System." Technical Report
+       ST-X-3, Forestry Canada, Ottawa, Ontario.
+
+     Args:
+       FUELTYPE: The Fire Behaviour Prediction FuelType (strings or FuelType codes)
+       CFL:      Crown Fuel Load (kg/m^2)
+       CFB:      Crown Fraction Burned (0-1)
+       SFC:      Surface Fuel Consumption (kg/m^2)
+       PC:       Percent Conifer (%)
+       PDF:      Percent Dead Balsam Fir (%)
+       option:   Type of output (TFC, CFC, default=TFC)
+       out:      Optional array to write the result to
+       workspace: Optional Workspace to reuse scratch arrays from
+
+     Returns:
+       TFC:      Total (Surface + Crown) Fuel Consumption (kg/m^2)
+       OR
+       CFC:      Crown Fuel Consumption (kg/m^2)
+    """
+    FUELTYPE = fuel_codes(FUELTYPE)
+    CFL, CFB, SFC, PC, PDF = as_arrays(CFL, CFB, SFC, PC, PDF)
+    shape = np.broadcast(FUELTYPE, CFL, CFB, PC, PDF).shape
+    workspace = workspace_or_new(workspace)
+    CFC, t = workspace.scratch('TFCcalc', 2, shape)
+    mixedwood, mask = workspace.scratch('TFCcalc', 2, shape, bool)
+    if option == "CFC":
+        CFC = output(out, shape)
+    # Eq. 66a (Wotton 2009) - Crown Fuel Consumption (CFC)
+    np.multiply(CFL, CFB, out=CFC)
+    # Eq. 66b & 66c (Wotton 2009) - Mixedwood types only consume their conifer component
+    # CFC = np.where(M1 or M2, PC / 100 * CFC, np.where(M3 or M4, PDF / 100 * CFC, CFC))
+    np.equal(FUELTYPE, FuelType.M1, out=mixedwood)
+    np.logical_or(mixedwood, np.equal(FUELTYPE, FuelType.M2, out=mask), out=mixedwood)
+    np.divide(PC, 100, out=t)
+    np.multiply(t, CFC, out=t)
+    np.copyto(CFC, t, where=mixedwood)
+    np.equal(FUELTYPE, FuelType.M3, out=mixedwood)
+    np.logical_or(mixedwood, np.equal(FUELTYPE, FuelType.M4, out=mask), out=mixedwood)
+    np.divide(PDF, 100, out=t)
+    np.multiply(t, CFC, out=t)
+    np.copyto(CFC, t, where=mixedwood)
+    # Return CFC if requested
+    if option == "CFC":
+        return CFC
+    # Eq. 67 (FCFDG 1992) - Total Fuel Consumption
+    TFC = output(out, np.broadcast(SFC, CFC).shape)
+    np.add(SFC, CFC, out=TFC)
+    return TFC
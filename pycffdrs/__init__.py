@@ -1,3 +1,60 @@
 """ pycffdrs module
+
+The main classes, and the calculators not named after their module, are available from the
+package itself:
+
+    import pycffdrs
+    weather = pycffdrs.DailyFWI(...)
+    RSI = pycffdrs.RSIcalc(FUELTYPE, ISI, PC, PDF, CC)
+
+Modules are available from the package as well, so the calculators named after their module
+are pycffdrs.ROScalc.ROScalc, pycffdrs.fbp.fbp, ... (or from pycffdrs.ROScalc import ROScalc).
+
+Importing pycffdrs imports nothing else (not even NumPy). Each name's module is imported the
+first time the name is used, so a program only pays for the calculators it calls.
 """
+import importlib
+
 __version__ = '0.0.6'
+
+# The module of each name available from the package. Names of modules are left out, so that
+# pycffdrs.<module> is always the module.
+_EXPORTS = {
+    'D0calc': 'FMCcalc',
+    'RSIcalc': 'ROScalc',
+    'hffmcCalc': 'hffmc',
+    'FuelType': 'fueltypes',
+    'Workspace': 'workspace',
+    'DailyFWI': 'dailyfwi',
+    'HourlyFFMC': 'hffmc',
+    'Forecast': 'incremental',
+    'FuelPartition': 'partition',
+    'CoarseWeather': 'multiscale',
+    'Batcher': 'batching',
+    'Executor': 'parallel',
+    'perimeters': 'perimeter',
+    'perimeter_chunks': 'perimeter',
+}
+
+__all__ = ['__version__', *_EXPORTS]
+
+
+def __getattr__(name: str):
+    """ A name from _EXPORTS, or a submodule, imported on first use. """
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f'{__name__}.{_EXPORTS[name]}'), name)
+    elif not name.startswith('__'):
+        try:
+            value = importlib.import_module(f'{__name__}.{name}')
+        except ModuleNotFoundError as error:
+            if error.name != f'{__name__}.{name}':
+                raise
+            raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,303 @@
+"""
+Fused evaluation of the calculators' expressions.
+
+The calculators evaluate their equations one NumPy ufunc at a time, so every operator is a
+full pass over memory. ffmcCalc, ISIcalc and ROScalc can instead evaluate each element's
+whole expression at once, in one of these backends:
+
+    numpy   -- NumPy ufuncs, one operator at a time (the default)
+    numexpr -- The expressions compiled by numexpr, evaluated in cache sized blocks on all
+               cores
+    numba   -- The equations compiled by numba into ufuncs, one element at a time
+    auto    -- numba if it is installed, else numexpr if it is installed, else numpy
+
+numexpr and numba are optional, and only imported when their backend is first used. The
+backend is chosen per call (backend="numba"), for the package with set_backend, or at import
+time with the PYCFFDRS_BACKEND environment variable.
+
+The fused backends use their own exp and pow, and (numexpr) their own order of operations,
+so results may differ from NumPy's in the last bits. They compute in float64, and write
+float32 outputs where the calculators compute in float32. Approximations (approx=True) and
+fuel type partitions are only available with NumPy. The numba backend runs on one core: to
+use more, split calls across workers with pycffdrs.parallel.Executor.
+"""
+import importlib
+import importlib.util
+import math
+import os
+from functools import lru_cache
+from typing import Callable, Tuple
+from numpy import ndarray
+import numpy as np
+from pycffdrs.fueltypes import FUEL_PARAMETERS, FuelType
+from pycffdrs.workspace import Workspace, workspace_or_new
+
+BACKENDS = ('numpy', 'numexpr', 'numba')
+
+# Preferred order of the fused backends, for 'auto'
+_FUSED = ('numba', 'numexpr')
+
+_backend = os.environ.get('PYCFFDRS_BACKEND', 'numpy')
+
+
+@lru_cache(maxsize=None)
+def _installed(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def available() -> Tuple[str, ...]:
+    """ The backends that can be used here (numpy, and whichever optional ones are
+    installed). """
+    return tuple(name for name in BACKENDS if name == 'numpy' or _installed(name))
+
+
+def resolve(name: str = None) -> str:
+    """
+    The backend to calculate with: name, or the package wide setting if None.
+
+    Raises:
+    ValueError for an unknown backend, ImportError for one that is not installed.
+    """
+    name = _backend if name is None else name
+    if name == 'numpy':
+        return name
+    if name == 'auto':
+        return next((fused for fused in _FUSED if _installed(fused)), 'numpy')
+    if name not in BACKENDS:
+        raise ValueError(f'Unknown backend {name}, expected one of {BACKENDS} or auto')
+    if not _installed(name):
+        raise ImportError(f'The {name} backend needs {name} to be installed')
+    return name
+
+
+def set_backend(name: str) -> str:
+    """
+    Set the backend that calculators use, when not given per call.
+
+    Returns:
+    The previous backend, e.g. to restore it later.
+
+    Raises:
+    ValueError for an unknown backend, ImportError for one that is not installed.
+    """
+    global _backend  # pylint: disable=global-statement
+    resolve(name)
+    previous, _backend = _backend, name
+    return previous
+
+
+# Per fuel FBP constants, as tuples of Python floats indexed by FuelType code (which numba
+# compiles as constants)
+_a, _b, _c0, _BUIo, _Q50log = (tuple(FUEL_PARAMETERS[name].tolist()) for name in
+                               ('a', 'b', 'c0', 'BUIo', 'Q50log'))
+_C2, _D1, _M1, _M2, _M3, _M4, _O1A, _O1B = (
+    FuelType.C2.value, FuelType.D1.value, FuelType.M1.value, FuelType.M2.value,
+    FuelType.M3.value, FuelType.M4.value, FuelType.O1A.value, FuelType.O1B.value)
+
+
+def _ffmc(ffmc_yda: float, temp: float, rh: float, ws: float, prec: float) -> float:
+    """ ffmcCalc, for one element. """
+    # pylint: disable=too-many-arguments, too-many-locals
+    # Eq. 1
+    wmo = 147.2 * (101 - ffmc_yda) / (59.5 + ffmc_yda)
+    # Eqs. 2, 3a & 3b Rain
+    if prec > 0.5:
+        ra = prec - 0.5
+        rain = 42.5 * ra * math.exp(-100 / (251 - wmo)) * (1 - math.exp(-6.93 / ra))
+        if wmo > 150:
+            wmo = wmo + 0.0015 * (wmo - 150) * (wmo - 150) * math.sqrt(ra)
+        wmo = wmo + rain
+    wmo = min(wmo, 250.0)
+    # Eqs. 4 & 5 Equilibrium moisture content from drying and wetting
+    t1 = math.exp((rh - 100) / 10)
+    t2 = 0.18 * (21.1 - temp) * (1 - 1 / math.exp(rh * 0.115))
+    ed = 0.942 * rh ** 0.679 + 11 * t1 + t2
+    ew = 0.618 * rh ** 0.753 + 10 * t1 + t2
+    sws = 0.0694 * math.sqrt(ws)
+    etemp = math.exp(0.0365 * temp)
+    wm = wmo
+    if wmo < ed and wmo < ew:
+        # Eqs. 6a, 6b & 8 Drying
+        t1 = (100 - rh) / 100
+        x = (0.424 * (1 - t1 ** 1.7) + sws * (1 - t1 ** 8.0)) * 0.581 * etemp
+        wm = ew - (ew - wmo) / 10.0 ** x
+    if wmo > ed:
+        # Eqs. 7a, 7b & 9 Wetting
+        t1 = rh / 100
+        x = (0.424 * (1 - t1 ** 1.7) + sws * (1 - t1 ** 8.0)) * 0.581 * etemp
+        wm = ed + (wmo - ed) / 10.0 ** x
+    # Eq. 10
+    result = 59.5 * (250 - wm) / (147.2 + wm)
+    return max(min(result, 101.0), 0.0)
+
+
+def _isi(ffmc: float, ws: float, fbpMod: bool) -> float:
+    """ ISIcalc, for one element. """
+    # pylint: disable=redefined-outer-name
+    # Eqs. 10 & 25 - Fine Fuel Moisture
+    fm = 147.2 * (101 - ffmc) / (59.5 + ffmc)
+    fF = 91.9 * math.exp(-0.1386 * fm) * (1 + fm ** 5.31 / 49300000)
+    # Eqs. 24 & 53a - Wind Effect
+    if ws >= 40 and fbpMod:
+        fW = 12 * (1 - math.exp(-0.0818 * (ws - 28)))
+    else:
+        fW = math.exp(0.05039 * ws)
+    # Eq. 26 - Spread Index Equation
+    return 0.208 * fW * fF
+
+
+def _ros(fuel: int, ISI: float, BUI: float, PC: float, PDF: float, CC: float) -> float:
+    """ ROScalc for one element, but for C6, without the lower limit. """
+    # pylint: disable=too-many-arguments
+
+    def curve(fuel: int) -> float:
+        # Eq. 26 (FCFDG 1992) - Initial Rate of Spread
+        return _a[fuel] * (1 - math.exp(-_b[fuel] * ISI)) ** _c0[fuel]
+    # Eq. 54 (FCFDG 1992) The Buildup Effect
+    BE = 1.0
+    if BUI > 0 and _BUIo[fuel] > 0:
+        BE = math.exp(_Q50log[fuel] * (1 / BUI - 1 / _BUIo[fuel]))
+    # Eqs. 27 (FCFDG 1992) and 30 & 33 (Wotton et. al 2009) - Mixedwood types
+    if fuel == _M1:
+        RSI = PC / 100 * curve(_C2) + (100 - PC) / 100 * curve(_D1)
+    elif fuel == _M2:
+        RSI = PC / 100 * curve(_C2) + 0.2 * (100 - PC) / 100 * curve(_D1)
+    elif fuel == _M3:
+        RSI = PDF / 100 * curve(_M3) + (1 - PDF / 100) * curve(_D1)
+    elif fuel == _M4:
+        RSI = PDF / 100 * curve(_M4) + 0.2 * (1 - PDF / 100) * curve(_D1)
+    else:
+        RSI = curve(fuel)
+        if fuel in (_O1A, _O1B):
+            # Eqs. 35b (Wotton et. al. 2009) & 36 (FCFDG 1992) - Grass
+            if CC < 58.8:
+                RSI = RSI * (0.005 * (math.exp(0.061 * CC) - 1))
+            else:
+                RSI = RSI * (0.176 + 0.02 * (CC - 58.8))
+    return BE * RSI
+
+
+@lru_cache(maxsize=None)
+def _numba(kernel: Callable, signature: str) -> Callable:
+    """
+    kernel, compiled by numba into a ufunc, for float64 and float32 output. The ufunc is
+    single threaded: numba's threading layers are either not fork safe (so they break
+    pycffdrs.parallel's worker processes) or not thread safe.
+    """
+    numba = importlib.import_module('numba')
+    signatures = [f'float64({signature.format("float64")})',
+                  f'float32({signature.format("float32")})']
+    return numba.vectorize(signatures, nopython=True)(kernel)
+
+
+def _constant(value: float) -> str:
+    return repr(float(value))
+
+
+def _curve(fuel: int, ISI: str = 'ISI') -> str:
+    """ Eq. 26 of one fuel type, as a numexpr expression. """
+    return (f'{_constant(_a[fuel])} * (1 - exp({_constant(-_b[fuel])} * {ISI})) '
+            f'** {_constant(_c0[fuel])}')
+
+
+# The calculators' equations, as numexpr expressions
+_EXPRESSIONS = {
+    # Eq. 1, and Eqs. 2, 3a & 3b where it rains, capped at 250
+    'wmo': '147.2 * (101 - ffmc_yda) / (59.5 + ffmc_yda)',
+    'rain': 'where(prec > 0.5, where(wmo > 150, wmo + 0.0015 * (wmo - 150) * (wmo - 150) * '
+            'sqrt(prec - 0.5), wmo) + 42.5 * (prec - 0.5) * exp(-100 / (251 - wmo)) * '
+            '(1 - exp(-6.93 / (prec - 0.5))), wmo)',
+    'cap': 'where(wmo > 250, 250, wmo)',
+    # Eqs. 4 & 5
+    'ed': '0.942 * rh ** 0.679 + 11 * exp((rh - 100) / 10) + '
+          '0.18 * (21.1 - temp) * (1 - 1 / exp(rh * 0.115))',
+    'ew': '0.618 * rh ** 0.753 + 10 * exp((rh - 100) / 10) + '
+          '0.18 * (21.1 - temp) * (1 - 1 / exp(rh * 0.115))',
+    # Eqs. 6a, 6b & 8 where drying, 7a, 7b & 9 where wetting
+    'wm': 'where((wmo < ed) & (wmo < ew), ew - (ew - wmo) / 10 ** ((0.424 * (1 - '
+          '((100 - rh) / 100) ** 1.7) + 0.0694 * sqrt(ws) * (1 - ((100 - rh) / 100) ** 8)) '
+          '* 0.581 * exp(0.0365 * temp)), where(wmo > ed, ed + (wmo - ed) / 10 ** ((0.424 * '
+          '(1 - (rh / 100) ** 1.7) + 0.0694 * sqrt(ws) * (1 - (rh / 100) ** 8)) * 0.581 * '
+          'exp(0.0365 * temp)), wmo))',
+    # Eq. 10, within [0, 101]
+    'ffmc': 'where(59.5 * (250 - wm) / (147.2 + wm) > 101, 101, where(59.5 * (250 - wm) / '
+            '(147.2 + wm) < 0, 0, 59.5 * (250 - wm) / (147.2 + wm)))',
+    # Eqs. 10, 24, 25, 26 & 53a
+    'isi': '0.208 * where((ws >= 40) & fbpMod, 12 * (1 - exp(-0.0818 * (ws - 28))), '
+           'exp(0.05039 * ws)) * (91.9 * exp(-0.1386 * (147.2 * (101 - ffmc) / (59.5 + ffmc))) '
+           '* (1 + (147.2 * (101 - ffmc) / (59.5 + ffmc)) ** 5.31 / 49300000))',
+    # Eq. 54, and Eqs. 26, 27, 30, 33, 35b & 36, but for C6
+    'ros': 'where((BUI > 0) & (BUIo > 0), exp(Q50log * (1 / BUI - 1 / BUIo)), 1) * '
+           f'where(fuel == {_M1}, PC / 100 * {_curve(_C2)} + (100 - PC) / 100 * {_curve(_D1)}, '
+           f'where(fuel == {_M2}, PC / 100 * {_curve(_C2)} + 0.2 * (100 - PC) / 100 * '
+           f'{_curve(_D1)}, where(fuel == {_M3}, PDF / 100 * {_curve(_M3)} + (1 - PDF / 100) * '
+           f'{_curve(_D1)}, where(fuel == {_M4}, PDF / 100 * {_curve(_M4)} + 0.2 * '
+           f'(1 - PDF / 100) * {_curve(_D1)}, a * (1 - exp(-b * ISI)) ** c0 * '
+           f'where((fuel == {_O1A}) | (fuel == {_O1B}), where(CC < 58.8, '
+           '0.005 * (exp(0.061 * CC) - 1), 0.176 + 0.02 * (CC - 58.8)), 1)))))',
+}
+
+
+def _evaluate(name: str, out: ndarray, **values: ndarray) -> ndarray:
+    """ Evaluate one of _EXPRESSIONS with numexpr, into out. """
+    numexpr = importlib.import_module('numexpr')
+    return numexpr.evaluate(_EXPRESSIONS[name], local_dict=values, out=out,
+                            casting='same_kind')
+
+
+def ffmc(name: str,  # pylint: disable=too-many-arguments
+         ffmc_yda: ndarray,
+         temp: ndarray,
+         rh: ndarray,
+         ws: ndarray,
+         prec: ndarray,
+         out: ndarray,
+         workspace: Workspace = None) -> ndarray:
+    """ ffmcCalc, in the fused backend name, into out (of the inputs' broadcast shape). """
+    if name == 'numba':
+        kernel = _numba(_ffmc, '{0}, {0}, {0}, {0}, {0}')
+        return kernel(ffmc_yda, temp, rh, ws, prec, out=out)
+    wmo, rain, ed, ew, wm = workspace_or_new(workspace).scratch('backends.ffmc', 5, out.shape,
+                                                                np.float64)
+    values = {'ffmc_yda': ffmc_yda, 'temp': temp, 'rh': rh, 'ws': ws, 'prec': prec}
+    _evaluate('wmo', wmo, **values)
+    _evaluate('rain', rain, wmo=wmo, prec=prec)
+    _evaluate('cap', wmo, wmo=rain)
+    _evaluate('ed', ed, **values)
+    _evaluate('ew', ew, **values)
+    _evaluate('wm', wm, wmo=wmo, ed=ed, ew=ew, **values)
+    return _evaluate('ffmc', out, wm=wm)
+
+
+def isi(name: str, ffmc: ndarray, ws: ndarray, fbpMod: ndarray, out: ndarray) -> ndarray:
+    """ ISIcalc, in the fused backend name, into out (of the inputs' broadcast shape). """
+    # pylint: disable=redefined-outer-name
+    fbpMod = np.equal(fbpMod, True)
+    if name == 'numba':
+        return _numba(_isi, '{0}, {0}, boolean')(ffmc, ws, fbpMod, out=out)
+    return _evaluate('isi', out, ffmc=ffmc, ws=ws, fbpMod=np.broadcast_to(fbpMod, out.shape))
+
+
+def ros(name: str,  # pylint: disable=too-many-arguments
+        FUELTYPE: ndarray,
+        ISI: ndarray,
+        BUI: ndarray,
+        PC: ndarray,
+        PDF: ndarray,
+        CC: ndarray,
+        out: ndarray,
+        workspace: Workspace = None) -> ndarray:
+    """ ROScalc but for C6, without the lower limit, in the fused backend name, into out (of
+    the inputs' broadcast shape). """
+    if name == 'numba':
+        return _numba(_ros, 'uint8, {0}, {0}, {0}, {0}, {0}')(FUELTYPE, ISI, BUI, PC, PDF, CC,
+                                                              out=out)
+    FUELTYPE = np.broadcast_to(FUELTYPE, out.shape)
+    workspace = workspace_or_new(workspace)
+    parameters = workspace.scratch('backends.ros', 5, out.shape, np.float64)
+    for parameter, value in zip(('a', 'b', 'c0', 'BUIo', 'Q50log'), parameters):
+        np.take(FUEL_PARAMETERS[parameter], FUELTYPE, out=value)
+    fuel, = workspace.scratch('backends.ros', 1, out.shape, np.int32)
+    np.copyto(fuel, FUELTYPE)
+    return _evaluate('ros', out, fuel=fuel, ISI=ISI, BUI=BUI, PC=PC, PDF=PDF, CC=CC,
+                     **dict(zip(('a', 'b', 'c0', 'BUIo', 'Q50log'), parameters)))
@@ -0,0 +1,130 @@
+"""
+Micro-batching of single point requests, for online serving.
+
+A web service receives points one request at a time, so calling a calculator per request
+never benefits from vectorization. Batcher gathers concurrent single point calls, on an
+asyncio event loop, for up to a time window or a batch size, makes one vectorized calculator
+call per batch, and resolves each caller's future with its own element of the result:
+
+    ros = Batcher(ROScalc, window=0.002, max_size=4096)
+
+    async def handle(request):
+        return await ros(request.fuel, request.isi, request.bui, ...)
+
+The window bounds the latency a request can gain by waiting for others. Results are the
+same as calling the calculator for each point on its own.
+"""
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Tuple
+import numpy as np
+
+# Signature of a call: the number of positional arguments, and the names of the keyword
+# arguments. Only calls with the same signature are batched together.
+_Signature = Tuple[int, Tuple[str, ...]]
+
+
+class _Batch:  # pylint: disable=too-few-public-methods
+    """ Calls waiting to be calculated together, and the timer that flushes them. """
+
+    def __init__(self):
+        self.calls: List[Tuple[tuple, dict, asyncio.Future]] = []
+        self.timer: asyncio.TimerHandle = None
+
+
+class Batcher:  # pylint: disable=too-many-instance-attributes
+    """
+    Coalesces single point calls to a calculator into vectorized calls.
+
+    Keyword arguments:
+    function -- A calculator, taking arrays of points and returning an array, or a dictionary
+                of arrays (e.g. fbp), with one element per point
+    window -- Longest time (seconds) a call waits for others to join its batch
+    max_size -- Largest batch: a batch is calculated as soon as it is this large
+    executor -- Optional concurrent.futures Executor to calculate batches in, so that the
+                event loop is not blocked while a batch is calculated (default: calculate on
+                the event loop)
+    options -- Further keyword arguments for every call of function (e.g. fbpMod=True)
+
+    Each call takes one point's arguments (scalars, or strings for FUELTYPE), positionally or
+    by name, and returns that point's result: a NumPy scalar, or a dictionary of them.
+    Arguments that are the same for every point are better given as options.
+    """
+
+    def __init__(self,  # pylint: disable=too-many-arguments
+                 function: Callable,
+                 window: float = 0.002,
+                 max_size: int = 1024,
+                 executor: Executor = None,
+                 **options):
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1')
+        self.function = function
+        self.window = window
+        self.max_size = max_size
+        self.executor = executor
+        self.options = options
+        # Number of points and of vectorized calls so far
+        self.calls = 0
+        self.batches = 0
+        self._pending: Dict[_Signature, _Batch] = {}
+        self._running: List[asyncio.Task] = []
+
+    async def __call__(self, *args, **kwargs) -> Any:
+        """ Calculate one point, in a batch with the other points that arrive meanwhile. """
+        loop = asyncio.get_running_loop()
+        signature = (len(args), tuple(sorted(kwargs)))
+        batch = self._pending.get(signature)
+        if batch is None:
+            batch = self._pending[signature] = _Batch()
+            batch.timer = loop.call_later(self.window, self._flush, signature)
+        future = loop.create_future()
+        batch.calls.append((args, kwargs, future))
+        if len(batch.calls) >= self.max_size:
+            self._flush(signature)
+        return await future
+
+    def _flush(self, signature: _Signature):
+        """ Start calculating the batch of a signature. """
+        batch = self._pending.pop(signature, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        task = asyncio.get_running_loop().create_task(self._calculate(signature, batch))
+        self._running.append(task)
+        task.add_done_callback(self._running.remove)
+
+    async def flush(self):
+        """ Calculate all waiting calls now, and wait for every batch in progress. """
+        for signature in list(self._pending):
+            self._flush(signature)
+        await asyncio.gather(*self._running)
+
+    def _call(self, args: List[np.ndarray], kwargs: Dict[str, np.ndarray]):
+        return self.function(*args, **kwargs, **self.options)
+
+    async def _calculate(self, signature: _Signature, batch: _Batch):
+        """ Calculate a batch with one vectorized call, and resolve its futures. """
+        count, names = signature
+        calls = batch.calls
+        # One array per argument, of the values of every point in the batch
+        args = [np.array([call[0][index] for call in calls]) for index in range(count)]
+        kwargs = {name: np.array([call[1][name] for call in calls]) for name in names}
+        self.calls += len(calls)
+        self.batches += 1
+        try:
+            if self.executor is None:
+                result = self._call(args, kwargs)
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self._call, args, kwargs)
+        except Exception as error:  # pylint: disable=broad-except
+            for *_, future in calls:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for index, (*_, future) in enumerate(calls):
+            # The caller may have given up waiting (e.g. on a timeout)
+            if not future.done():
+                future.set_result({name: value[index] for name, value in result.items()}
+                                  if isinstance(result, dict) else result[index])
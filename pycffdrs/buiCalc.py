@@ -22,21 +22,60 @@ Headquarters, Ottawa. Forestry Technical Report 35. 35 p."
 """
 from numpy import ndarray
 import numpy as np
+from pycffdrs.instrument import instrumented
+from pycffdrs.workspace import Workspace, as_arrays, float_dtype, output, workspace_or_new
 
 
-def buiCalc(dmc: ndarray, dc: ndarray) -> ndarray:
+@instrumented
+def buiCalc(dmc: ndarray,
+            dc: ndarray,
+            out: ndarray = None,
+            workspace: Workspace = None,
+            dtype=None) -> ndarray:
     """
     Keyword arguments:
     dc -- Drought Code
     dmc -- Duff Moisture Code
+    out -- Optional array to write the result to (may be dmc or dc)
+    workspace -- Optional Workspace to reuse scratch arrays from
+    dtype -- np.float64 or np.float32 (default: see pycffdrs.workspace)
     """
-    # Eq. 27a
-    bui1 = np.where((dmc == 0) & (dc == 0), 0, 0.8 * dc * dmc/(dmc + 0.4 * dc))
-    # Eq. 27b - next 3 lines
-    p = np.where(dmc == 0, 0, (dmc - bui1)/dmc)
-    cc = 0.92 + pow((0.0114 * dmc), 1.7)
-    bui0 = dmc - cc * p
+    dtype = float_dtype(dtype)
+    dmc, dc = as_arrays(dmc, dc, dtype=dtype)
+    shape = np.broadcast(dmc, dc).shape
+    workspace = workspace_or_new(workspace)
+    bui1, p, t = workspace.scratch('buiCalc', 3, shape, dtype)
+    zero, dmc_zero, mask = workspace.scratch('buiCalc', 3, shape, bool)
+    # Eq. 27a, only evaluated where dmc and dc are not both 0
+    # bui1 = np.where((dmc == 0) & (dc == 0), 0, 0.8 * dc * dmc/(dmc + 0.4 * dc))
+    np.equal(dmc, 0, out=dmc_zero)
+    np.logical_and(dmc_zero, np.equal(dc, 0, out=mask), out=zero)
+    np.logical_not(zero, out=mask)
+    np.multiply(0.8, dc, out=bui1, where=mask)
+    np.multiply(bui1, dmc, out=bui1, where=mask)
+    np.multiply(0.4, dc, out=t, where=mask)
+    np.add(dmc, t, out=t, where=mask)
+    np.divide(bui1, t, out=bui1, where=mask)
+    np.copyto(bui1, 0, where=zero)
+    # Eq. 27b - next 3 lines, only evaluated where dmc is not 0
+    # p = np.where(dmc == 0, 0, (dmc - bui1)/dmc)
+    np.logical_not(dmc_zero, out=mask)
+    np.subtract(dmc, bui1, out=p, where=mask)
+    np.divide(p, dmc, out=p, where=mask)
+    np.copyto(p, 0, where=dmc_zero)
+    # cc = 0.92 + pow((0.0114 * dmc), 1.7)
+    np.multiply(0.0114, dmc, out=t)
+    np.power(t, 1.7, out=t)
+    np.add(0.92, t, out=t)
+    # bui0 = dmc - cc * p
+    bui0 = t
+    np.multiply(t, p, out=bui0)
+    np.subtract(dmc, bui0, out=bui0)
     # Constraints
-    bui0 = np.where(bui0 < 0, 0, bui0)
-    bui1 = np.where(bui1 < dmc, bui0, bui1)
-    return bui1
+    np.maximum(bui0, 0, out=bui0)
+    # bui1 = np.where(bui1 < dmc, bui0, bui1)
+    np.less(bui1, dmc, out=mask)
+    result = output(out, shape, dtype)
+    np.copyto(result, bui1)
+    np.copyto(result, bui0, where=mask)
+    return result
@@ -0,0 +1,130 @@
+"""
+Streaming daily Fire Weather Index engine.
+
+ffmcCalc, dmcCalc, dcCalc, ISIcalc, buiCalc and fwiCalc each calculate a single day. Running
+them over a long record for many stations means carrying yesterday's FFMC, DMC and DC from
+one day to the next. DailyFWI holds that state for all stations in preallocated arrays, and
+steps through weather that is fed to it in chunks of days, so that memory use is bounded
+by the chunk size rather than the length of the record.
+"""
+from typing import Dict, Iterable, Iterator, Mapping
+from numpy import ndarray
+import numpy as np
+from pycffdrs.ffmcCalc import ffmcCalc
+from pycffdrs.dmcCalc import dmcCalc
+from pycffdrs.dcCalc import dcCalc
+from pycffdrs.ISIcalc import ISIcalc
+from pycffdrs.buiCalc import buiCalc
+from pycffdrs.fwiCalc import fwiCalc
+from pycffdrs.workspace import Workspace, float_dtype
+
+# Daily FWI outputs, in the order the R fwi function reports them
+OUTPUTS = ('FFMC', 'DMC', 'DC', 'ISI', 'BUI', 'FWI')
+
+
+class DailyFWI:  # pylint: disable=too-many-instance-attributes
+    """
+    Daily FWI System stepping engine, for many stations at once.
+
+    Keyword arguments:
+    lat -- Latitude of each station (decimal degrees)
+    ffmc -- Initial (yesterday's) Fine Fuel Moisture Code, per station or for all stations
+    dmc -- Initial (yesterday's) Duff Moisture Code, per station or for all stations
+    dc -- Initial (yesterday's) Drought Code, per station or for all stations
+    lat_adjust -- Latitude adjustment of the DMC and DC day length factors
+
+    The engine computes in the package wide floating point type (see pycffdrs.workspace) at
+    the time it is created.
+    """
+
+    def __init__(self,  # pylint: disable=too-many-arguments
+                 lat: ndarray,
+                 ffmc: ndarray = 85,
+                 dmc: ndarray = 6,
+                 dc: ndarray = 15,
+                 lat_adjust: bool = True):
+        self.lat = np.array(lat, dtype=float_dtype())
+        self.lat_adjust = lat_adjust
+        # Yesterday's codes, carried from one day to the next
+        self.ffmc = np.empty_like(self.lat)
+        self.dmc = np.empty_like(self.lat)
+        self.dc = np.empty_like(self.lat)
+        self.ffmc[...] = ffmc
+        self.dmc[...] = dmc
+        self.dc[...] = dc
+        self._day = {name: np.empty_like(self.lat) for name in OUTPUTS}
+        self._chunk: Dict[str, ndarray] = {}
+        self._workspace = Workspace()
+
+    def step(self,  # pylint: disable=too-many-arguments
+             temp: ndarray,
+             rh: ndarray,
+             ws: ndarray,
+             prec: ndarray,
+             mon: ndarray,
+             out: Dict[str, ndarray] = None) -> Dict[str, ndarray]:
+        """
+        Advance all stations by one day.
+
+        Keyword arguments:
+        temp -- Temperature (centigrade), per station
+        rh -- Relative Humidity (%), per station
+        ws -- Wind Speed (km/h), per station
+        prec -- Precipitation (mm), per station
+        mon -- Month (1-12), per station or for all stations
+        out -- Optional dictionary of arrays (one per OUTPUTS name) to write the results to
+
+        Returns:
+        Dictionary of FFMC, DMC, DC, ISI, BUI and FWI arrays. Unless out is given, these
+        arrays belong to the engine and are overwritten by the next step.
+        """
+        if out is None:
+            out = self._day
+        workspace = self._workspace
+        ffmcCalc(self.ffmc, temp, rh, ws, prec, out=out['FFMC'], workspace=workspace)
+        dmcCalc(self.dmc, temp, rh, prec, self.lat, mon, self.lat_adjust, out=out['DMC'],
+                workspace=workspace)
+        dcCalc(self.dc, temp, rh, prec, self.lat, mon, self.lat_adjust, out=out['DC'],
+               workspace=workspace)
+        np.copyto(self.ffmc, out['FFMC'])
+        np.copyto(self.dmc, out['DMC'])
+        np.copyto(self.dc, out['DC'])
+        ISIcalc(self.ffmc, ws, out=out['ISI'], workspace=workspace)
+        buiCalc(self.dmc, self.dc, out=out['BUI'], workspace=workspace)
+        fwiCalc(out['ISI'], out['BUI'], out=out['FWI'], workspace=workspace)
+        return out
+
+    def _chunk_outputs(self, days: int) -> Dict[str, ndarray]:
+        """ (days, stations) output arrays, reused from one chunk to the next. """
+        if not self._chunk or len(self._chunk['FFMC']) < days:
+            self._chunk = {name: np.empty((days,) + self.lat.shape, dtype=self.lat.dtype)
+                           for name in OUTPUTS}
+        return {name: value[:days] for name, value in self._chunk.items()}
+
+    def run(self,
+            weather: Iterable[Mapping[str, ndarray]],
+            per_day: bool = False) -> Iterator[Dict[str, ndarray]]:
+        """
+        Step through weather, a chunk of days at a time.
+
+        Keyword arguments:
+        weather -- Iterable (e.g. a generator) of chunks. Each chunk maps temp, rh, ws and prec
+                   to (days, stations) arrays, and mon to a (days,) or (days, stations) array.
+        per_day -- Yield the outputs of every day, rather than of every chunk.
+
+        Yields:
+        Dictionary of FFMC, DMC, DC, ISI, BUI and FWI arrays, shaped (days, stations) for
+        each chunk, or (stations,) for each day if per_day. The arrays are reused for the
+        next chunk, so copy them if they need to outlive it.
+        """
+        for chunk in weather:
+            temp, rh, ws, prec, mon = (chunk[name] for name in
+                                       ('temp', 'rh', 'ws', 'prec', 'mon'))
+            outputs = self._chunk_outputs(len(temp))
+            for day, _temp in enumerate(temp):
+                result = self.step(_temp, rh[day], ws[day], prec[day], mon[day],
+                                   out={name: value[day] for name, value in outputs.items()})
+                if per_day:
+                    yield result
+            if not per_day:
+                yield outputs
@@ -0,0 +1,128 @@
+"""
+All code is based on the R project: https://cran.r-project.org/package=cffdrs
+
+Comments taken from the R project relating to this module are:
+
+"All code is based on a C code library that was written by Canadian
+Forest Service Employees, which was originally based on
+the Fortran code listed in the reference below. All equations
+in this code refer to that document.
+
+Equations and FORTRAN program for the Canadian Forest Fire
+Weather Index System. 1985. Van Wagner, C.E.; Pickett, T.L.
+Canadian Forestry Service, Petawawa National Forestry
+Institute, Chalk River, Ontario. Forestry Technical Report 33.
+18 p.
+
+Additional reference on FWI system
+
+Development and structure of the Canadian Forest Fire Weather
+Index System. 1987. Van Wagner, C.E. Canadian Forestry Service,
+Headquarters, Ottawa. Forestry Technical Report 35. 35 p."
+"""
+from numpy import ndarray
+import numpy as np
+from pycffdrs.instrument import instrumented
+from pycffdrs.workspace import Workspace, as_arrays, output, workspace_or_new
+
+# Day length factor for DC Calculations
+# 20N: North of 20 degrees N
+fl01 = np.array((-1.6, -1.6, -1.6, 0.9, 3.8, 5.8, 6.4, 5, 2.4, 0.4, -1.6, -1.6))
+# 20S: South of 20 degrees S
+fl02 = np.array((6.4, 5, 2.4, 0.4, -1.6, -1.6, -1.6, -1.6, -1.6, 0.9, 3.8, 5.8))
+
+
+@instrumented
+def dcCalc(dc_yda: ndarray,  # pylint: disable=too-many-arguments, too-many-locals
+           temp: ndarray,
+           rh: ndarray,  # pylint: disable=unused-argument
+           prec: ndarray,
+           lat: ndarray,
+           mon: ndarray,
+           lat_adjust: bool = True,
+           out: ndarray = None,
+           workspace: Workspace = None) -> ndarray:
+    """
+    Drought Code Calculation.
+
+    Keyword arguments:
+    dc_yda -- The Drought Code from previous iteration
+    temp -- Temperature (centigrade)
+    rh -- Relative Humidity (%), not used by the calculation, kept to match R
+    prec -- Precipitation (mm)
+    lat -- Latitude (decimal degrees)
+    mon -- Month (1-12)
+    lat_adjust -- Latitude adjustment (TRUE, FALSE, default=TRUE)
+    out -- Optional array to write the result to (may be dc_yda)
+    workspace -- Optional Workspace to reuse scratch arrays from
+
+    Returns:
+    Drought Code
+    """
+    dc_yda, temp, prec, lat = as_arrays(dc_yda, temp, prec, lat)
+    shape = np.broadcast(dc_yda, temp, prec, lat, mon).shape
+    workspace = workspace_or_new(workspace)
+    pe, evaporation, fl = workspace.scratch('dcCalc', 3, shape)
+    band, mask = workspace.scratch('dcCalc', 2, shape, bool)
+    # For the day length latitude adjustment
+    # (indexed by month as given, so that a single month needs no index array of shape)
+    mon = np.asarray(mon).astype(np.intp) - 1
+    # Constrain temperature
+    # temp = np.where(temp < -2.8, -2.8, temp)
+    np.copyto(evaporation, temp)
+    np.copyto(evaporation, -2.8, where=np.less(temp, -2.8, out=mask))
+    # Eq. 22 - Potential Evapotranspiration
+    # pe = (0.36 * (temp + 2.8) + fl01[mon]) / 2
+    np.add(evaporation, 2.8, out=evaporation)
+    np.multiply(0.36, evaporation, out=evaporation)
+    np.copyto(fl, fl01[mon])
+    np.add(evaporation, fl, out=pe)
+    np.divide(pe, 2, out=pe)
+    # Daylength factor adjustment by latitude for Potential Evapotranspiration
+    if lat_adjust:
+        # pe = np.where(lat <= -20, (0.36 * (temp + 2.8) + fl02[mon]) / 2, pe)
+        np.copyto(fl, fl02[mon])
+        np.add(evaporation, fl, out=fl)
+        np.divide(fl, 2, out=fl)
+        np.copyto(pe, fl, where=np.less_equal(lat, -20, out=band))
+        # pe = np.where((lat > -20) & (lat <= 20), (0.36 * (temp + 2.8) + 1.4) / 2, pe)
+        np.greater(lat, -20, out=band)
+        np.logical_and(band, np.less_equal(lat, 20, out=mask), out=band)
+        np.add(evaporation, 1.4, out=fl)
+        np.divide(fl, 2, out=fl)
+        np.copyto(pe, fl, where=band)
+    # Cap potential evapotranspiration at 0 for negative winter DC values
+    np.copyto(pe, 0, where=np.less(pe, 0, out=mask))
+    # Only apply the rain equations where there is enough rain, as they are undefined
+    # elsewhere (see fwiCalc).
+    rain = np.greater(prec, 2.8, out=band)
+    rw, smi = evaporation, fl
+    # Eq. 18 - Effective Rainfall
+    # rw = 0.83 * prec - 1.27
+    np.multiply(0.83, prec, out=rw, where=rain)
+    np.subtract(rw, 1.27, out=rw, where=rain)
+    # Eq. 19 - Moisture equivalent of the previous day's DC
+    # smi = 800 * exp(-1 * dc_yda / 400)
+    np.multiply(-1, dc_yda, out=smi, where=rain)
+    np.divide(smi, 400, out=smi, where=rain)
+    np.exp(smi, out=smi, where=rain)
+    np.multiply(800, smi, out=smi, where=rain)
+    # Alteration to Eq. 21 to calculate more accurately
+    # dr0 = dc_yda - 400 * log(1 + 3.937 * rw / smi)
+    dr0 = rw
+    np.multiply(3.937, rw, out=dr0, where=rain)
+    np.divide(dr0, smi, out=dr0, where=rain)
+    np.add(1, dr0, out=dr0, where=rain)
+    np.log(dr0, out=dr0, where=rain)
+    np.multiply(400, dr0, out=dr0, where=rain)
+    np.subtract(dc_yda, dr0, out=dr0, where=rain)
+    # Constrain dr0
+    np.copyto(dr0, 0, where=np.less(dr0, 0, out=mask))
+    dr = output(out, shape)
+    np.copyto(dr, dc_yda)
+    np.copyto(dr, dr0, where=rain)
+    # Final Calculation of DC
+    dc1 = dr
+    np.add(dr, pe, out=dc1)
+    np.copyto(dc1, 0, where=np.less(dc1, 0, out=mask))
+    return dc1
@@ -0,0 +1,160 @@
+"""
+All code is based on the R project: https://cran.r-project.org/package=cffdrs
+
+Comments taken from the R project relating to this module are:
+
+"All code is based on a C code library that was written by Canadian
+Forest Service Employees, which was originally based on
+the Fortran code listed in the reference below. All equations
+in this code refer to that document.
+
+Equations and FORTRAN program for the Canadian Forest Fire
+Weather Index System. 1985. Van Wagner, C.E.; Pickett, T.L.
+Canadian Forestry Service, Petawawa National Forestry
+Institute, Chalk River, Ontario. Forestry Technical Report 33.
+18 p.
+
+Additional reference on FWI system
+
+Development and structure of the Canadian Forest Fire Weather
+Index System. 1987. Van Wagner, C.E. Canadian Forestry Service,
+Headquarters, Ottawa. Forestry Technical Report 35. 35 p."
+"""
+from numpy import ndarray
+import numpy as np
+from pycffdrs.instrument import instrumented
+from pycffdrs.workspace import Workspace, as_arrays, output, workspace_or_new
+
+# Reference latitude for DMC day length adjustment
+# 46N: Canadian standard, latitude >= 30N   (Van Wagner 1987)
+ell01 = np.array((6.5, 7.5, 9, 12.8, 13.9, 13.9, 12.4, 10.9, 9.4, 8, 7, 6))
+# 20N: For 30 > latitude >= 10
+ell02 = np.array((7.9, 8.4, 8.9, 9.5, 9.9, 10.2, 10.1, 9.7, 9.1, 8.6, 8.1, 7.8))
+# 20S: For -10 > latitude >= -30
+ell03 = np.array((10.1, 9.6, 9.1, 8.5, 8.1, 7.8, 7.9, 8.3, 8.9, 9.4, 9.9, 10.2))
+# 40S: For -30 > latitude
+ell04 = np.array((11.5, 10.5, 9.2, 7.9, 6.8, 6.2, 6.5, 7.4, 8.7, 10, 11.2, 11.8))
+
+
+# pylint: disable=too-many-statements
+@instrumented
+def dmcCalc(dmc_yda: ndarray,  # pylint: disable=too-many-arguments, too-many-locals
+            temp: ndarray,
+            rh: ndarray,
+            prec: ndarray,
+            lat: ndarray,
+            mon: ndarray,
+            lat_adjust: bool = True,
+            out: ndarray = None,
+            workspace: Workspace = None) -> ndarray:
+    """
+    Duff Moisture Code Calculation.
+
+    Keyword arguments:
+    dmc_yda -- The Duff Moisture Code from previous iteration
+    temp -- Temperature (centigrade)
+    rh -- Relative Humidity (%)
+    prec -- Precipitation (mm)
+    lat -- Latitude (decimal degrees)
+    mon -- Month (1-12)
+    lat_adjust -- Latitude adjustment (TRUE, FALSE, default=TRUE)
+    out -- Optional array to write the result to (may be dmc_yda)
+    workspace -- Optional Workspace to reuse scratch arrays from
+
+    Returns:
+    Duff Moisture Code
+    """
+    dmc_yda, temp, rh, prec, lat = as_arrays(dmc_yda, temp, rh, prec, lat)
+    shape = np.broadcast(dmc_yda, temp, rh, prec, lat, mon).shape
+    workspace = workspace_or_new(workspace)
+    rk, drying, ell, t, t2 = workspace.scratch('dmcCalc', 5, shape)
+    band, mask = workspace.scratch('dmcCalc', 2, shape, bool)
+    # For the log drying rate latitude adjustment
+    # (indexed by month as given, so that a single month needs no index array of shape)
+    mon = np.asarray(mon).astype(np.intp) - 1
+    # Constrain low end of temperature
+    # t0 = np.where(temp < -1.1, -1.1, temp)
+    np.copyto(drying, temp)
+    np.copyto(drying, -1.1, where=np.less(temp, -1.1, out=mask))
+    # Eq. 16 - The log drying rate
+    # rk = 1.894 * (t0 + 1.1) * (100 - rh) * ell01[mon] * 1e-04
+    np.add(drying, 1.1, out=drying)
+    np.multiply(1.894, drying, out=drying)
+    np.subtract(100, rh, out=rk)
+    np.multiply(drying, rk, out=drying)
+    np.copyto(ell, ell01[mon])
+    np.multiply(drying, ell, out=rk)
+    np.multiply(rk, 1e-04, out=rk)
+    # Adjust the day length  and thus the drying r, based on latitude and month
+    if lat_adjust:
+        # Latitude bands (lower bound comparison, lower bound, upper bound) and their day
+        # length factors: rk = np.where(band, 1.894 * ... * ell0X[mon] * 1e-04, rk)
+        for above, lower, upper, day_length in ((np.greater, 10, 30, ell02),
+                                                (np.greater, -30, -10, ell03),
+                                                (np.greater_equal, -90, -30, ell04),
+                                                (np.greater, -10, 10, None)):
+            np.less_equal(lat, upper, out=band)
+            np.logical_and(band, above(lat, lower, out=mask), out=band)
+            if day_length is None:
+                np.multiply(drying, 9, out=ell)
+            else:
+                np.copyto(ell, day_length[mon])
+                np.multiply(drying, ell, out=ell)
+            np.multiply(ell, 1e-04, out=ell)
+            np.copyto(rk, ell, where=band)
+    # Only apply the rain equations where there is enough rain, as they are undefined
+    # elsewhere (see fwiCalc).
+    rain = np.greater(prec, 1.5, out=band)
+    rw, wmi, b = drying, ell, t
+    # Eq. 11 - Net rain amount
+    # rw = 0.92 * prec - 1.27
+    np.multiply(0.92, prec, out=rw, where=rain)
+    np.subtract(rw, 1.27, out=rw, where=rain)
+    # Alteration to Eq. 12 to calculate more accurately
+    # wmi = 20 + 280 / exp(0.023 * dmc_yda)
+    np.multiply(0.023, dmc_yda, out=wmi, where=rain)
+    np.exp(wmi, out=wmi, where=rain)
+    np.divide(280, wmi, out=wmi, where=rain)
+    np.add(20, wmi, out=wmi, where=rain)
+    # Eqs. 13a, 13b, 13c
+    # b = 100 / (0.5 + 0.3 * dmc_yda), where dmc_yda <= 33
+    within = np.less_equal(dmc_yda, 33, out=mask)
+    np.logical_and(within, rain, out=within)
+    np.multiply(0.3, dmc_yda, out=b, where=within)
+    np.add(0.5, b, out=b, where=within)
+    np.divide(100, b, out=b, where=within)
+    # b = 14 - 1.3 * log(dmc_yda), where 33 < dmc_yda <= 65
+    within = np.greater(dmc_yda, 33, out=mask)
+    np.logical_and(within, rain, out=within)
+    np.log(dmc_yda, out=t2, where=within)
+    np.multiply(1.3, t2, out=b, where=within)
+    np.subtract(14, b, out=b, where=within)
+    # b = 6.2 * log(dmc_yda) - 17.2, where dmc_yda > 65
+    within = np.greater(dmc_yda, 65, out=mask)
+    np.logical_and(within, rain, out=within)
+    np.multiply(6.2, t2, out=b, where=within)
+    np.subtract(b, 17.2, out=b, where=within)
+    # Eq. 14 - Moisture content after rain
+    # wmr = wmi + 1000 * rw / (48.77 + b * rw)
+    np.multiply(b, rw, out=b, where=rain)
+    np.add(48.77, b, out=b, where=rain)
+    np.multiply(1000, rw, out=rw, where=rain)
+    np.divide(rw, b, out=rw, where=rain)
+    wmr = wmi
+    np.add(wmi, rw, out=wmr, where=rain)
+    # Alteration to Eq. 15 to calculate more accurately
+    # pr = 43.43 * (5.6348 - log(wmr - 20))
+    np.subtract(wmr, 20, out=wmr, where=rain)
+    np.log(wmr, out=wmr, where=rain)
+    np.subtract(5.6348, wmr, out=wmr, where=rain)
+    np.multiply(43.43, wmr, out=wmr, where=rain)
+    pr = output(out, shape)
+    np.copyto(pr, dmc_yda)
+    np.copyto(pr, wmr, where=rain)
+    # Constrain P
+    np.copyto(pr, 0, where=np.less(pr, 0, out=mask))
+    # Calculate final dmc
+    dmc1 = pr
+    np.add(pr, rk, out=dmc1)
+    np.copyto(dmc1, 0, where=np.less(dmc1, 0, out=mask))
+    return dmc1
@@ -0,0 +1,138 @@
+"""
+All code is based on the R project: https://cran.r-project.org/package=cffdrs
+
+Single pass Fire Behaviour Prediction. Chaining ISIcalc, ROScalc, CFBcalc, FIcalc,
+BROScalc, FROScalc and DISTtcalc by hand repeats work: the FFMC function, the Buildup
+Effect and the critical surface intensity are each needed by several of them. fbp computes
+each of these intermediates once and shares them between the primary outputs.
+"""
+from typing import Dict, Union
+from numpy import ndarray
+import numpy as np
+from pycffdrs.BEcalc import BEcalc
+from pycffdrs.BROScalc import _BISIcalc
+from pycffdrs.C6calc import _C6calc
+from pycffdrs.CFBcalc import _CSIcalc, _RSOcalc, _CFBcalc
+from pycffdrs.DISTtcalc import _DISTtfactor
+from pycffdrs.FIcalc import FIcalc
+from pycffdrs.FROScalc import FROScalc
+from pycffdrs.ISIcalc import fFcalc, fWcalc
+from pycffdrs.ROScalc import RSIcalc
+from pycffdrs.TFCcalc import TFCcalc
+from pycffdrs.fueltypes import FuelType, FUEL_PARAMETERS, fuel_codes
+from pycffdrs.instrument import instrumented
+from pycffdrs.workspace import Workspace, as_arrays, output, workspace_or_new
+
+# fbp outputs, in the order fbp reports them
+OUTPUTS = ('ISI', 'BE', 'CSI', 'RSO', 'ROS', 'CFB', 'TFC', 'HFI', 'BROS', 'FROS', 'DH', 'DB',
+           'DF')
+
+
+@instrumented
+def fbp(FUELTYPE: ndarray,  # pylint: disable=too-many-arguments, too-many-locals
+        FFMC: ndarray,
+        BUI: ndarray,
+        WSV: ndarray,
+        FMC: ndarray,
+        SFC: ndarray,
+        PC: ndarray,
+        PDF: ndarray,
+        CC: ndarray,
+        CBH: ndarray,
+        LB: ndarray,
+        HR: ndarray,
+        fbpMod: Union[ndarray, None, bool] = True,
+        out: Dict[str, ndarray] = None,
+        workspace: Workspace = None,
+        approx: bool = False) -> Dict[str, ndarray]:
+    """
+    Calculate the primary Fire Behaviour Prediction outputs in one pass.
+
+    All variables names are laid out in the same manner as Forestry Canada
+    Fire Danger Group (FCFDG) (1992). Development and Structure of the
+    Canadian Forest Fire Behavior Prediction System." Technical Report
+    ST-X-3, Forestry Canada, Ottawa, Ontario.
+
+    Keyword arguments:
+    FUELTYPE -- The Fire Behaviour Prediction FuelType (strings or FuelType codes)
+    FFMC -- Fine Fuel Moisture Code
+    BUI -- Buildup Index
+    WSV -- Wind Speed Vector (km/h)
+    FMC -- Foliar Moisture Content
+    SFC -- Surface Fuel Consumption (kg/m^2)
+    PC -- Percent Conifer (%)
+    PDF -- Percent Dead Balsam Fir (%)
+    CC -- Degree of Curing (just "C" in FCFDG 1992)
+    CBH -- Crown Base Height (m)
+    LB -- Length to breadth ratio
+    HR -- The elapsed time (min)
+    fbpMod -- TRUE/FALSE if using the fbp modification of ISI at the extreme end (as the R
+              fbp function does)
+    out -- Optional dictionary of arrays (one per OUTPUTS name) to write the results to
+    workspace -- Optional Workspace to reuse scratch arrays from
+    approx -- Approximate the FFMC function and the Initial Rate of Spread (see
+              ISIcalc.fFcalc and ROScalc.RSIcalc)
+
+    Returns:
+    Dictionary of arrays:
+      ISI -- Initial Spread Index
+      BE -- Buildup Effect
+      CSI -- Critical Surface Intensity
+      RSO -- Critical surface fire spread rate (m/min)
+      ROS -- Head fire Rate of Spread (m/min), as ROScalc
+      CFB -- Crown Fraction Burned
+      TFC -- Total Fuel Consumption (kg/m^2)
+      HFI -- Head Fire Intensity (kW/m)
+      BROS -- Back fire Rate of Spread (m/min), as BROScalc
+      FROS -- Flank fire Rate of Spread (m/min)
+      DH, DB, DF -- Head, back and flank fire spread distance at time HR (m)
+    """
+    FUELTYPE = fuel_codes(FUELTYPE)
+    inputs = as_arrays(FFMC, BUI, WSV, FMC, SFC, PC, PDF, CC, CBH, LB, HR)
+    shape = np.broadcast(FUELTYPE, *inputs).shape
+    FUELTYPE = np.broadcast_to(FUELTYPE, shape)
+    FFMC, BUI, WSV, FMC, SFC, PC, PDF, CC, CBH, LB, HR = (
+        np.broadcast_to(x, shape) for x in inputs)
+    workspace = workspace_or_new(workspace)
+    result = {name: output(None if out is None else out[name], shape) for name in OUTPUTS}
+    fF, BISI, RSI, CFL, DISTt = workspace.scratch('fbp', 5, shape)
+    mask, = workspace.scratch('fbp', 1, shape, bool)
+    # The FFMC function is shared by the head and back fire spread indices
+    fF = fFcalc(FFMC, fF, workspace, approx=approx)
+    # ISI = 0.208 * fWcalc(WSV, fbpMod) * fF
+    ISI = fWcalc(WSV, fbpMod, result['ISI'], workspace)
+    np.multiply(0.208, ISI, out=ISI)
+    np.multiply(ISI, fF, out=ISI)
+    BISI = _BISIcalc(fF, WSV, BISI)
+    # The Buildup Effect and the critical surface fire spread rate are shared by the head and
+    # back fire spread rates, and by the crown fraction burned
+    BE = BEcalc(FUELTYPE, BUI, result['BE'], workspace)
+    CSI = _CSIcalc(FMC, CBH, result['CSI'], workspace)
+    RSO = _RSOcalc(CSI, SFC, result['RSO'])
+    ROS = np.multiply(BE, RSIcalc(FUELTYPE, ISI, PC, PDF, CC, RSI, approx=approx),
+                      out=result['ROS'])
+    BROS = np.multiply(BE, RSIcalc(FUELTYPE, BISI, PC, PDF, CC, RSI, approx=approx),
+                       out=result['BROS'])
+    # C6 has its own spread rate calculation, which includes crowning
+    C6 = FUELTYPE == FuelType.C6
+    if C6.any():
+        C6CFB, ROS[C6] = _C6calc(ISI[C6], BE[C6], FMC[C6], RSO[C6], workspace)
+        _, BROS[C6] = _C6calc(BISI[C6], BE[C6], FMC[C6], RSO[C6], workspace)
+    np.copyto(ROS, 0.000001, where=np.less(ROS, 0, out=mask))
+    np.copyto(BROS, 0.000001, where=np.less(BROS, 0, out=mask))
+    # Crown Fraction Burned, only for fuel types with a crown fuel load
+    # CFB = np.where(CFL > 0, _CFBcalc(ROS, RSO), 0)
+    np.take(FUEL_PARAMETERS['CFL'], FUELTYPE, out=CFL)
+    CFB = _CFBcalc(ROS, RSO, result['CFB'], workspace)
+    np.copyto(CFB, 0, where=np.less_equal(CFL, 0, out=mask))
+    if C6.any():
+        CFB[C6] = C6CFB
+    TFC = TFCcalc(FUELTYPE, CFL, CFB, SFC, PC, PDF, out=result['TFC'], workspace=workspace)
+    FIcalc(TFC, ROS, result['HFI'])
+    FROS = FROScalc(ROS, BROS, LB, result['FROS'])
+    # The acceleration adjusted elapsed time is shared by all three spread distances
+    DISTt = _DISTtfactor(FUELTYPE, HR, CFB, DISTt, workspace)
+    np.multiply(ROS, DISTt, out=result['DH'])
+    np.multiply(BROS, DISTt, out=result['DB'])
+    np.multiply(FROS, DISTt, out=result['DF'])
+    return result
@@ -1,11 +1,24 @@
 """
 All code is based on the R project: https://cran.r-project.org/package=cffdrs
 """
+from numpy import ndarray
 import numpy as np
-from numpy import exp, sqrt
+from pycffdrs import backends
+from pycffdrs.instrument import instrumented
+from pycffdrs.workspace import Workspace, as_arrays, float_dtype, output, workspace_or_new
 
 
-def ffmcCalc(ffmc_yda, temp, rh, ws, prec):
+# pylint: disable=too-many-statements
+@instrumented
+def ffmcCalc(ffmc_yda: ndarray,  # pylint: disable=too-many-arguments, too-many-locals
+             temp: ndarray,
+             rh: ndarray,
+             ws: ndarray,
+             prec: ndarray,
+             out: ndarray = None,
+             workspace: Workspace = None,
+             dtype=None,
+             backend: str = None) -> ndarray:
     """
      Description: Fine Fuel Moisture Code Calculation. All code
                   is based on a C code library that was written by Canadian
@@ -31,53 +44,157 @@ def ffmcCalc(ffmc_yda, temp, rh, ws, prec):
                  rh:   Relative Humidity (%)
                prec:   Precipitation (mm)
                  ws:   Wind speed (km/h)
+                out:   Optional array to write the result to (may be ffmc_yda)
+          workspace:   Optional Workspace to reuse scratch arrays from
+              dtype:   np.float64 or np.float32 (default: see pycffdrs.workspace)
+            backend:   numpy, numexpr, numba or auto (default: see pycffdrs.backends)
 
 
      Returns: A single ffmc value
     """
+    dtype = float_dtype(dtype)
+    ffmc_yda, temp, rh, ws, prec = as_arrays(ffmc_yda, temp, rh, ws, prec, dtype=dtype)
+    shape = np.broadcast(ffmc_yda, temp, rh, ws, prec).shape
+    workspace = workspace_or_new(workspace)
+    backend = backends.resolve(backend)
+    if backend != 'numpy':
+        return backends.ffmc(backend, ffmc_yda, temp, rh, ws, prec, output(out, shape, dtype),
+                             workspace)
+    wmo, ra, ed, ew, wm, z, t1, t2 = workspace.scratch('ffmcCalc', 8, shape, dtype)
+    mask, not_mask = workspace.scratch('ffmcCalc', 2, shape, bool)
     # Eq. 1
-    wmo = 147.2 * (101 - ffmc_yda)/(59.5 + ffmc_yda)
+    # wmo = 147.2 * (101 - ffmc_yda)/(59.5 + ffmc_yda)
+    np.subtract(101, ffmc_yda, out=wmo)
+    np.multiply(147.2, wmo, out=wmo)
+    np.add(59.5, ffmc_yda, out=t1)
+    np.divide(wmo, t1, out=wmo)
     # Eq. 2 Rain reduction to allow for loss in
     #  overhead canopy
-    ra = np.where(prec > 0.5, prec - 0.5, prec)
-    # Eqs. 3a & 3b
-    wmo = np.where(prec > 0.5,
-                   np.where(wmo > 150, wmo + 0.0015 * (wmo - 150) * (wmo - 150) *
-                            sqrt(ra) + 42.5 * ra * exp(-100 / (251 - wmo)) *
-                            (1 - exp(-6.93 / ra)),
-                            wmo + 42.5 * ra * exp(-100 / (251 - wmo)) *
-                            (1 - exp(-6.93 / ra))),
-                   wmo)
+    # ra = np.where(prec > 0.5, prec - 0.5, prec)
+    rain = np.greater(prec, 0.5, out=mask)
+    np.copyto(ra, prec)
+    np.subtract(prec, 0.5, out=ra, where=rain)
+    # Eqs. 3a & 3b, only evaluated where it rains
+    # wmo + 42.5 * ra * exp(-100 / (251 - wmo)) * (1 - exp(-6.93 / ra))
+    np.subtract(251, wmo, out=t1, where=rain)
+    np.divide(-100, t1, out=t1, where=rain)
+    np.exp(t1, out=t1, where=rain)
+    np.multiply(42.5, ra, out=t2, where=rain)
+    np.multiply(t2, t1, out=t2, where=rain)
+    np.divide(-6.93, ra, out=t1, where=rain)
+    np.exp(t1, out=t1, where=rain)
+    np.subtract(1, t1, out=t1, where=rain)
+    np.multiply(t2, t1, out=t2, where=rain)
+    # plus 0.0015 * (wmo - 150) * (wmo - 150) * sqrt(ra), where wmo > 150
+    heavy = np.greater(wmo, 150, out=not_mask)
+    np.logical_and(heavy, rain, out=heavy)
+    np.copyto(z, wmo)
+    np.subtract(wmo, 150, out=t1, where=heavy)
+    np.multiply(0.0015, t1, out=ew, where=heavy)
+    np.multiply(ew, t1, out=ew, where=heavy)
+    np.sqrt(ra, out=t1, where=heavy)
+    np.multiply(ew, t1, out=ew, where=heavy)
+    np.add(wmo, ew, out=z, where=heavy)
+    np.add(z, t2, out=z, where=rain)
+    np.copyto(wmo, z, where=rain)
     # The real moisture content of pine litter ranges up to about 250 percent,
     # so we cap it at 250
-    wmo = np.where(wmo > 250, 250, wmo)
+    np.minimum(wmo, 250, out=wmo)
     # Eq. 4 Equilibrium moisture content from drying
-    ed = 0.942 * (rh ** 0.679) + (11 * exp((rh - 100) / 10)) + \
-        0.18 * (21.1 - temp) * (1 - 1 / exp(rh * 0.115))
+    # ed = 0.942 * (rh ** 0.679) + (11 * exp((rh - 100) / 10)) + \
+    #     0.18 * (21.1 - temp) * (1 - 1 / exp(rh * 0.115))
+    np.subtract(rh, 100, out=t1)
+    np.divide(t1, 10, out=t1)
+    np.exp(t1, out=t1)
+    np.multiply(rh, 0.115, out=t2)
+    np.exp(t2, out=t2)
+    np.divide(1, t2, out=t2)
+    np.subtract(1, t2, out=t2)
+    np.subtract(21.1, temp, out=z)
+    np.multiply(0.18, z, out=z)
+    np.multiply(z, t2, out=t2)
+    np.power(rh, 0.679, out=ed)
+    np.multiply(0.942, ed, out=ed)
+    np.multiply(11, t1, out=z)
+    np.add(ed, z, out=ed)
+    np.add(ed, t2, out=ed)
     # Eq. 5 Equilibrium moisture content from wetting
-    ew = 0.618 * (rh ** 0.753) + (10 * exp((rh - 100) / 10)) + \
-        0.18 * (21.1 - temp) * (1 - 1 / exp(rh * 0.115))
+    # ew = 0.618 * (rh ** 0.753) + (10 * exp((rh - 100) / 10)) + \
+    #     0.18 * (21.1 - temp) * (1 - 1 / exp(rh * 0.115))
+    np.power(rh, 0.753, out=ew)
+    np.multiply(0.618, ew, out=ew)
+    np.multiply(10, t1, out=z)
+    np.add(ew, z, out=ew)
+    np.add(ew, t2, out=ew)
+    # 0.0694 * sqrt(ws) and exp(0.0365 * temp) are used by both drying and wetting
+    sws = ra
+    np.sqrt(ws, out=sws)
+    np.multiply(0.0694, sws, out=sws)
+    etemp = t2
+    np.multiply(0.0365, temp, out=etemp)
+    np.exp(etemp, out=etemp)
     # Eq. 6a (ko) Log drying rate at the normal
     #  termperature of 21.1 C
-    z = np.where((wmo < ed) & (wmo < ew),
-                 0.424 * (1 - (((100 - rh) / 100) ** 1.7)) + 0.0694 *
-                 sqrt(ws) * (1 - ((100 - rh) / 100) ** 8),
-                 0)
+    # z = np.where((wmo < ed) & (wmo < ew),
+    #              0.424 * (1 - (((100 - rh) / 100) ** 1.7)) + 0.0694 *
+    #              sqrt(ws) * (1 - ((100 - rh) / 100) ** 8),
+    #              0)
+    # Only evaluated where drying
+    drying = np.less(wmo, ed, out=mask)
+    np.logical_and(drying, np.less(wmo, ew, out=not_mask), out=drying)
+    np.logical_not(drying, out=not_mask)
+    np.subtract(100, rh, out=t1, where=drying)
+    np.divide(t1, 100, out=t1, where=drying)
+    np.power(t1, 1.7, out=z, where=drying)
+    np.subtract(1, z, out=z, where=drying)
+    np.multiply(0.424, z, out=z, where=drying)
+    np.power(t1, 8, out=t1, where=drying)
+    np.subtract(1, t1, out=t1, where=drying)
+    np.multiply(sws, t1, out=t1, where=drying)
+    np.add(z, t1, out=z, where=drying)
     # Eq. 6b Affect of temperature on  drying rate
-    x = z * 0.581 * exp(0.0365 * temp)
+    # x = z * 0.581 * exp(0.0365 * temp)
+    np.multiply(z, 0.581, out=t1, where=drying)
+    np.multiply(t1, etemp, out=t1, where=drying)
     # Eq. 8
-    wm = np.where((wmo < ed) & (wmo < ew), ew - (ew - wmo)/(10 ** x), wmo)
+    # wm = np.where((wmo < ed) & (wmo < ew), ew - (ew - wmo)/(10 ** x), wmo)
+    np.power(10, t1, out=t1, where=drying)
+    np.subtract(ew, wmo, out=wm, where=drying)
+    np.divide(wm, t1, out=wm, where=drying)
+    np.subtract(ew, wm, out=wm, where=drying)
+    np.copyto(wm, wmo, where=not_mask)
     # Eq. 7a (ko) Log wetting rate at the normal
     #  termperature of 21.1 C
-    z = np.where(wmo > ed, 0.424 * (1 - (rh/100) ** 1.7) + 0.0694 * sqrt(ws) *
-                 (1 - (rh/100) ** 8), z)
+    # z = np.where(wmo > ed, 0.424 * (1 - (rh/100) ** 1.7) + 0.0694 * sqrt(ws) *
+    #              (1 - (rh/100) ** 8), z)
+    # Only evaluated where wetting
+    wetting = np.greater(wmo, ed, out=mask)
+    np.divide(rh, 100, out=t1, where=wetting)
+    np.power(t1, 1.7, out=z, where=wetting)
+    np.subtract(1, z, out=z, where=wetting)
+    np.multiply(0.424, z, out=z, where=wetting)
+    np.power(t1, 8, out=t1, where=wetting)
+    np.subtract(1, t1, out=t1, where=wetting)
+    np.multiply(sws, t1, out=t1, where=wetting)
+    np.add(z, t1, out=z, where=wetting)
     # Eq. 7b Affect of temperature on  wetting rate
-    x = z * 0.581 * exp(0.0365 * temp)
+    # x = z * 0.581 * exp(0.0365 * temp)
+    np.multiply(z, 0.581, out=t1, where=wetting)
+    np.multiply(t1, etemp, out=t1, where=wetting)
     # Eq. 9
-    wm = np.where(wmo > ed, ed + (wmo - ed)/(10 ** x), wm)
+    # wm = np.where(wmo > ed, ed + (wmo - ed)/(10 ** x), wm)
+    np.power(10, t1, out=t1, where=wetting)
+    np.subtract(wmo, ed, out=ew, where=wetting)
+    np.divide(ew, t1, out=ew, where=wetting)
+    np.add(ed, ew, out=wm, where=wetting)
     # Eq. 10 Final ffmc calculation
-    ffmc1 = (59.5 * (250 - wm))/(147.2 + wm)
+    # ffmc1 = (59.5 * (250 - wm))/(147.2 + wm)
+    ffmc1 = output(out, shape, dtype)
+    np.subtract(250, wm, out=ffmc1)
+    np.multiply(59.5, ffmc1, out=ffmc1)
+    np.add(147.2, wm, out=t1)
+    np.divide(ffmc1, t1, out=ffmc1)
     # Constraints
-    ffmc1 = np.where(ffmc1 > 101, 101, ffmc1)
-    ffmc1 = np.where(ffmc1 < 0, 0, ffmc1)
+    np.minimum(ffmc1, 101, out=ffmc1)
+    np.maximum(ffmc1, 0, out=ffmc1)
     return ffmc1
@@ -0,0 +1,118 @@
+"""
+Integer coded Fire Behaviour Prediction fuel types.
+
+The R project works with fuel types as strings. Fuel rasters are usually stored as small
+integer codes, so every FBP function in this package also accepts FUELTYPE as an array of
+FuelType codes. Fuel dependent parameters are then looked up by indexing per fuel arrays
+with those codes.
+
+All per fuel FBP constants live in FUEL_PARAMETERS, a read-only structured array that is
+built once at import time and indexed by FuelType code.
+"""
+from enum import IntEnum
+from numpy import ndarray
+import numpy as np
+
+
+class FuelType(IntEnum):
+    """ Fire Behaviour Prediction fuel type codes, stored as uint8. """
+    C1 = 0
+    C2 = 1
+    C3 = 2
+    C4 = 3
+    C5 = 4
+    C6 = 5
+    C7 = 6
+    D1 = 7
+    M1 = 8
+    M2 = 9
+    M3 = 10
+    M4 = 11
+    S1 = 12
+    S2 = 13
+    S3 = 14
+    O1A = 15
+    O1B = 16
+
+
+# Fuel Type String represenations, in FuelType code order
+FUELTYPES = tuple(fuel.name for fuel in FuelType)
+
+# Alpha (Eq. 72 FCFDG 1992) classes for the DISTt calculation
+ALPHA_CONSTANT = 0
+ALPHA_CROWNING = 1
+
+_a = (90, 110, 110, 110, 30, 30, 45, 30, 0, 0, 120, 100, 75, 40, 55, 190, 250)
+_b = (0.0649, 0.0282, 0.0444, 0.0293, 0.0697, 0.0800, 0.0305, 0.0232, 0, 0,
+      0.0572, 0.0404, 0.0297, 0.0438, 0.0829, 0.0310, 0.0350)
+_c0 = (4.5, 1.5, 3.0, 1.5, 4.0, 3.0, 2.0, 1.6, 0, 0, 1.4, 1.48, 1.3, 1.7,
+       3.2, 1.4, 1.7)
+# The average BUI for the fuel type
+_BUIo = (72, 64, 62, 66, 56, 62, 106, 32, 50, 50, 50, 50, 38, 63, 31, 1, 1)
+# Proportion of maximum possible spread rate that is reached at a standard BUI
+_Q = (0.9, 0.7, 0.75, 0.8, 0.8, 0.8, 0.85, 0.9, 0.8, 0.8, 0.8, 0.8, 0.75,
+      0.75, 0.75, 1.0, 1.0)
+# Crown Fuel Load (kg/m^2)
+_CFL = (0.75, 0.8, 1.15, 1.2, 1.2, 1.8, 0.5, 0, 0.8, 0.8, 0.8, 0.8, 0, 0, 0, 0, 0)
+_alpha = tuple(
+    ALPHA_CONSTANT if fuel in (FuelType.C1, FuelType.O1A, FuelType.O1B, FuelType.S1,
+                               FuelType.S2, FuelType.S3, FuelType.D1)
+    else ALPHA_CROWNING for fuel in FuelType)
+
+# Per fuel FBP constants, indexed by FuelType code:
+#   a, b, c0 -- Rate of spread parameters (Eq. 26 FCFDG 1992)
+#   BUIo     -- The average BUI for the fuel type
+#   Q        -- Proportion of maximum possible spread rate that is reached at a standard BUI
+#   Q50log   -- 50 * ln(Q), the Buildup Effect coefficient (Eq. 54 FCFDG 1992)
+#   CFL      -- Crown Fuel Load (kg/m^2)
+#   alpha    -- DISTt alpha class, ALPHA_CONSTANT or ALPHA_CROWNING (Eq. 72 FCFDG 1992)
+FUEL_PARAMETERS = np.empty(len(FuelType), dtype=[
+    ('a', np.float64), ('b', np.float64), ('c0', np.float64), ('BUIo', np.float64),
+    ('Q', np.float64), ('Q50log', np.float64), ('CFL', np.float64), ('alpha', np.uint8)])
+FUEL_PARAMETERS['a'] = _a
+FUEL_PARAMETERS['b'] = _b
+FUEL_PARAMETERS['c0'] = _c0
+FUEL_PARAMETERS['BUIo'] = _BUIo
+FUEL_PARAMETERS['Q'] = _Q
+FUEL_PARAMETERS['Q50log'] = 50 * np.log(FUEL_PARAMETERS['Q'])
+FUEL_PARAMETERS['CFL'] = _CFL
+FUEL_PARAMETERS['alpha'] = _alpha
+FUEL_PARAMETERS.flags.writeable = False
+
+_NAMES = np.array(FUELTYPES)
+_SORTER = np.argsort(_NAMES)
+_SORTED_NAMES = _NAMES[_SORTER]
+_SORTER = _SORTER.astype(np.uint8)
+
+
+def fuel_codes(FUELTYPE: ndarray) -> ndarray:
+    """
+    Convert fuel types to an array of FuelType codes.
+
+    Keyword arguments:
+    FUELTYPE -- The Fire Behaviour Prediction FuelType, either as strings ("C1", "O1A", ...)
+                or as integer FuelType codes.
+
+    Returns:
+    uint8 array of FuelType codes. Integer input that is already uint8 is returned as is.
+
+    Raises:
+    KeyError if FUELTYPE contains an unknown fuel type.
+    """
+    FUELTYPE = np.asarray(FUELTYPE)
+    if FUELTYPE.size == 0:
+        return np.empty(FUELTYPE.shape, dtype=np.uint8)
+    if FUELTYPE.dtype.kind in 'iu':
+        if FUELTYPE.min() < 0 or FUELTYPE.max() >= len(FUELTYPES):
+            invalid = FUELTYPE[(FUELTYPE < 0) | (FUELTYPE >= len(FUELTYPES))]
+            raise KeyError(f'Unknown fuel type code: {invalid.flat[0]}')
+        return FUELTYPE.astype(np.uint8, copy=False)
+    if FUELTYPE.dtype.kind != 'U':
+        FUELTYPE = FUELTYPE.astype(str)
+    # Binary search each value amongst the (sorted) known names, then confirm the match.
+    index = np.asarray(np.searchsorted(_SORTED_NAMES, FUELTYPE))
+    np.minimum(index, len(_SORTED_NAMES) - 1, out=index)
+    invalid = _SORTED_NAMES[index] != FUELTYPE
+    if invalid.any():
+        raise KeyError(f'Unknown fuel type: {np.asarray(FUELTYPE[invalid]).flat[0]}')
+    return np.asarray(_SORTER[index])
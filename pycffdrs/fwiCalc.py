@@ -20,12 +20,18 @@ Development and structure of the Canadian Forest Fire Weather
 Index System. 1987. Van Wagner, C.E. Canadian Forestry Service,
 Headquarters, Ottawa. Forestry Technical Report 35. 35 p."
 """
-import numpy as np
 from numpy import ndarray
-from numpy import exp, log
+import numpy as np
+from pycffdrs.instrument import instrumented
+from pycffdrs.workspace import Workspace, as_arrays, float_dtype, output, workspace_or_new
 
 
-def fwiCalc(isi: ndarray, bui: ndarray) -> ndarray:
+@instrumented
+def fwiCalc(isi: ndarray,
+            bui: ndarray,
+            out: ndarray = None,
+            workspace: Workspace = None,
+            dtype=None) -> ndarray:
     """
     TODO: add types - see CFBCalc
     Fire Weather Index Calculation. Returns a single fwi value.
@@ -33,22 +39,44 @@ def fwiCalc(isi: ndarray, bui: ndarray) -> ndarray:
     Keyword arguments:
     isi -- Initial Spread Index
     bui -- Buildup Index
+    out -- Optional array to write the result to (may be isi or bui)
+    workspace -- Optional Workspace to reuse scratch arrays from
+    dtype -- np.float64 or np.float32 (default: see pycffdrs.workspace)
     """
     # using np.where would read nice and clean, but gives warnings because the second condition
     # is evaluated regardles of the truth value of the first condition.
+    dtype = float_dtype(dtype)
+    isi, bui = as_arrays(isi, bui, dtype=dtype)
+    shape = np.broadcast(isi, bui).shape
+    workspace = workspace_or_new(workspace)
+    bb, t = workspace.scratch('fwiCalc', 2, shape, dtype)
+    mask, not_mask = workspace.scratch('fwiCalc', 2, shape, bool)
 
     # Eqs. 28b, 28a, 29
     # bb = np.where(bui > 80,
     #               0.1 * isi * (1000/(25 + 108.64/exp(0.023 * bui))),
     #               0.1 * isi * (0.626 * (bui**0.809) + 2))
-    mask = (bui > 80)
-    bb = np.empty_like(bui)
-    bb[mask] = 0.1 * isi[mask] * (1000/(25 + 108.64/exp(0.023 * bui[mask])))
-    bb[~mask] = 0.1 * isi[~mask] * (0.626 * (bui[~mask]**0.809) + 2)
+    np.greater(bui, 80, out=mask)
+    np.logical_not(mask, out=not_mask)
+    np.multiply(0.023, bui, out=t, where=mask)
+    np.exp(t, out=t, where=mask)
+    np.divide(108.64, t, out=t, where=mask)
+    np.add(25, t, out=t, where=mask)
+    np.divide(1000, t, out=t, where=mask)
+    np.power(bui, 0.809, out=t, where=not_mask)
+    np.multiply(0.626, t, out=t, where=not_mask)
+    np.add(t, 2, out=t, where=not_mask)
+    np.multiply(0.1, isi, out=bb)
+    np.multiply(bb, t, out=bb)
     # Eqs. 30b, 30a
     # fwi = np.where((bb <= 1), bb, exp(2.72 * ((0.434 * log(bb))**0.647)))
-    mask = (bb <= 1)
-    fwi = np.empty_like(bb)
-    fwi[mask] = bb[mask]
-    fwi[~mask] = exp(2.72 * ((0.434 * log(bb[~mask]))**0.647))
+    np.less_equal(bb, 1, out=mask)
+    np.logical_not(mask, out=not_mask)
+    fwi = output(out, shape, dtype)
+    np.copyto(fwi, bb, where=mask)
+    np.log(bb, out=fwi, where=not_mask)
+    np.multiply(0.434, fwi, out=fwi, where=not_mask)
+    np.power(fwi, 0.647, out=fwi, where=not_mask)
+    np.multiply(2.72, fwi, out=fwi, where=not_mask)
+    np.exp(fwi, out=fwi, where=not_mask)
     return fwi
@@ -0,0 +1,299 @@
+"""
+All code is based on the R project: https://cran.r-project.org/package=cffdrs
+
+Hourly Fine Fuel Moisture Code, following the R hffmc function (Van Wagner 1977, as
+modified for hourly steps by Van Wagner 1987):
+
+  Van Wagner, C.E. 1977. A method of computing fine fuel moisture content throughout the
+  diurnal cycle. Environment Canada, Canadian Forestry Service, Petawawa Forest Experiment
+  Station, Chalk River, Ontario. Information Report PS-X-69. 15 p.
+
+hffmcCalc advances the FFMC of many stations by one time step. HourlyFFMC holds the FFMC of
+every station in a preallocated array, and steps through weather that is fed to it in chunks
+of hours, as DailyFWI does for days. hffmc calculates a whole hours x stations matrix.
+"""
+from typing import Dict, Iterable, Iterator, Mapping
+from numpy import ndarray
+import numpy as np
+from pycffdrs.instrument import instrumented
+from pycffdrs.workspace import Workspace, as_arrays, float_dtype, output, workspace_or_new
+
+
+# pylint: disable=too-many-statements
+@instrumented
+def hffmcCalc(ffmc_old: ndarray,  # pylint: disable=too-many-arguments, too-many-locals
+              temp: ndarray,
+              rh: ndarray,
+              ws: ndarray,
+              prec: ndarray,
+              time_step: float = 1,
+              out: ndarray = None,
+              workspace: Workspace = None,
+              dtype=None) -> ndarray:
+    """
+    Calculate the Fine Fuel Moisture Code after one time step.
+
+    Keyword arguments:
+    ffmc_old -- The Fine Fuel Moisture Code at the previous time step
+    temp -- Temperature (centigrade)
+    rh -- Relative Humidity (%)
+    ws -- Wind Speed (km/h)
+    prec -- Precipitation (mm) during the time step
+    time_step -- Length of the time step (hours)
+    out -- Optional array to write the result to (may be ffmc_old)
+    workspace -- Optional Workspace to reuse scratch arrays from
+    dtype -- np.float64 or np.float32 (default: see pycffdrs.workspace)
+    """
+    dtype = float_dtype(dtype)
+    ffmc_old, temp, rh, ws, prec = as_arrays(ffmc_old, temp, rh, ws, prec, dtype=dtype)
+    shape = np.broadcast(ffmc_old, temp, rh, ws, prec).shape
+    workspace = workspace_or_new(workspace)
+    mo, ed, ew, k, m, t1, t2 = workspace.scratch('hffmcCalc', 7, shape, dtype)
+    rain, mask, not_mask = workspace.scratch('hffmcCalc', 3, shape, bool)
+    # Eq. 1
+    # mo = 147.27723 * (101 - ffmc_old) / (59.5 + ffmc_old)
+    np.subtract(101, ffmc_old, out=mo)
+    np.multiply(147.27723, mo, out=mo)
+    np.add(59.5, ffmc_old, out=t1)
+    np.divide(mo, t1, out=mo)
+    # Eqs. 3a & 3b, only evaluated where it rains (rf = prec, Eq. 2)
+    # mr = mo + 42.5 * rf * exp(-100 / (251 - mo)) * (1 - exp(-6.93 / rf))
+    np.greater(prec, 0, out=rain)
+    np.subtract(251, mo, out=t1, where=rain)
+    np.divide(-100, t1, out=t1, where=rain)
+    np.exp(t1, out=t1, where=rain)
+    np.multiply(42.5, prec, out=t2, where=rain)
+    np.multiply(t2, t1, out=t2, where=rain)
+    np.divide(-6.93, prec, out=t1, where=rain)
+    np.exp(t1, out=t1, where=rain)
+    np.subtract(1, t1, out=t1, where=rain)
+    np.multiply(t2, t1, out=t2, where=rain)
+    # plus 0.0015 * (mo - 150)^2 * rf^0.5, where mo > 150
+    heavy = np.greater(mo, 150, out=mask)
+    np.logical_and(heavy, rain, out=heavy)
+    np.subtract(mo, 150, out=t1, where=heavy)
+    np.square(t1, out=t1, where=heavy)
+    np.multiply(0.0015, t1, out=t1, where=heavy)
+    np.sqrt(prec, out=m, where=heavy)
+    np.multiply(t1, m, out=t1, where=heavy)
+    np.add(t2, t1, out=t2, where=heavy)
+    np.add(mo, t2, out=mo, where=rain)
+    # The real moisture content of pine litter ranges up to about 250 percent,
+    # so we cap it at 250
+    np.minimum(mo, 250, out=mo, where=rain)
+    # Eq. 4 Equilibrium moisture content from drying
+    # ed = 0.942 * (rh^0.679) + (11 * exp((rh - 100) / 10)) + 0.18 *
+    #   (21.1 - temp) * (1 - exp(-0.115 * rh))
+    np.subtract(rh, 100, out=t1)
+    np.divide(t1, 10, out=t1)
+    np.exp(t1, out=t1)
+    np.multiply(-0.115, rh, out=t2)
+    np.exp(t2, out=t2)
+    np.subtract(1, t2, out=t2)
+    np.subtract(21.1, temp, out=k)
+    np.multiply(0.18, k, out=k)
+    np.multiply(k, t2, out=t2)
+    np.power(rh, 0.679, out=ed)
+    np.multiply(0.942, ed, out=ed)
+    np.multiply(11, t1, out=k)
+    np.add(ed, k, out=ed)
+    np.add(ed, t2, out=ed)
+    # Eq. 5 Equilibrium moisture content from wetting
+    # ew = 0.618 * (rh^0.753) + (10 * exp((rh - 100) / 10)) + 0.18 *
+    #   (21.1 - temp) * (1 - exp(-0.115 * rh))
+    np.power(rh, 0.753, out=ew)
+    np.multiply(0.618, ew, out=ew)
+    np.multiply(10, t1, out=k)
+    np.add(ew, k, out=ew)
+    np.add(ew, t2, out=ew)
+    # Eq. 8 - The moisture content after the time step
+    # m = ifelse(mo > ed,
+    #            ed + (mo - ed) * (10^(-kd * time_step)),
+    #            ew + (mo - ew) * (10^(-kw * time_step)))
+    # m = ifelse(mo < ed & mo > ew, mo, m)
+    np.copyto(m, mo)
+    # Eq. 6a (ko) Log drying rate at the normal termperature of 21.1C, only evaluated where
+    # drying
+    # ko = 0.424 * (1 - (rh / 100)^1.7) + 0.0694 * (ws^0.5) * (1 - (rh / 100)^8)
+    drying = np.greater(mo, ed, out=mask)
+    np.divide(rh, 100, out=t1, where=drying)
+    np.power(t1, 1.7, out=k, where=drying)
+    np.subtract(1, k, out=k, where=drying)
+    np.multiply(0.424, k, out=k, where=drying)
+    np.power(t1, 8, out=t1, where=drying)
+    np.subtract(1, t1, out=t1, where=drying)
+    np.sqrt(ws, out=t2, where=drying)
+    np.multiply(0.0694, t2, out=t2, where=drying)
+    np.multiply(t2, t1, out=t1, where=drying)
+    np.add(k, t1, out=k, where=drying)
+    # Eq. 6b Affect of temperature on the drying rate
+    # kd = ko * 0.0579 * exp(0.0365 * temp)
+    np.multiply(0.0365, temp, out=t1, where=drying)
+    np.exp(t1, out=t1, where=drying)
+    np.multiply(k, 0.0579, out=k, where=drying)
+    np.multiply(k, t1, out=k, where=drying)
+    # ed + (mo - ed) * (10^(-kd * time_step))
+    np.multiply(-time_step, k, out=k, where=drying)
+    np.power(10, k, out=k, where=drying)
+    np.subtract(mo, ed, out=t1, where=drying)
+    np.multiply(t1, k, out=t1, where=drying)
+    np.add(ed, t1, out=m, where=drying)
+    # Eq. 7a (kl) Log wetting rate at the normal temperature of 21.1 C, only evaluated where
+    # wetting: where mo <= ed, but not ew < mo < ed
+    # kl = 0.424 * (1 - ((100 - rh) / 100)^1.7) + 0.0694 * (ws^0.5) *
+    #   (1 - ((100 - rh) / 100)^8)
+    wetting = np.less(mo, ed, out=mask)
+    np.logical_and(wetting, np.greater(mo, ew, out=not_mask), out=wetting)
+    np.logical_not(wetting, out=wetting)
+    np.logical_and(wetting, np.less_equal(mo, ed, out=not_mask), out=wetting)
+    np.subtract(100, rh, out=t1, where=wetting)
+    np.divide(t1, 100, out=t1, where=wetting)
+    np.power(t1, 1.7, out=k, where=wetting)
+    np.subtract(1, k, out=k, where=wetting)
+    np.multiply(0.424, k, out=k, where=wetting)
+    np.power(t1, 8, out=t1, where=wetting)
+    np.subtract(1, t1, out=t1, where=wetting)
+    np.sqrt(ws, out=t2, where=wetting)
+    np.multiply(0.0694, t2, out=t2, where=wetting)
+    np.multiply(t2, t1, out=t1, where=wetting)
+    np.add(k, t1, out=k, where=wetting)
+    # Eq. 7b Affect of temperature on the wetting rate
+    # kw = kl * 0.0579 * exp(0.0365 * temp)
+    np.multiply(0.0365, temp, out=t1, where=wetting)
+    np.exp(t1, out=t1, where=wetting)
+    np.multiply(k, 0.0579, out=k, where=wetting)
+    np.multiply(k, t1, out=k, where=wetting)
+    # ew + (mo - ew) * (10^(-kw * time_step))
+    np.multiply(-time_step, k, out=k, where=wetting)
+    np.power(10, k, out=k, where=wetting)
+    np.subtract(mo, ew, out=t1, where=wetting)
+    np.multiply(t1, k, out=t1, where=wetting)
+    np.add(ew, t1, out=m, where=wetting)
+    # Eq. 9 Calculate the hourly FFMC
+    # fo = 59.5 * (250 - m) / (147.27723 + m)
+    fo = output(out, shape, dtype)
+    np.subtract(250, m, out=fo)
+    np.multiply(59.5, fo, out=fo)
+    np.add(147.27723, m, out=t1)
+    np.divide(fo, t1, out=fo)
+    # Constraints
+    np.minimum(fo, 101, out=fo)
+    np.maximum(fo, 0, out=fo)
+    return fo
+
+
+class HourlyFFMC:
+    """
+    Hourly FFMC stepping engine, for many stations at once.
+
+    Keyword arguments:
+    ffmc -- Initial Fine Fuel Moisture Code of each station
+    time_step -- Length of each time step (hours)
+
+    The engine computes in the package wide floating point type (see pycffdrs.workspace) at
+    the time it is created.
+    """
+
+    def __init__(self, ffmc: ndarray, time_step: float = 1):
+        # The FFMC of the last time step, carried from one step to the next
+        self.ffmc = np.array(ffmc, dtype=float_dtype())
+        self.time_step = time_step
+        self._chunk: ndarray = np.empty((0,) + self.ffmc.shape, dtype=self.ffmc.dtype)
+        self._workspace = Workspace()
+
+    def step(self,  # pylint: disable=too-many-arguments
+             temp: ndarray,
+             rh: ndarray,
+             ws: ndarray,
+             prec: ndarray,
+             out: ndarray = None) -> ndarray:
+        """
+        Advance all stations by one time step.
+
+        Keyword arguments:
+        temp -- Temperature (centigrade), per station
+        rh -- Relative Humidity (%), per station
+        ws -- Wind Speed (km/h), per station
+        prec -- Precipitation (mm) during the time step, per station
+        out -- Optional array to write the FFMC to, as well as the engine's state
+
+        Returns:
+        The FFMC of each station. Unless out is given, this array belongs to the engine and
+        is overwritten by the next step.
+        """
+        hffmcCalc(self.ffmc, temp, rh, ws, prec, self.time_step, out=self.ffmc,
+                  workspace=self._workspace, dtype=self.ffmc.dtype)
+        if out is None:
+            return self.ffmc
+        np.copyto(out, self.ffmc)
+        return out
+
+    def _chunk_output(self, hours: int) -> ndarray:
+        """ (hours, stations) output array, reused from one chunk to the next. """
+        if len(self._chunk) < hours:
+            self._chunk = np.empty((hours,) + self.ffmc.shape, dtype=self.ffmc.dtype)
+        return self._chunk[:hours]
+
+    def run(self,
+            weather: Iterable[Mapping[str, ndarray]],
+            per_hour: bool = False,
+            out: ndarray = None) -> Iterator[ndarray]:
+        """
+        Step through weather, a chunk of hours at a time.
+
+        Keyword arguments:
+        weather -- Iterable (e.g. a generator) of chunks. Each chunk maps temp, rh, ws and prec
+                   to (hours, stations) arrays.
+        per_hour -- Yield the FFMC of every hour, rather than of every chunk.
+        out -- Optional array to write the FFMC of all the chunks to, one after the other
+
+        Yields:
+        The FFMC of each chunk, shaped (hours, stations), or (stations,) for each hour if
+        per_hour. Unless out is given, the array is reused for the next chunk, so copy it if
+        it needs to outlive it.
+        """
+        start = 0
+        for chunk in weather:
+            temp, rh, ws, prec = (chunk[name] for name in ('temp', 'rh', 'ws', 'prec'))
+            hours = len(temp)
+            ffmc = self._chunk_output(hours) if out is None else out[start:start + hours]
+            for hour, _temp in enumerate(temp):
+                result = self.step(_temp, rh[hour], ws[hour], prec[hour], out=ffmc[hour])
+                if per_hour:
+                    yield result
+            start += hours
+            if not per_hour:
+                yield ffmc
+
+
+def hffmc(temp: ndarray,  # pylint: disable=too-many-arguments
+          rh: ndarray,
+          ws: ndarray,
+          prec: ndarray,
+          ffmc_old: ndarray = 85,
+          time_step: float = 1,
+          out: ndarray = None) -> ndarray:
+    """
+    Calculate the hourly FFMC of every station, through a series of hours.
+
+    Keyword arguments:
+    temp -- Temperature (centigrade), shaped (hours, stations)
+    rh -- Relative Humidity (%), shaped (hours, stations)
+    ws -- Wind Speed (km/h), shaped (hours, stations)
+    prec -- Precipitation (mm) in each hour, shaped (hours, stations)
+    ffmc_old -- The FFMC before the first hour, per station or for all stations
+    time_step -- Length of each time step (hours)
+    out -- Optional (hours, stations) array to write the result to
+
+    Returns:
+    FFMC at the end of each hour, shaped (hours, stations)
+    """
+    temp, rh, ws, prec = as_arrays(temp, rh, ws, prec)
+    shape = np.broadcast(temp, rh, ws, prec).shape
+    FFMC = output(out, shape)
+    engine = HourlyFFMC(np.broadcast_to(ffmc_old, shape[1:]), time_step)
+    weather: Dict[str, ndarray] = {name: np.broadcast_to(value, shape) for name, value in
+                                   (('temp', temp), ('rh', rh), ('ws', ws), ('prec', prec))}
+    for _ in engine.run((weather,), out=FFMC):
+        pass
+    return FFMC
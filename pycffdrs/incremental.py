@@ -0,0 +1,178 @@
+"""
+Incremental recalculation of a day's FWI and FBP outputs, as forecast inputs change.
+
+A forecast update often changes only some inputs (e.g. the wind speed), and only at some
+cells. Forecast remembers a grid's inputs and every intermediate output (FFMC, DMC, DC, ISI,
+BUI, FWI, BE, ROS, RSO, CFB). On update, it recalculates only the outputs that depend on
+the inputs that changed, and only at the cells where they changed:
+
+    forecast = Forecast(ffmc_yda=..., dmc_yda=..., dc_yda=..., temp=..., rh=..., ws=...,
+                        prec=..., lat=..., mon=..., FUELTYPE=..., FMC=..., SFC=..., PC=...,
+                        PDF=..., CC=..., CBH=...)
+    forecast.update(ws=new_ws)
+    forecast['ROS']
+
+A wind only update recalculates FFMC, ISI, FWI, ROS and CFB, but not DMC, DC, BUI, BE or
+RSO. A cell whose output is unchanged by an update does not propagate the update further.
+Results are identical to calculating the whole grid again with the calculators.
+"""
+from functools import partial
+from typing import Callable, Dict, Tuple
+from numpy import ndarray
+import numpy as np
+from pycffdrs.BEcalc import BEcalc
+from pycffdrs.buiCalc import buiCalc
+from pycffdrs.CFBcalc import _CFBcalc, _CSIcalc, _RSOcalc
+from pycffdrs.dcCalc import dcCalc
+from pycffdrs.dmcCalc import dmcCalc
+from pycffdrs.ffmcCalc import ffmcCalc
+from pycffdrs.fueltypes import fuel_codes
+from pycffdrs.fwiCalc import fwiCalc
+from pycffdrs.ISIcalc import ISIcalc
+from pycffdrs.ROScalc import _ROScalc
+from pycffdrs.workspace import Workspace, float_dtype
+
+# Inputs of a Forecast
+INPUTS = ('ffmc_yda', 'dmc_yda', 'dc_yda', 'temp', 'rh', 'ws', 'prec', 'lat', 'mon',
+          'FUELTYPE', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH')
+
+# Outputs of a Forecast, in dependency order, and the inputs and outputs each depends on
+DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    'FFMC': ('ffmc_yda', 'temp', 'rh', 'ws', 'prec'),
+    'DMC': ('dmc_yda', 'temp', 'rh', 'prec', 'lat', 'mon'),
+    'DC': ('dc_yda', 'temp', 'prec', 'lat', 'mon'),
+    'ISI': ('FFMC', 'ws'),
+    'BUI': ('DMC', 'DC'),
+    'FWI': ('ISI', 'BUI'),
+    'BE': ('FUELTYPE', 'BUI'),
+    'ROS': ('FUELTYPE', 'BE', 'ISI', 'BUI', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH'),
+    'RSO': ('FMC', 'SFC', 'CBH'),
+    'CFB': ('ROS', 'RSO'),
+}
+OUTPUTS = tuple(DEPENDENCIES)
+
+# Share of a grid's cells above which an output is recalculated for every cell, rather than
+# for the changed cells only (which costs gathering and scattering them)
+FULL_FRACTION = 0.5
+
+
+def _calculators(lat_adjust: bool, workspace: Workspace) -> Dict[str, Callable]:
+    """ The calculation of each output, from the values of its dependencies. """
+    dtype = float_dtype()
+    return {
+        'FFMC': partial(ffmcCalc, workspace=workspace),
+        'DMC': lambda dmc_yda, temp, rh, prec, lat, mon: dmcCalc(
+            dmc_yda, temp, rh, prec, lat, mon, lat_adjust, workspace=workspace),
+        'DC': lambda dc_yda, temp, prec, lat, mon: dcCalc(
+            dc_yda, temp, None, prec, lat, mon, lat_adjust, workspace=workspace),
+        'ISI': partial(ISIcalc, workspace=workspace),
+        'BUI': partial(buiCalc, workspace=workspace),
+        'FWI': partial(fwiCalc, workspace=workspace),
+        'BE': partial(BEcalc, workspace=workspace),
+        'ROS': lambda FUELTYPE, BE, *values: _ROScalc(
+            FUELTYPE, BE, *values, out=None, workspace=workspace, dtype=dtype),
+        'RSO': lambda FMC, SFC, CBH: _RSOcalc(_CSIcalc(FMC, CBH, workspace=workspace), SFC),
+        'CFB': partial(_CFBcalc, workspace=workspace),
+    }
+
+
+class Forecast:
+    """
+    A grid's inputs and outputs, recalculated incrementally as inputs change.
+
+    Keyword arguments:
+    lat_adjust -- Latitude adjustment of the DMC and DC day length factors
+    inputs -- Every one of INPUTS, by name (see dmcCalc and ROScalc): per cell arrays, or
+              values for all cells
+
+    The grid's shape is that of the inputs, broadcast together. Outputs are calculated in
+    the package wide floating point type (see pycffdrs.workspace) at the time the forecast
+    is created.
+    """
+
+    def __init__(self, lat_adjust: bool = True, **inputs: ndarray):
+        missing = set(INPUTS) - set(inputs)
+        if missing:
+            raise TypeError(f'Missing inputs: {", ".join(sorted(missing))}')
+        self.shape = np.broadcast(*(np.asarray(inputs[name]) for name in INPUTS)).shape
+        self._dtype = float_dtype()
+        self._workspace = Workspace()
+        self._calculate = _calculators(lat_adjust, self._workspace)
+        # Flat copies of every input and output
+        self._values: Dict[str, ndarray] = {name: self._flat(name, inputs[name])
+                                            for name in INPUTS}
+        for name, dependencies in DEPENDENCIES.items():
+            self._values[name] = self._calculate[name](
+                *(self._values[dependency] for dependency in dependencies))
+        # Number of cells each output was recalculated for, by the last update
+        self.recalculated: Dict[str, int] = {}
+
+    def _flat(self, name: str, value: ndarray) -> ndarray:
+        """ An input, as a flat (C order) array of the grid's size, of the input's type. """
+        if name == 'FUELTYPE':
+            value = fuel_codes(value)
+        elif name == 'mon':
+            value = np.asarray(value, dtype=np.intp)
+        else:
+            value = np.asarray(value, dtype=self._dtype)
+        return np.broadcast_to(value, self.shape).flatten()
+
+    def __getitem__(self, name: str) -> ndarray:
+        """ An input or output, shaped as the grid. Do not modify it: use update. """
+        return self._values[name].reshape(self.shape)
+
+    def outputs(self) -> Dict[str, ndarray]:
+        """ All outputs, by name, shaped as the grid. """
+        return {name: self[name] for name in OUTPUTS}
+
+    def update(self, **inputs: ndarray) -> Dict[str, ndarray]:
+        """
+        Change some inputs, and recalculate the outputs that depend on them, at the cells
+        where they changed.
+
+        Keyword arguments:
+        inputs -- New values of some of INPUTS, by name
+
+        Returns:
+        All outputs, by name (see outputs).
+
+        Raises:
+        KeyError for an unknown input.
+        """
+        unknown = set(inputs) - set(INPUTS)
+        if unknown:
+            raise KeyError(f'Unknown inputs: {", ".join(sorted(unknown))}')
+        # Flat indices of the changed cells, of each changed input and output
+        changed: Dict[str, ndarray] = {}
+        for name, value in inputs.items():
+            value, current = self._flat(name, value), self._values[name]
+            cells = np.flatnonzero(value != current)
+            if cells.size:
+                current[cells] = value[cells]
+                changed[name] = cells
+        self.recalculated = {}
+        size = int(np.prod(self.shape))
+        for name, dependencies in DEPENDENCIES.items():
+            dirty = [changed[dependency] for dependency in dependencies if dependency in changed]
+            if not dirty:
+                continue
+            cells = dirty[0]
+            for more in dirty[1:]:
+                cells = np.union1d(cells, more)
+            current = self._values[name]
+            if cells.size > FULL_FRACTION * size:
+                value = self._calculate[name](
+                    *(self._values[dependency] for dependency in dependencies))
+                cells = np.flatnonzero(value != current)
+                current[cells] = value[cells]
+                self.recalculated[name] = size
+            else:
+                value = self._calculate[name](
+                    *(self._values[dependency][cells] for dependency in dependencies))
+                different = value != current[cells]
+                current[cells] = value
+                self.recalculated[name] = cells.size
+                cells = cells[different]
+            if cells.size:
+                changed[name] = cells
+        return self.outputs()
@@ -0,0 +1,154 @@
+"""
+Opt-in instrumentation of the calculators.
+
+Every public calculator is wrapped by instrumented. While instrumentation is enabled, every
+call adds to these totals, per calculator:
+
+  calls -- Number of calls
+  elements -- Number of elements calculated (the size of the result)
+  seconds -- Wall time
+  bytes -- Peak memory allocated during the call, above what was allocated before it (only
+           if memory is traced, see enable)
+
+Times and memory are inclusive: fbp's include the calculators it calls, which are recorded as
+well. While instrumentation is disabled (the default), the only overhead is one check of a
+flag per call, so calculators can stay instrumented in production:
+
+    instrument.enable()
+    ...  # nightly run
+    instrument.disable()
+    print(instrument.to_json())
+"""
+from functools import wraps
+import json
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+import numpy as np
+
+_enabled = False  # pylint: disable=invalid-name
+_memory = False  # pylint: disable=invalid-name
+# Whether enable started tracemalloc, and so disable should stop it
+_started_tracing = False  # pylint: disable=invalid-name
+
+_lock = threading.Lock()
+_stats: Dict[str, Dict[str, float]] = {}
+# [start, peak] allocated memory of the instrumented calls in progress, per thread
+_frames = threading.local()
+
+_RESET_PEAK = hasattr(tracemalloc, 'reset_peak')
+
+FIELDS = ('calls', 'elements', 'seconds', 'bytes')
+
+
+def enable(memory: bool = True):
+    """
+    Start recording.
+
+    Keyword arguments:
+    memory -- Record bytes allocated, with tracemalloc. Tracing memory slows down the Python
+              parts of every calculation (but not NumPy's loops); with memory=False only
+              calls, elements and seconds are recorded. Memory is attributed correctly only
+              if the calculators run on one thread at a time.
+    """
+    global _enabled, _memory, _started_tracing  # pylint: disable=global-statement
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracing = True
+    _memory = memory
+    _enabled = True
+
+
+def disable():
+    """ Stop recording. Statistics recorded so far are kept, until reset. """
+    global _enabled, _started_tracing  # pylint: disable=global-statement
+    _enabled = False
+    if _started_tracing:
+        tracemalloc.stop()
+        _started_tracing = False
+
+
+def is_enabled() -> bool:
+    """ Whether calls are being recorded. """
+    return _enabled
+
+
+def reset():
+    """ Clear the statistics recorded so far. """
+    with _lock:
+        _stats.clear()
+
+
+def stats() -> Dict[str, Dict[str, float]]:
+    """ Statistics by calculator name: a copy of each calculator's FIELDS. """
+    with _lock:
+        return {name: dict(record) for name, record in _stats.items()}
+
+
+def to_json(**kwargs) -> str:
+    """ Statistics as JSON. Keyword arguments are passed on to json.dumps. """
+    return json.dumps(stats(), **kwargs)
+
+
+def _elements(result) -> int:
+    if isinstance(result, dict):
+        result = next(iter(result.values()), None)
+    return int(np.size(result))
+
+
+def _record(name: str, result, seconds: float, allocated: int):
+    with _lock:
+        record = _stats.get(name)
+        if record is None:
+            record = _stats[name] = dict.fromkeys(FIELDS, 0)
+        record['calls'] += 1
+        record['elements'] += _elements(result)
+        record['seconds'] += seconds
+        record['bytes'] += allocated
+
+
+def _call_traced(function: Callable, args: tuple, kwargs: dict):
+    """ Call function, returning its result, duration and peak allocated memory. """
+    frames: List[List[int]] = getattr(_frames, 'stack', None)
+    if frames is None:
+        frames = _frames.stack = []
+    current, peak = tracemalloc.get_traced_memory()
+    if frames:
+        # The peak so far belongs to the calling calculator, as the peak is about to be reset
+        frames[-1][1] = max(frames[-1][1], peak)
+    if _RESET_PEAK:
+        tracemalloc.reset_peak()
+    frames.append([current, current])
+    start = time.perf_counter()
+    try:
+        result = function(*args, **kwargs)
+    finally:
+        seconds = time.perf_counter() - start
+        frame = frames.pop()
+        current, peak = tracemalloc.get_traced_memory()
+        # Without reset_peak (before Python 3.9), only the memory still allocated is known
+        peak = max(frame[1], peak if _RESET_PEAK else current)
+        if frames:
+            frames[-1][1] = max(frames[-1][1], peak)
+    return result, seconds, peak - frame[0]
+
+
+def instrumented(function: Callable) -> Callable:
+    """ Decorator: record calls to function, under its name, while instrumentation is enabled.
+    """
+    name = function.__name__
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return function(*args, **kwargs)
+        if _memory and tracemalloc.is_tracing():
+            result, seconds, allocated = _call_traced(function, args, kwargs)
+        else:
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            seconds, allocated = time.perf_counter() - start, 0
+        _record(name, result, seconds, allocated)
+        return result
+    return wrapper
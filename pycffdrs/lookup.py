@@ -0,0 +1,90 @@
+"""
+Lookup tables, for the approximation mode of the calculators.
+
+Some curves of the FBP System are smooth functions of a single bounded input, but cost an exp
+and a power per element to evaluate. What-if sweeps can trade a small error for speed: with
+approx=True, fFcalc (the FFMC function, and so ISIcalc, BROScalc and fbp) and RSIcalc (the
+per fuel type Initial Rate of Spread curves, and so ROScalc, BROScalc and fbp) interpolate
+linearly in a LookupTable instead. The tables are computed from the exact functions, on first
+use. Their maximum absolute errors over the whole input domain (see ISIcalc.FF_MAX_ERROR and
+ROScalc.RSI_MAX_ERROR) are checked against the exact functions by the tests.
+"""
+from typing import Callable, Dict, Tuple, Union
+from numpy import ndarray
+import numpy as np
+from pycffdrs.workspace import Workspace, float_dtype, output, workspace_or_new
+
+
+class LookupTable:
+    """
+    A function of x, tabulated at equally spaced nodes over [low, high] for linear
+    interpolation. A table may have several rows (e.g. one per fuel type), for a family of
+    curves over the same nodes.
+
+    Keyword arguments:
+    function -- Called once, with the (intervals + 1) nodes, on first use. Returns the value at
+                each node, shaped (intervals + 1) for one row, or (rows, intervals + 1).
+    low, high -- Domain of x. x is clamped to it.
+    intervals -- Number of intervals between nodes
+    """
+
+    def __init__(self, function: Callable[[ndarray], ndarray], low: float, high: float,
+                 intervals: int):
+        self.function = function
+        self.low = low
+        self.high = high
+        self.intervals = intervals
+        self._tables: Dict[np.dtype, Tuple[ndarray, ndarray]] = {}
+
+    def nodes(self) -> ndarray:
+        """ The x values the function is tabulated at. """
+        return np.linspace(self.low, self.high, self.intervals + 1)
+
+    def _table(self, dtype: np.dtype) -> Tuple[ndarray, ndarray]:
+        """ Flat node values, and slopes to the next node (0 past the last node), per row. """
+        table = self._tables.get(dtype)
+        if table is None:
+            values = np.atleast_2d(np.asarray(self.function(self.nodes()), dtype=np.float64))
+            slopes = np.zeros_like(values)
+            slopes[:, :-1] = np.diff(values, axis=1)
+            table = self._tables[dtype] = (values.astype(dtype).ravel(),
+                                           slopes.astype(dtype).ravel())
+        return table
+
+    def __call__(self,
+                 x: ndarray,
+                 row: Union[ndarray, int] = 0,
+                 out: ndarray = None,
+                 workspace: Workspace = None,
+                 dtype=None) -> ndarray:
+        """
+        Interpolate the function at x.
+
+        Keyword arguments:
+        x -- Values to interpolate at
+        row -- Row of the table, per element of x or for all of it
+        out -- Optional array to write the result to
+        workspace -- Optional Workspace to reuse scratch arrays from
+        dtype -- np.float64 or np.float32 (default: see pycffdrs.workspace)
+        """
+        dtype = float_dtype(dtype)
+        x = np.asarray(x, dtype=dtype)
+        values, slopes = self._table(dtype)
+        workspace = workspace_or_new(workspace)
+        t, = workspace.scratch('LookupTable', 1, x.shape, dtype)
+        index, = workspace.scratch('LookupTable', 1, x.shape, np.intp)
+        # Position of x in intervals from low, and the node at or below it
+        np.subtract(x, self.low, out=t)
+        np.multiply(t, self.intervals / (self.high - self.low), out=t)
+        np.clip(t, 0, self.intervals, out=t)
+        np.copyto(index, t, casting='unsafe')
+        np.subtract(t, index, out=t)
+        if np.ndim(row) or row:
+            np.add(index, np.multiply(row, self.intervals + 1, dtype=np.intp), out=index)
+        # values[index] + t * slopes[index]
+        result = output(out, x.shape, dtype)
+        np.take(slopes, index, out=result, mode='clip')
+        np.multiply(result, t, out=result)
+        np.take(values, index, out=t, mode='clip')
+        np.add(t, result, out=result)
+        return result
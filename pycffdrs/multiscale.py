@@ -0,0 +1,246 @@
+"""
+Evaluation of fine (fuel) grids under coarse (weather) grids.
+
+Weather grids are usually much coarser than fuel grids: with weather at 2.5 km and fuels at
+100 m, every weather cell covers 625 fuel cells. Upsampling the weather and running the FWI
+System and the spread rate equations on the fine grid repeats the weather only work 625
+times. Instead, CoarseWeather calculates the weather only terms (the FFMC function, the wind
+functions, ISI and the back fire ISI) on the coarse grid, and evaluates only the fuel
+dependent terms on the fine grid, through an index map from fine cells to coarse cells (see
+coarse_index). The Buildup Effect and the Eq. 26 spread curves depend only on the fuel type
+and the coarse weather, so they are calculated once per coarse cell for each fuel type
+present, and looked up by the fine cells. The Crown Fraction Burned reuses the fine grid's
+Rate of Spread, rather than calculating it again.
+
+Results are identical to upsampling the weather to the fine grid (with np.take(coarse,
+index)) and calling the calculators there.
+"""
+from typing import Dict, Tuple
+from numpy import ndarray
+import numpy as np
+from pycffdrs.BROScalc import _BISIcalc
+from pycffdrs.BEcalc import BEcalc
+from pycffdrs.C6calc import C6calc
+from pycffdrs.CFBcalc import _CFBcalc, _CSIcalc, _RSOcalc
+from pycffdrs.fueltypes import FUEL_PARAMETERS, FuelType, fuel_codes
+from pycffdrs.ISIcalc import fFcalc, fWcalc
+from pycffdrs.ROScalc import _RSI26, _RSIcombine
+from pycffdrs.workspace import Workspace, as_arrays, float_dtype, output, workspace_or_new
+
+
+def coarse_index(fine_shape: Tuple[int, ...], coarse_shape: Tuple[int, ...]) -> ndarray:
+    """
+    Index map from the cells of a fine grid to the cells of a coarse grid with the same
+    extent: the flat (C order) index of the coarse cell each fine cell lies in.
+
+    Keyword arguments:
+    fine_shape -- Shape of the fine grid
+    coarse_shape -- Shape of the coarse grid (same number of dimensions, no more cells along
+                    any of them)
+    """
+    if len(fine_shape) != len(coarse_shape) or any(
+            coarse > fine for fine, coarse in zip(fine_shape, coarse_shape)):
+        raise ValueError(f'Cannot map a {fine_shape} grid onto a {coarse_shape} grid')
+    axes = [np.arange(fine) * coarse // fine for fine, coarse in zip(fine_shape, coarse_shape)]
+    return np.ravel_multi_index(np.ix_(*axes), coarse_shape)
+
+
+class CoarseWeather:
+    """
+    Weather only terms of the Fire Behaviour Prediction System, on a coarse grid, for fine
+    grids of fuels.
+
+    Keyword arguments:
+    index -- Index map from the fine grid to the coarse grid (see coarse_index)
+    FFMC -- Fine Fuel Moisture Code, on the coarse grid
+    BUI -- Buildup Index, on the coarse grid
+    WSV -- Wind Speed Vector (km/h), on the coarse grid
+    fbpMod -- TRUE/FALSE if using the fbp modification of ISI at the extreme end (as fbp)
+    approx -- Approximate the FFMC function and the Initial Rate of Spread (see
+              ISIcalc.fFcalc and ROScalc.RSIcalc)
+    dtype -- np.float64 or np.float32 (default: see pycffdrs.workspace)
+
+    The coarse grids may have any shape; they are used in flat (C order) index order.
+    """
+
+    def __init__(self,  # pylint: disable=too-many-arguments
+                 index: ndarray,
+                 FFMC: ndarray,
+                 BUI: ndarray,
+                 WSV: ndarray,
+                 fbpMod: bool = True,
+                 approx: bool = False,
+                 dtype=None):
+        self.dtype = float_dtype(dtype)
+        self.index = np.asarray(index)
+        FFMC, BUI, WSV = (value.ravel() for value in as_arrays(FFMC, BUI, WSV, dtype=self.dtype))
+        self.approx = approx
+        self.BUI = BUI  # pylint: disable=invalid-name
+        # The FFMC function is shared by the head and back fire spread indices
+        fF = fFcalc(FFMC, dtype=self.dtype, approx=approx)
+        # ISI = 0.208 * fWcalc(WSV, fbpMod) * fF
+        self.ISI = fWcalc(WSV, fbpMod, dtype=self.dtype)  # pylint: disable=invalid-name
+        np.multiply(0.208, self.ISI, out=self.ISI)
+        np.multiply(self.ISI, fF, out=self.ISI)
+        # Eqs. 75 & 76 (FCFDG 1992) the back fire ISI
+        self.BISI = _BISIcalc(fF, WSV)  # pylint: disable=invalid-name
+
+    def fine(self, coarse: ndarray, out: ndarray = None) -> ndarray:
+        """ A coarse grid, upsampled to the fine grid. """
+        coarse = np.asarray(coarse).ravel()
+        return np.take(coarse, self.index, out=output(out, self.index.shape, coarse.dtype))
+
+    def _lookup(self, table: Dict[int, ndarray], FUELTYPE: ndarray, out: ndarray,
+                workspace: Workspace) -> ndarray:
+        """ The fine grid's values in per fuel type coarse grids, by each cell's fuel type. """
+        fuels = sorted(table)
+        row = np.zeros(len(FuelType), dtype=np.intp)
+        row[fuels] = np.arange(len(fuels))
+        flat, = workspace.scratch('CoarseWeather', 1, self.index.shape, np.intp)
+        np.take(row, FUELTYPE, out=flat)
+        np.multiply(flat, len(self.BUI), out=flat)
+        np.add(flat, self.index, out=flat)
+        return np.take(np.stack([table[fuel] for fuel in fuels]), flat, out=out)
+
+    @staticmethod
+    def _present(FUELTYPE: ndarray) -> ndarray:
+        """ The fuel types present in a fuel grid. """
+        return np.flatnonzero(np.bincount(FUELTYPE.ravel(), minlength=len(FuelType)))
+
+    def BE(self,
+           FUELTYPE: ndarray,
+           out: ndarray = None,
+           workspace: Workspace = None) -> ndarray:
+        """
+        Buildup Effect on the fine grid (as BEcalc).
+
+        Keyword arguments:
+        FUELTYPE -- The Fire Behaviour Prediction FuelType on the fine grid (strings or
+                    FuelType codes)
+        out -- Optional array to write the result to
+        workspace -- Optional Workspace to reuse scratch arrays from
+        """
+        FUELTYPE = np.broadcast_to(fuel_codes(FUELTYPE), self.index.shape)
+        workspace = workspace_or_new(workspace)
+        # Eq. 54 (FCFDG 1992) The Buildup Effect, of every fuel type present at every coarse
+        # cell
+        table = {fuel: BEcalc(np.uint8(fuel), self.BUI, dtype=self.dtype)
+                 for fuel in self._present(FUELTYPE)}
+        return self._lookup(table, FUELTYPE, output(out, self.index.shape, self.dtype),
+                            workspace)
+
+    def ROS(self,  # pylint: disable=too-many-arguments, too-many-locals
+            FUELTYPE: ndarray,
+            FMC: ndarray,
+            SFC: ndarray,
+            PC: ndarray,
+            PDF: ndarray,
+            CC: ndarray,
+            CBH: ndarray,
+            back: bool = False,
+            out: ndarray = None,
+            workspace: Workspace = None) -> ndarray:
+        """
+        Rate of Spread on the fine grid (as ROScalc, with the coarse ISI), or the back fire
+        Rate of Spread (as BROScalc).
+
+        Keyword arguments:
+        FUELTYPE -- The Fire Behaviour Prediction FuelType (strings or FuelType codes)
+        FMC -- Foliar Moisture Content
+        SFC -- Surface Fuel Consumption (kg/m^2)
+        PC -- Percent Conifer (%)
+        PDF -- Percent Dead Balsam Fir (%)
+        CC -- Degree of Curing (just "C" in FCFDG 1992)
+        CBH -- Crown Base Height (m)
+        back -- Calculate the back fire Rate of Spread, from the back fire ISI
+        out -- Optional array to write the result to
+        workspace -- Optional Workspace to reuse scratch arrays from
+
+        All but back, out and workspace are fine grids, or values for every fine cell.
+        """
+        FUELTYPE, FMC, SFC, PC, PDF, CC, CBH = (
+            np.broadcast_to(value, self.index.shape) for value in
+            (fuel_codes(FUELTYPE), *as_arrays(FMC, SFC, PC, PDF, CC, CBH, dtype=self.dtype)))
+        workspace = workspace_or_new(workspace)
+        ISI = self.BISI if back else self.ISI
+        present = self._present(FUELTYPE)
+        # The Eq. 26 curve of every fuel type present, and the curves the mixedwood types
+        # combine (C2, D1, M3 and M4), at every coarse cell. As in RSIcalc, the former are
+        # evaluated with per element parameters and the latter with scalar ones (NumPy
+        # squares, rather than raises to the power, for a scalar exponent of 2).
+        own = {int(fuel): _RSI26(np.full(ISI.shape, fuel, np.uint8), ISI, self.approx)
+               for fuel in present}
+        mixed = set()
+        if set(present) & {FuelType.M1, FuelType.M2}:
+            mixed |= {FuelType.C2, FuelType.D1}
+        if set(present) & {FuelType.M3, FuelType.M4}:
+            mixed |= {FuelType.M3, FuelType.M4, FuelType.D1}
+        table = {int(fuel): _RSI26(FuelType(fuel), ISI, self.approx) for fuel in mixed}
+        RSI, = workspace.scratch('CoarseWeather.ROS', 1, self.index.shape, self.dtype)
+
+        def curve(fuel: FuelType, mask: ndarray) -> ndarray:
+            if fuel is None:
+                return self._lookup(own, FUELTYPE, RSI, workspace)
+            # Fuel types absent from the table are absent from the grid, so mask is empty
+            return table.get(fuel, ISI)[self.index[mask]]
+        RSI = _RSIcombine(FUELTYPE, curve, PC, PDF, CC, RSI)
+        ROS = self.BE(FUELTYPE, out, workspace)
+        np.multiply(ROS, RSI, out=ROS)
+        # C6 has its own spread rate calculation, which includes crowning
+        mask = FUELTYPE == FuelType.C6
+        if mask.any():
+            coarse = self.index[mask]
+            ROS[mask] = C6calc(FUELTYPE[mask], ISI[coarse], self.BUI[coarse], FMC[mask],
+                               SFC[mask], CBH[mask], option="ROS", workspace=workspace,
+                               dtype=self.dtype)
+        negative, = workspace.scratch('CoarseWeather.ROS', 1, ROS.shape, bool)
+        np.copyto(ROS, 0.000001, where=np.less(ROS, 0, out=negative))
+        return ROS
+
+    def CFB(self,  # pylint: disable=too-many-arguments
+            FUELTYPE: ndarray,
+            FMC: ndarray,
+            SFC: ndarray,
+            CBH: ndarray,
+            ROS: ndarray,
+            out: ndarray = None,
+            workspace: Workspace = None) -> ndarray:
+        """
+        Crown Fraction Burned on the fine grid (as fbp): from the head fire Rate of Spread,
+        and zero for fuel types without a crown fuel load.
+
+        Keyword arguments:
+        FUELTYPE -- The Fire Behaviour Prediction FuelType (strings or FuelType codes)
+        FMC -- Foliar Moisture Content
+        SFC -- Surface Fuel Consumption (kg/m^2)
+        CBH -- Crown Base Height (m)
+        ROS -- Rate of Spread (m/min) on the fine grid, as calculated by ROS
+        out -- Optional array to write the result to
+        workspace -- Optional Workspace to reuse scratch arrays from
+
+        All but out and workspace are fine grids, or values for every fine cell.
+        """
+        FUELTYPE, FMC, SFC, CBH, ROS = (
+            np.broadcast_to(value, self.index.shape) for value in
+            (fuel_codes(FUELTYPE), *as_arrays(FMC, SFC, CBH, ROS, dtype=self.dtype)))
+        workspace = workspace_or_new(workspace)
+        CSI, RSO, CFL = workspace.scratch('CoarseWeather.CFB', 3, self.index.shape,
+                                          self.dtype)
+        # Eqs. 56 & 57 (FCFDG 1992) Critical surface intensity, and surface fire rate of
+        # spread for crowning
+        CSI = _CSIcalc(FMC, CBH, CSI, workspace)
+        RSO = _RSOcalc(CSI, SFC, RSO)
+        # Eq. 58 (FCFDG 1992) Crown fraction burned, only for fuel types with a crown fuel load
+        # CFB = np.where(CFL > 0, _CFBcalc(ROS, RSO), 0)
+        CFB = _CFBcalc(ROS, RSO, output(out, self.index.shape, self.dtype), workspace)
+        np.take(FUEL_PARAMETERS['CFL'], FUELTYPE, out=CFL)
+        no_crown, = workspace.scratch('CoarseWeather.CFB', 1, self.index.shape, bool)
+        np.copyto(CFB, 0, where=np.less_equal(CFL, 0, out=no_crown))
+        # C6 has its own crown fraction burned, from its surface fire spread rate
+        mask = FUELTYPE == FuelType.C6
+        if mask.any():
+            coarse = self.index[mask]
+            CFB[mask] = C6calc(FUELTYPE[mask], self.ISI[coarse], self.BUI[coarse], FMC[mask],
+                               SFC[mask], CBH[mask], option="CFB", workspace=workspace,
+                               dtype=self.dtype)
+        return CFB
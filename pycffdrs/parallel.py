@@ -0,0 +1,260 @@
+"""
+Multi-core execution of the calculators.
+
+Every calculator works element by element, so a call can be split along the element (first)
+axis, and the parts calculated by different workers. Executor does that, with one of two
+backends:
+
+  thread  -- Worker threads. NumPy releases the GIL inside its ufuncs, so threads scale well
+             on large arrays, and no data is copied between workers.
+  process -- Worker processes. Array arguments and results are placed in
+             multiprocessing.shared_memory blocks, so that they are not pickled; only the
+             names of the blocks, and the slice each worker calculates, are sent to workers.
+
+Results are bit-identical to calling the calculator directly, whatever the number of workers.
+A Workspace must not be used by concurrent calls, so a workspace argument is replaced by one
+workspace per worker thread (or process), kept for the worker's lifetime.
+"""
+from concurrent.futures import Executor as _Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+import os
+import threading
+from typing import Callable, Dict, List, Tuple, Union
+from numpy import ndarray
+import numpy as np
+from pycffdrs.workspace import Workspace
+
+BACKENDS = ('thread', 'process')
+
+# Calls with fewer elements than this per worker are not worth splitting up further
+MIN_CHUNK_SIZE = 8192
+
+Result = Union[ndarray, Dict[str, ndarray]]
+
+# The workspace of each worker thread
+_local = threading.local()
+
+
+def _split(value, length: int) -> bool:
+    """ Whether an argument is split along the element axis. """
+    return isinstance(value, ndarray) and value.ndim > 0 and len(value) == length
+
+
+def _length(args: tuple, kwargs: dict) -> int:
+    """ Number of elements along the element axis: the longest array argument. """
+    lengths = [len(value) for value in (*args, *kwargs.values())
+               if isinstance(value, ndarray) and value.ndim > 0]
+    return max(lengths, default=0)
+
+
+def _arrays(args: tuple, kwargs: dict) -> Tuple[tuple, dict]:
+    """ List and tuple arguments as arrays; anything else is passed on as it is. """
+    def array(value):
+        return np.asarray(value) if isinstance(value, (list, tuple)) else value
+    return tuple(array(value) for value in args), {
+        name: array(value) for name, value in kwargs.items()}
+
+
+def _workspace() -> Workspace:
+    """ The calling thread's own workspace. """
+    workspace = getattr(_local, 'workspace', None)
+    if workspace is None:
+        workspace = _local.workspace = Workspace()
+    return workspace
+
+
+def _chunk(value, chunk: slice, length: int):
+    """ A chunk of an argument, if it is split, or the calling thread's own workspace in
+    place of a workspace. """
+    if isinstance(value, Workspace):
+        return _workspace()
+    return value[chunk] if _split(value, length) else value
+
+
+def _call(function: Callable, args: tuple, kwargs: dict, chunk: slice, length: int) -> Result:
+    """ Call function on a chunk of its arguments. """
+    return function(*(_chunk(value, chunk, length) for value in args),
+                    **{name: _chunk(value, chunk, length) for name, value in kwargs.items()})
+
+
+def _empty_like(probe: Result, length: int, allocate: Callable = np.empty) -> Result:
+    """ Results of length elements, shaped like the result of a one element probe call. """
+    if isinstance(probe, dict):
+        return {name: _empty_like(value, length, allocate) for name, value in probe.items()}
+    probe = np.asarray(probe)
+    return allocate((length,) + probe.shape[1:], probe.dtype)
+
+
+def _store(result: Result, out: Result, chunk: slice):
+    """ Copy a chunk's result into the full results. """
+    if isinstance(out, dict):
+        for name, value in out.items():
+            value[chunk] = result[name]
+    else:
+        out[chunk] = result
+
+
+def _from_shared(value, blocks: List[shared_memory.SharedMemory]):
+    """ Rebuild an argument or result that was described for a worker process. """
+    if isinstance(value, dict):
+        return {name: _from_shared(item, blocks) for name, item in value.items()}
+    if isinstance(value, tuple) and value and value[0] == _SharedArray:
+        _, name, shape, dtype = value
+        # Worker processes share the parent's resource tracker, so the block stays registered
+        # once, and is unregistered when the parent unlinks it.
+        blocks.append(shared_memory.SharedMemory(name=name))
+        return np.ndarray(shape, dtype=dtype, buffer=blocks[-1].buf)
+    return value
+
+
+class _SharedArray:  # pylint: disable=too-few-public-methods
+    """ Marks the description of an array in shared memory: (_SharedArray, name, shape, dtype)
+    """
+
+
+def _process_chunk(function: Callable, args: tuple, kwargs: dict, out, chunk: slice,
+                   length: int):
+    """ Worker process: calculate a chunk, reading and writing shared memory. """
+    blocks: List[shared_memory.SharedMemory] = []
+    try:
+        args = tuple(_from_shared(value, blocks) for value in args)
+        kwargs = {name: _from_shared(value, blocks) for name, value in kwargs.items()}
+        _store(_call(function, args, kwargs, chunk, length), _from_shared(out, blocks), chunk)
+    finally:
+        # Views of the blocks must be released before the blocks can be closed
+        args = kwargs = out = None
+        for block in blocks:
+            block.close()
+
+
+class Executor:
+    """
+    Splits calculator calls across workers along the element axis.
+
+    Keyword arguments:
+    workers -- Number of workers (default: the number of CPUs)
+    backend -- 'thread' or 'process'
+    chunk_size -- Elements per chunk (default: an equal share per worker, but at least
+                  MIN_CHUNK_SIZE)
+
+    Use as a context manager, or call close(), to stop the workers:
+
+        with Executor(workers=8) as executor:
+            ROS = executor.run(ROScalc, FUELTYPE, ISI, BUI, FMC, SFC, PC, PDF, CC, CBH)
+    """
+
+    def __init__(self, workers: int = None, backend: str = 'thread', chunk_size: int = None):
+        if backend not in BACKENDS:
+            raise ValueError(f'Unknown backend {backend}, expected one of {BACKENDS}')
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend
+        self.chunk_size = chunk_size
+        self._pool: _Executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """ Stop the workers. """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _chunks(self, length: int) -> List[slice]:
+        size = self.chunk_size or max(MIN_CHUNK_SIZE, -(-length // self.workers))
+        return [slice(start, min(start + size, length)) for start in range(0, length, size)]
+
+    def run(self, function: Callable, *args, **kwargs) -> Result:
+        """
+        Call function(*args, **kwargs), split across the workers.
+
+        Array arguments (including lists and tuples) as long as the longest of them are split
+        along their first axis; other arguments, such as scalars and options, are passed to
+        every part of the call, but for a Workspace, which is replaced by each worker's own.
+        function must return an array, or a dictionary of arrays, with one element per element
+        of its arguments. For the process backend, function must be importable by name (as all
+        the calculators are).
+        """
+        args, kwargs = _arrays(args, kwargs)
+        length = _length(args, kwargs)
+        chunks = self._chunks(length)
+        if len(chunks) <= 1:
+            return function(*args, **kwargs)
+        if self._pool is None:
+            self._pool = (ThreadPoolExecutor(self.workers) if self.backend == 'thread'
+                          else ProcessPoolExecutor(self.workers))
+        # The type and structure of the result, from a call on a single element
+        probe = _call(function, args, kwargs, slice(0, 1), length)
+        if self.backend == 'thread':
+            return self._run_threads(function, args, kwargs, probe, chunks, length)
+        return self._run_processes(function, args, kwargs, probe, chunks, length)
+
+    def _run_threads(self,  # pylint: disable=too-many-arguments
+                     function: Callable, args: tuple, kwargs: dict, probe: Result,
+                     chunks: List[slice], length: int) -> Result:
+        out = _empty_like(probe, length)
+
+        def calculate(chunk: slice):
+            _store(_call(function, args, kwargs, chunk, length), out, chunk)
+        for future in [self._pool.submit(calculate, chunk) for chunk in chunks]:
+            future.result()
+        return out
+
+    def _run_processes(self,  # pylint: disable=too-many-arguments,too-many-locals
+                       function: Callable, args: tuple, kwargs: dict, probe: Result,
+                       chunks: List[slice], length: int) -> Result:
+        blocks: List[shared_memory.SharedMemory] = []
+        descriptions: Dict[int, tuple] = {}
+
+        def allocate(shape: Tuple[int, ...], dtype) -> ndarray:
+            """ An array in a new shared memory block. """
+            dtype = np.dtype(dtype)
+            blocks.append(shared_memory.SharedMemory(
+                create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize)))
+            array = np.ndarray(shape, dtype=dtype, buffer=blocks[-1].buf)
+            descriptions[id(array)] = (_SharedArray, blocks[-1].name, shape, dtype.str)
+            return array
+
+        def to_shared(value):
+            """ Copy array arguments to shared memory, and describe them for the workers. """
+            if isinstance(value, Workspace):
+                # Only marks where the workers use their own workspaces: not worth pickling
+                return Workspace()
+            if not isinstance(value, ndarray) or value.dtype == object:
+                return value
+            array = allocate(value.shape, value.dtype)
+            array[...] = value
+            return descriptions[id(array)]
+
+        out = None
+        try:
+            shared_args = tuple(to_shared(value) for value in args)
+            shared_kwargs = {name: to_shared(value) for name, value in kwargs.items()}
+            out = _empty_like(probe, length, allocate)
+            shared_out = ({name: descriptions[id(value)] for name, value in out.items()}
+                          if isinstance(out, dict) else descriptions[id(out)])
+            for future in [self._pool.submit(_process_chunk, function, shared_args,
+                                             shared_kwargs, shared_out, chunk, length)
+                           for chunk in chunks]:
+                future.result()
+            # Copy the results out of shared memory, which is released below
+            if isinstance(out, dict):
+                return {name: value.copy() for name, value in out.items()}
+            return out.copy()
+        finally:
+            # Views of the blocks must be released before the blocks can be closed
+            out = None
+            descriptions.clear()
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+
+def run(function: Callable, *args, workers: int = None, backend: str = 'thread',
+        **kwargs) -> Result:
+    """ Call function(*args, **kwargs) once, split across a temporary Executor's workers. """
+    with Executor(workers, backend) as executor:
+        return executor.run(function, *args, **kwargs)
@@ -0,0 +1,137 @@
+"""
+Grouping of grid elements by fuel type.
+
+The calculators branch on FUELTYPE per element: each fuel dependent step compares the whole
+FUELTYPE array against a fuel type, and gathers and scatters the selected elements through
+a boolean mask. FuelPartition sorts the elements of a grid by fuel type once (a stable sort
+of the uint8 codes, which NumPy does as a radix sort), so that each fuel type's elements are
+one contiguous slice. Given the partition, ROScalc, BROScalc, BEcalc, C6calc and DISTtcalc
+select fuel types with slices (views, rather than masks and copies), and use scalar per fuel
+parameters rather than per element lookups:
+
+    partition = FuelPartition(FUELTYPE)
+    ISI, BUI, FMC, ... = partition.gather(ISI, BUI, FMC, ...)
+    ROS = ROScalc(partition.FUELTYPE, ISI, BUI, FMC, ..., partition=partition)
+    BROS = BROScalc(partition.FUELTYPE, ..., partition=partition)
+    ...
+    ROS, BROS = partition.scatter(ROS), partition.scatter(BROS)
+
+The partition of a fuel grid is the same every day, so it can be made once, and inputs that
+don't change from day to day (FMC, SFC, PC, ...) gathered once. Results are identical to
+calling the calculators on the grid.
+
+Given a partition, the calculators take FUELTYPE in partition order (partition.FUELTYPE), and
+other inputs as scalars or gathered 1-D arrays; they raise ValueError for inputs in grid
+order or shape (see check_order). A 1-D grid's inputs have the same shape in either order,
+so those must be gathered with care.
+"""
+from typing import Tuple, Union
+from numpy import ndarray
+import numpy as np
+from pycffdrs.fueltypes import FuelType, fuel_codes
+
+
+class FuelPartition:
+    """
+    The elements of a grid, in fuel type order.
+
+    Keyword arguments:
+    FUELTYPE -- The Fire Behaviour Prediction FuelType of the grid (strings or FuelType codes)
+
+    Attributes:
+    shape -- Shape of the grid
+    order -- Flat (C order) grid index of each element, in fuel type order
+    FUELTYPE -- FuelType codes in fuel type order: partition.gather(FUELTYPE)
+    """
+
+    def __init__(self, FUELTYPE: ndarray):
+        codes = fuel_codes(FUELTYPE)
+        self.shape = codes.shape
+        codes = codes.ravel()
+        self.order = np.argsort(codes, kind='stable')
+        self.FUELTYPE = codes[self.order]  # pylint: disable=invalid-name
+        # Fuel type f is at [bounds[f], bounds[f + 1])
+        self._bounds = np.zeros(len(FuelType) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(codes, minlength=len(FuelType)), out=self._bounds[1:])
+
+    @property
+    def size(self) -> int:
+        """ Number of elements. """
+        return len(self.order)
+
+    def fuels(self) -> Tuple[FuelType, ...]:
+        """ The fuel types present, in order. """
+        return tuple(FuelType(fuel) for fuel in np.flatnonzero(np.diff(self._bounds)))
+
+    def group(self, *fuels: FuelType) -> slice:
+        """
+        The slice of the elements of the given fuel types, which must be consecutive FuelType
+        codes (e.g. FuelType.O1A and FuelType.O1B).
+
+        Raises:
+        ValueError if the fuel types are not consecutive.
+        """
+        first, last = min(fuels), max(fuels)
+        if last - first + 1 != len(set(fuels)):
+            raise ValueError(f'Fuel types {fuels} are not consecutive')
+        return slice(self._bounds[first], self._bounds[last + 1])
+
+    def gather(self, *values: ndarray) -> Union[ndarray, Tuple[ndarray, ...]]:
+        """
+        Grid values in fuel type order: one value, or a tuple of them if given several.
+        Values that are the same for every element (scalars) are returned as they are; other
+        values are broadcast to the grid's shape.
+        """
+        gathered = tuple(value if np.ndim(value) == 0 else
+                         np.take(np.broadcast_to(value, self.shape).reshape(-1), self.order)
+                         for value in values)
+        return gathered[0] if len(values) == 1 else gathered
+
+    def scatter(self, value: ndarray, out: ndarray = None) -> ndarray:
+        """ Values in fuel type order, back in grid order and shape. """
+        value = np.asarray(value)
+        if out is None:
+            out = np.empty(self.shape, dtype=value.dtype)
+        elif out.shape != self.shape:
+            raise ValueError(f'out has shape {out.shape}, expected {self.shape}')
+        np.put(out, self.order, value)
+        return out
+
+
+def check_order(partition: FuelPartition, FUELTYPE: ndarray, *values: ndarray):
+    """
+    Check that a calculator's inputs are in partition order, if given a partition: FUELTYPE
+    is partition.FUELTYPE (or equal to it), and the other values are scalars (or None) or
+    1-D arrays of partition.size elements.
+
+    Raises:
+    ValueError if they are not.
+    """
+    if partition is None:
+        return
+    if FUELTYPE is not partition.FUELTYPE and not np.array_equal(fuel_codes(FUELTYPE),
+                                                                 partition.FUELTYPE):
+        raise ValueError('FUELTYPE is not in partition order: use partition.FUELTYPE')
+    for value in values:
+        if np.ndim(value) != 0 and np.shape(value) != (partition.size,):
+            raise ValueError(f'Inputs of shape {np.shape(value)} are not in partition order: '
+                             f'gather them with partition.gather, to shape ({partition.size},)')
+
+
+def select(FUELTYPE: ndarray,
+           partition: FuelPartition,
+           *fuels: FuelType) -> Union[ndarray, slice]:
+    """
+    The elements of FUELTYPE of the given fuel types: a slice if FUELTYPE is in partition
+    order, or else a mask.
+    """
+    if partition is not None:
+        return partition.group(*fuels)
+    if len(fuels) == 1:
+        return FUELTYPE == fuels[0]
+    return np.isin(FUELTYPE, fuels)
+
+
+def selected(value: ndarray, group: slice) -> ndarray:
+    """ The elements of value in a group, or value itself if it is the same for all. """
+    return value if np.ndim(value) == 0 else value[group]
@@ -0,0 +1,179 @@
+"""
+Elliptical fire perimeters, for many ignitions at once.
+
+The FBP System models a fire's shape as an ellipse (FCFDG 1992), with the ignition point on
+its major axis: the head fire spreads DH = ROS * t along the head direction, the back fire
+DB = BROS * t the other way, and the flanks DF = FROS * t either side. perimeters computes
+the vertices of every ignition's ellipse in one vectorized call:
+
+    vertices = perimeters(X, Y, RAZ, ROS, BROS, FROS, HR)   # (ignitions, vertices, 2)
+
+For ensembles too large to hold every perimeter at once, perimeter_chunks yields them a
+chunk of ignitions at a time, in a reused buffer:
+
+    for chunk, vertices in perimeter_chunks(X, Y, RAZ, ROS, BROS, FROS, HR):
+        write(vertices)
+"""
+from typing import Iterator, Tuple
+from numpy import ndarray
+import numpy as np
+from pycffdrs.DISTtcalc import _DISTtfactor
+from pycffdrs.fueltypes import fuel_codes
+from pycffdrs.instrument import instrumented
+from pycffdrs.workspace import (Workspace, as_arrays, broadcast, float_dtype, output,
+                                workspace_or_new)
+
+# Number of vertices of each perimeter
+VERTICES = 64
+
+# Number of ignitions per chunk, for perimeter_chunks
+CHUNK_SIZE = 4096
+
+
+def _ignitions(X: ndarray,  # pylint: disable=too-many-arguments
+               Y: ndarray,
+               RAZ: ndarray,
+               ROS: ndarray,
+               BROS: ndarray,
+               FROS: ndarray,
+               HR: ndarray,
+               FUELTYPE: ndarray,
+               CFB: ndarray,
+               dtype: np.dtype) -> Tuple[ndarray, ...]:
+    """ The inputs, broadcast to the ignitions' shape: FUELTYPE and CFB only if given. """
+    if (FUELTYPE is None) != (CFB is None):
+        raise ValueError('FUELTYPE and CFB must be given together')
+    values = as_arrays(X, Y, RAZ, ROS, BROS, FROS, HR, dtype=dtype)
+    if FUELTYPE is not None:
+        values += (fuel_codes(FUELTYPE), *as_arrays(CFB, dtype=dtype))
+    return broadcast(*values)
+
+
+@instrumented
+def perimeters(X: ndarray,  # pylint: disable=too-many-arguments, too-many-locals
+               Y: ndarray,
+               RAZ: ndarray,
+               ROS: ndarray,
+               BROS: ndarray,
+               FROS: ndarray,
+               HR: ndarray,
+               FUELTYPE: ndarray = None,
+               CFB: ndarray = None,
+               vertices: int = VERTICES,
+               out: ndarray = None,
+               workspace: Workspace = None,
+               dtype=None) -> ndarray:
+    """
+    Elliptical fire perimeters of many ignitions.
+
+    Keyword arguments:
+    X, Y -- Ignition point coordinates (m, in a projected coordinate system, with Y to the
+            north)
+    RAZ -- Head fire spread direction (degrees, clockwise from north)
+    ROS -- Rate of Spread (m/min)
+    BROS -- Back Fire Rate of Spread (m/min)
+    FROS -- Flank Fire Spread Rate (m/min)
+    HR -- The elapsed time (min)
+    FUELTYPE, CFB -- Optional Fire Behaviour Prediction FuelType and Crown Fraction Burned, to
+                     account for acceleration in the spread distances (Eqs. 71 & 72, as
+                     DISTtcalc and fbp's DH, DB and DF). Without them, distances are the
+                     spread rates times HR.
+    vertices -- Number of vertices of each perimeter
+    out -- Optional array to write the result to
+    workspace -- Optional Workspace to reuse scratch arrays from
+    dtype -- np.float64 or np.float32 (default: see pycffdrs.workspace). float32 resolves
+             coordinates of the order of 1e6 m to about 0.1 m.
+
+    All but vertices, out, workspace and dtype are arrays of ignitions (of any shape), or
+    values for all ignitions.
+
+    Returns:
+    The vertices' X and Y coordinates, of shape (ignitions..., vertices, 2). Each perimeter
+    starts at the head fire, and runs counterclockwise. The first vertex is not repeated at
+    the end.
+
+    Raises:
+    ValueError if only one of FUELTYPE and CFB is given.
+    """
+    dtype = float_dtype(dtype)
+    values = _ignitions(X, Y, RAZ, ROS, BROS, FROS, HR, FUELTYPE, CFB, dtype)
+    X, Y, RAZ, ROS, BROS, FROS, HR = values[:7]
+    shape = X.shape
+    result = output(out, shape + (vertices, 2), dtype)
+    workspace = workspace_or_new(workspace)
+    ahead, semi_major, semi_minor, sin, cos = workspace.scratch('perimeters', 5, shape, dtype)
+    along, across, t = workspace.scratch('perimeters.vertices', 3, shape + (vertices,), dtype)
+    # The acceleration adjusted elapsed time, such that a spread distance is its spread rate
+    # times the time (Eqs. 71 & 72, FCFDG 1992)
+    if FUELTYPE is not None:
+        FUELTYPE, CFB = values[7:]
+        HR = _DISTtfactor(FUELTYPE, HR, CFB, workspace=workspace)
+    # The ellipse's centre is (DH - DB) / 2 ahead of the ignition point, and its semi-axes
+    # are (DH + DB) / 2 along the head direction and DF across it
+    np.subtract(ROS, BROS, out=ahead)
+    np.multiply(ahead, HR, out=ahead)
+    np.divide(ahead, 2, out=ahead)
+    np.add(ROS, BROS, out=semi_major)
+    np.multiply(semi_major, HR, out=semi_major)
+    np.divide(semi_major, 2, out=semi_major)
+    np.multiply(FROS, HR, out=semi_minor)
+    np.radians(RAZ, out=sin)
+    np.cos(sin, out=cos)
+    np.sin(sin, out=sin)
+    # Each vertex's position along and across the head direction (to the left)
+    angle = np.linspace(0, 2 * np.pi, vertices, endpoint=False).astype(dtype)
+    np.multiply(semi_major[..., None], np.cos(angle), out=along)
+    np.add(along, ahead[..., None], out=along)
+    np.multiply(semi_minor[..., None], np.sin(angle), out=across)
+    # X = X + along * sin(RAZ) - across * cos(RAZ)
+    # Y = Y + along * cos(RAZ) + across * sin(RAZ)
+    x, y = result[..., 0], result[..., 1]
+    np.multiply(along, sin[..., None], out=x)
+    np.multiply(across, cos[..., None], out=t)
+    np.subtract(x, t, out=x)
+    np.add(x, X[..., None], out=x)
+    np.multiply(along, cos[..., None], out=y)
+    np.multiply(across, sin[..., None], out=t)
+    np.add(y, t, out=y)
+    np.add(y, Y[..., None], out=y)
+    return result
+
+
+def perimeter_chunks(X: ndarray,  # pylint: disable=too-many-arguments, too-many-locals
+                     Y: ndarray,
+                     RAZ: ndarray,
+                     ROS: ndarray,
+                     BROS: ndarray,
+                     FROS: ndarray,
+                     HR: ndarray,
+                     FUELTYPE: ndarray = None,
+                     CFB: ndarray = None,
+                     vertices: int = VERTICES,
+                     chunk_size: int = CHUNK_SIZE,
+                     dtype=None) -> Iterator[Tuple[slice, ndarray]]:
+    """
+    Elliptical fire perimeters of many ignitions (as perimeters), a chunk of ignitions at a
+    time, so that memory use is bounded by the chunk size rather than the number of
+    ignitions.
+
+    The ignitions are taken in flat (C order) index order. Yields the slice of each chunk's
+    ignitions, and their vertices, of shape (ignitions in the chunk, vertices, 2). The
+    vertices are written to the same buffer for every chunk: copy them to keep them past the
+    next chunk.
+
+    Raises:
+    ValueError if chunk_size is less than 1, or if only one of FUELTYPE and CFB is given.
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1')
+    dtype = float_dtype(dtype)
+    values = [value.ravel() for value in
+              _ignitions(X, Y, RAZ, ROS, BROS, FROS, HR, FUELTYPE, CFB, dtype)]
+    count = len(values[0])
+    workspace = Workspace()
+    buffer = np.empty((min(chunk_size, count), vertices, 2), dtype=dtype)
+    for start in range(0, count, chunk_size):
+        chunk = slice(start, min(start + chunk_size, count))
+        yield chunk, perimeters(*(value[chunk] for value in values), vertices=vertices,
+                                out=buffer[:chunk.stop - start], workspace=workspace,
+                                dtype=dtype)
@@ -0,0 +1,186 @@
+"""
+Tiled processing of grids that are larger than memory.
+
+Weather and fuel grids are opened as memory-mapped arrays (.npy files, or raw binary files
+of a known shape and type), and results are written to memory-mapped output grids. The grids
+are processed a tile (a run of consecutive cells, in storage order) at a time, so that
+reading and writing is sequential, the arrays of one tile stay in cache, and memory use is
+flat whatever the size of the grid: every tile reuses the same Workspace.
+"""
+from pathlib import Path
+from typing import Callable, Dict, Mapping, Tuple, Union
+from numpy import ndarray
+import numpy as np
+from pycffdrs.buiCalc import buiCalc
+from pycffdrs.dcCalc import dcCalc
+from pycffdrs.dmcCalc import dmcCalc
+from pycffdrs.fbp import fbp, OUTPUTS as FBP_OUTPUTS
+from pycffdrs.ffmcCalc import ffmcCalc
+from pycffdrs.fwiCalc import fwiCalc
+from pycffdrs.ISIcalc import ISIcalc
+from pycffdrs.dailyfwi import OUTPUTS as FWI_OUTPUTS
+from pycffdrs.workspace import Workspace, float_dtype, workspace_or_new
+
+# Cells per tile. With the 20 or so arrays a tile of fbp needs, 16384 float64 cells per array
+# keep a tile within a few MB of cache.
+TILE_SIZE = 16384
+
+# fwi_grid inputs, named as the dailyfwi and R fwi arguments
+FWI_INPUTS = ('ffmc_yda', 'dmc_yda', 'dc_yda', 'temp', 'rh', 'ws', 'prec', 'lat', 'mon')
+
+# fbp_grid inputs, named as the fbp arguments
+FBP_INPUTS = ('FUELTYPE', 'FFMC', 'BUI', 'WSV', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH', 'LB',
+              'HR')
+
+Grid = Union[ndarray, float, int]
+
+
+def open_grid(path: Union[str, Path], shape: Tuple[int, ...] = None, dtype=None) -> ndarray:
+    """
+    Open a grid read-only, as a memory-mapped array.
+
+    Keyword arguments:
+    path -- A .npy file, or a raw binary file
+    shape -- Shape of a raw binary grid (not needed for .npy files)
+    dtype -- Data type of a raw binary grid (default: see pycffdrs.workspace)
+    """
+    if Path(path).suffix == '.npy':
+        return np.load(path, mmap_mode='r')
+    if shape is None:
+        raise ValueError('The shape of a raw binary grid must be given')
+    return np.memmap(path, dtype=float_dtype() if dtype is None else dtype, mode='r',
+                     shape=shape)
+
+
+def create_grid(path: Union[str, Path], shape: Tuple[int, ...], dtype=None) -> ndarray:
+    """
+    Create an output grid, as a writable memory-mapped array.
+
+    Keyword arguments:
+    path -- A .npy file, or any other name for a raw binary file
+    shape -- Shape of the grid
+    dtype -- Data type of the grid (default: see pycffdrs.workspace)
+    """
+    dtype = float_dtype(dtype)
+    if Path(path).suffix == '.npy':
+        return np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+    return np.memmap(path, dtype=dtype, mode='w+', shape=shape)
+
+
+def _flat(name: str, grid: Grid, shape: Tuple[int, ...]) -> Grid:
+    """ A grid as a flat (storage order) array; scalars are kept as they are. """
+    if np.ndim(grid) == 0:
+        return grid
+    if np.shape(grid) != shape:
+        raise ValueError(f'{name} has shape {np.shape(grid)}, expected {shape}')
+    if not grid.flags.c_contiguous:
+        raise ValueError(f'{name} is not stored contiguously (C order)')
+    return grid.reshape(-1)
+
+
+def process_tiles(function: Callable[[Dict[str, ndarray], Dict[str, ndarray], Workspace], None],
+                  inputs: Mapping[str, Grid],
+                  outputs: Mapping[str, ndarray],
+                  tile_size: int = TILE_SIZE,
+                  workspace: Workspace = None):
+    """
+    Apply function to a set of grids, a tile at a time.
+
+    Keyword arguments:
+    function -- Called as function(inputs, outputs, workspace) for each tile, with
+                dictionaries of the tile's (1 dimensional) input and output arrays. It must
+                write its results into the output arrays.
+    inputs -- Input grids, by name. Scalars apply to every cell.
+    outputs -- Output grids, by name (e.g. from create_grid). All grids must have the same
+               shape, and be stored contiguously.
+    tile_size -- Number of cells per tile
+    workspace -- Optional Workspace to reuse scratch arrays from
+    """
+    if not outputs:
+        raise ValueError('At least one output grid is needed')
+    shape = np.shape(next(iter(outputs.values())))
+    inputs = {name: _flat(name, grid, shape) for name, grid in inputs.items()}
+    flat_outputs = {name: _flat(name, grid, shape) for name, grid in outputs.items()}
+    workspace = workspace_or_new(workspace)
+    size = int(np.prod(shape))
+    for start in range(0, size, tile_size):
+        tile = slice(start, min(start + tile_size, size))
+        length = tile.stop - tile.start
+        function({name: np.broadcast_to(grid, (length,)) if np.ndim(grid) == 0 else grid[tile]
+                  for name, grid in inputs.items()},
+                 {name: grid[tile] for name, grid in flat_outputs.items()},
+                 workspace)
+    for grid in outputs.values():
+        if isinstance(grid, np.memmap):
+            grid.flush()
+
+
+def _all_outputs(names: Tuple[str, ...],
+                 outputs: Dict[str, ndarray],
+                 workspace: Workspace) -> Dict[str, ndarray]:
+    """ The tile's output arrays, with scratch arrays for the outputs that are not wanted. """
+    length = len(next(iter(outputs.values())))
+    missing = [name for name in names if name not in outputs]
+    scratch = workspace.scratch('raster', len(missing), (length,))
+    return {**dict(zip(missing, scratch)), **outputs}
+
+
+def fwi_grid(inputs: Mapping[str, Grid],
+             outputs: Mapping[str, ndarray],
+             lat_adjust: bool = True,
+             tile_size: int = TILE_SIZE):
+    """
+    Calculate one day of the FWI System over a grid, a tile at a time.
+
+    Keyword arguments:
+    inputs -- Grids (or scalars) for each of FWI_INPUTS: yesterday's FFMC, DMC and DC, noon
+              temperature, relative humidity, wind speed and 24 hour precipitation, latitude
+              and month
+    outputs -- Grids to write any of FFMC, DMC, DC, ISI, BUI and FWI to
+    lat_adjust -- Latitude adjustment of the DMC and DC day length factors
+    tile_size -- Number of cells per tile
+    """
+    missing = set(FWI_INPUTS) - set(inputs)
+    if missing:
+        raise ValueError(f'Missing inputs: {sorted(missing)}')
+
+    def tile(tile_inputs: Dict[str, ndarray], tile_outputs: Dict[str, ndarray],
+             workspace: Workspace):
+        ffmc_yda, dmc_yda, dc_yda, temp, rh, ws, prec, lat, mon = (
+            tile_inputs[name] for name in FWI_INPUTS)
+        out = _all_outputs(FWI_OUTPUTS, tile_outputs, workspace)
+        ffmcCalc(ffmc_yda, temp, rh, ws, prec, out=out['FFMC'], workspace=workspace)
+        dmcCalc(dmc_yda, temp, rh, prec, lat, mon, lat_adjust, out=out['DMC'],
+                workspace=workspace)
+        dcCalc(dc_yda, temp, rh, prec, lat, mon, lat_adjust, out=out['DC'], workspace=workspace)
+        ISIcalc(out['FFMC'], ws, out=out['ISI'], workspace=workspace)
+        buiCalc(out['DMC'], out['DC'], out=out['BUI'], workspace=workspace)
+        fwiCalc(out['ISI'], out['BUI'], out=out['FWI'], workspace=workspace)
+
+    process_tiles(tile, inputs, outputs, tile_size)
+
+
+def fbp_grid(inputs: Mapping[str, Grid],
+             outputs: Mapping[str, ndarray],
+             fbpMod: bool = True,
+             tile_size: int = TILE_SIZE):
+    """
+    Calculate the primary Fire Behaviour Prediction outputs over a grid, a tile at a time.
+
+    Keyword arguments:
+    inputs -- Grids (or scalars) for each of FBP_INPUTS, as the fbp arguments. FUELTYPE
+              should be a grid of FuelType codes.
+    outputs -- Grids to write any of the fbp outputs to
+    fbpMod -- As fbp
+    tile_size -- Number of cells per tile
+    """
+    missing = set(FBP_INPUTS) - set(inputs)
+    if missing:
+        raise ValueError(f'Missing inputs: {sorted(missing)}')
+
+    def tile(tile_inputs: Dict[str, ndarray], tile_outputs: Dict[str, ndarray],
+             workspace: Workspace):
+        fbp(*(tile_inputs[name] for name in FBP_INPUTS), fbpMod=fbpMod,
+            out=_all_outputs(FBP_OUTPUTS, tile_outputs, workspace), workspace=workspace)
+
+    process_tiles(tile, inputs, outputs, tile_size)
@@ -0,0 +1,238 @@
+"""
+Scalar fast path, for single point requests.
+
+The calculators work on arrays. For a single point, NumPy's per call overhead (converting
+inputs, allocating outputs and scratch arrays, dispatching each ufunc) is about a hundred
+times the arithmetic. These functions calculate one point with the math module and Python
+floats, allocating no arrays, in a few microseconds per call:
+
+    ROS = scalar.ros('C2', ISI=10, BUI=50, FMC=100, SFC=2, PC=0, PDF=0, CC=0, CBH=3)
+
+Each function evaluates the same equations, with the same operations in the same order, as
+the calculator it mirrors (named in its docstring), so that results are identical wherever
+NumPy evaluates exp and pow with the C library, as math does. Where NumPy uses its own
+vectorised (AVX512) exp and pow, results may differ in the last bit or so.
+
+Inputs are expected to be within their valid ranges: outside them, where the calculators
+give NaN, these functions may raise ValueError or ZeroDivisionError instead. The functions
+are not instrumented (see pycffdrs.instrument), to keep the per call overhead down.
+"""
+import math
+from typing import Dict, Union
+from pycffdrs.fueltypes import ALPHA_CONSTANT, FUEL_PARAMETERS, FUELTYPES, FuelType
+
+Fuel = Union[str, int]
+
+# Fuel type codes by name, and the per fuel FBP constants (see FUEL_PARAMETERS) as tuples of
+# Python numbers, indexed by FuelType code
+_CODES = {name: code for code, name in enumerate(FUELTYPES)}
+_a, _b, _c0, _BUIo, _Q50log, _CFL = (tuple(FUEL_PARAMETERS[name].tolist()) for name in
+                                     ('a', 'b', 'c0', 'BUIo', 'Q50log', 'CFL'))
+_CONSTANT_ALPHA = tuple(alpha == ALPHA_CONSTANT for alpha in FUEL_PARAMETERS['alpha'])
+
+_C2, _C6, _D1, _M1, _M2, _M3, _M4 = (
+    FuelType.C2.value, FuelType.C6.value, FuelType.D1.value, FuelType.M1.value,
+    FuelType.M2.value, FuelType.M3.value, FuelType.M4.value)
+_GRASS = (FuelType.O1A.value, FuelType.O1B.value)
+
+
+def fuel_code(FUELTYPE: Fuel) -> int:
+    """
+    The FuelType code of a fuel type, given as a string ("C1", "O1A", ...) or a code.
+
+    Raises:
+    KeyError for an unknown fuel type.
+    """
+    if isinstance(FUELTYPE, str):
+        code = _CODES.get(FUELTYPE)
+        if code is None:
+            raise KeyError(f'Unknown fuel type: {FUELTYPE}')
+        return code
+    code = int(FUELTYPE)
+    if not 0 <= code < len(FUELTYPES):
+        raise KeyError(f'Unknown fuel type code: {code}')
+    return code
+
+
+def ff(ffmc: float) -> float:
+    """ The Fine Fuel Moisture function of the Initial Spread Index (ISIcalc.fFcalc). """
+    # Eq. 10 - Moisture content
+    fm = 147.2 * (101 - ffmc) / (59.5 + ffmc)
+    # Eq. 25 - Fine Fuel Moisture
+    return 91.9 * math.exp(-0.1386 * fm) * (1 + fm ** 5.31 / 49300000)
+
+
+def fw(ws: float, fbpMod: bool = False) -> float:
+    """ The Wind function of the Initial Spread Index (ISIcalc.fWcalc). """
+    # Eqs. 24 & 53a - Wind Effect, with the fbp modification at the extreme end
+    if ws >= 40 and fbpMod:
+        return 12 * (1 - math.exp(-0.0818 * (ws - 28)))
+    return math.exp(0.05039 * ws)
+
+
+def isi(ffmc: float, ws: float, fbpMod: bool = False) -> float:
+    """ Initial Spread Index (ISIcalc). """
+    # Eq. 26 - Spread Index Equation
+    return 0.208 * fw(ws, fbpMod) * ff(ffmc)
+
+
+def be(FUELTYPE: Fuel, BUI: float) -> float:
+    """ Buildup Effect on Fire Spread Rate (BEcalc). """
+    fuel = fuel_code(FUELTYPE)
+    BUIo = _BUIo[fuel]
+    # Eq. 54 (FCFDG 1992) The Buildup Effect
+    if BUI > 0 and BUIo > 0:
+        return math.exp(_Q50log[fuel] * (1 / BUI - 1 / BUIo))
+    return 1.0
+
+
+def _rsi26(fuel: int, ISI: float) -> float:
+    """ Eq. 26 (FCFDG 1992) - Initial Rate of Spread, by fuel type code. """
+    return _a[fuel] * (1 - math.exp(-_b[fuel] * ISI)) ** _c0[fuel]
+
+
+def rsi(FUELTYPE: Fuel, ISI: float, PC: float, PDF: float, CC: float) -> float:
+    """ Initial Rate of Spread (m/min) for all fuel types except C6, which is -1
+    (ROScalc.RSIcalc). """
+    fuel = fuel_code(FUELTYPE)
+    if fuel == _C6:
+        return -1.0
+    # Eq. 27 (FCFDG 1992) - Initial Rate of Spread for M1 & M2 Mixedwood types
+    if fuel == _M1:
+        return PC / 100 * _rsi26(_C2, ISI) + (100 - PC) / 100 * _rsi26(_D1, ISI)
+    if fuel == _M2:
+        return PC / 100 * _rsi26(_C2, ISI) + 0.2 * (100 - PC) / 100 * _rsi26(_D1, ISI)
+    # Eqs. 30 & 33 (Wotton et. al 2009) - Initial Rate of Spread for M3 & M4 Mixedwood types
+    if fuel == _M3:
+        return PDF / 100 * _rsi26(_M3, ISI) + (1 - PDF / 100) * _rsi26(_D1, ISI)
+    if fuel == _M4:
+        return PDF / 100 * _rsi26(_M4, ISI) + 0.2 * (1 - PDF / 100) * _rsi26(_D1, ISI)
+    RSI = _rsi26(fuel, ISI)
+    if fuel in _GRASS:
+        # Eq. 35b (Wotton et. al. 2009) - Curing function for grass
+        CF = 0.005 * (math.exp(0.061 * CC) - 1) if CC < 58.8 else 0.176 + 0.02 * (CC - 58.8)
+        # Eq. 36 (FCFDG 1992) - Initial Rate of Spread for Grass
+        RSI = RSI * CF
+    return RSI
+
+
+def rso(FMC: float, SFC: float, CBH: float) -> float:
+    """ Critical surface fire rate of spread (m/min) (CFBcalc, option="RSO"). """
+    # Eq. 56 (FCFDG 1992) Critical surface intensity
+    CSI = 0.001 * CBH ** 1.5 * (460 + 25.9 * FMC) ** 1.5
+    # Eq. 57 (FCFDG 1992) Surface fire rate of spread (m/min)
+    return CSI / (300 * SFC)
+
+
+def _cfb(ROS: float, RSO: float) -> float:
+    """ Eq. 58 (FCFDG 1992) Crown fraction burned """
+    return 1 - math.exp(-0.23 * (ROS - RSO)) if ROS > RSO else 0.0
+
+
+def cfb(FMC: float, SFC: float, ROS: float, CBH: float) -> float:
+    """ Crown Fraction Burned (CFBcalc). """
+    return _cfb(ROS, rso(FMC, SFC, CBH))
+
+
+def _c6(ISI: float, BE: float, FMC: float, RSO: float):
+    """ C6 Crown Fraction Burned and Rate of Spread (C6calc.C6calc), given the Buildup Effect
+    and the critical surface fire spread rate. """
+    # Eq. 62 & 63 (FCFDG 1992) Surface fire spread rate (m/min)
+    RSS = 30 * (1 - math.exp(-0.08 * ISI)) ** 3.0 * BE
+    # Eqs. 59-61 & 64 (FCFDG 1992) Crown fire spread rate (m/min), with the average foliar
+    # moisture effect of 0.778
+    FME = (1.5 - 0.00275 * FMC) ** 4.0 / (460 + 25.9 * FMC) * 1000
+    RSC = 60 * (1 - math.exp(-0.0497 * ISI)) * FME / 0.778
+    if RSC > RSS:
+        CFB = _cfb(RSS, RSO)
+        # Eq. 65 (FCFDG 1992) Rate of spread (m/min)
+        return CFB, RSS + CFB * (RSC - RSS)
+    return 0.0, RSS
+
+
+def ros(FUELTYPE: Fuel,  # pylint: disable=too-many-arguments
+        ISI: float,
+        BUI: float,
+        FMC: float,
+        SFC: float,
+        PC: float,
+        PDF: float,
+        CC: float,
+        CBH: float) -> float:
+    """ Rate of Spread (m/min) (ROScalc). """
+    fuel = fuel_code(FUELTYPE)
+    BE = be(fuel, BUI)
+    if fuel == _C6:
+        _, ROS = _c6(ISI, BE, FMC, rso(FMC, SFC, CBH))
+    else:
+        ROS = BE * rsi(fuel, ISI, PC, PDF, CC)
+    return 0.000001 if ROS < 0 else ROS
+
+
+def bros(FUELTYPE: Fuel,  # pylint: disable=too-many-arguments
+         FFMC: float,
+         BUI: float,
+         WSV: float,
+         FMC: float,
+         SFC: float,
+         PC: float,
+         PDF: float,
+         CC: float,
+         CBH: float) -> float:
+    """ Back Fire Spread Rate (m/min) (BROScalc). """
+    # Eqs. 75 & 76 (FCFDG 1992) ISI associated with the back fire spread rate
+    BISI = 0.208 * math.exp(-0.05039 * WSV) * ff(FFMC)
+    # Eq. 77 (FCFDG 1992)
+    return ros(FUELTYPE, BISI, BUI, FMC, SFC, PC, PDF, CC, CBH)
+
+
+def fbp(FUELTYPE: Fuel,  # pylint: disable=too-many-arguments, too-many-locals
+        FFMC: float,
+        BUI: float,
+        WSV: float,
+        FMC: float,
+        SFC: float,
+        PC: float,
+        PDF: float,
+        CC: float,
+        CBH: float,
+        LB: float,
+        HR: float,
+        fbpMod: bool = True) -> Dict[str, float]:
+    """ The primary Fire Behaviour Prediction outputs of a single point, by name (fbp). """
+    fuel = fuel_code(FUELTYPE)
+    fF = ff(FFMC)
+    ISI = 0.208 * fw(WSV, fbpMod) * fF
+    BISI = 0.208 * math.exp(-0.05039 * WSV) * fF
+    BE = be(fuel, BUI)
+    CSI = 0.001 * CBH ** 1.5 * (460 + 25.9 * FMC) ** 1.5
+    RSO = CSI / (300 * SFC)
+    CFB = 0.0
+    if fuel == _C6:
+        CFB, ROS = _c6(ISI, BE, FMC, RSO)
+        _, BROS = _c6(BISI, BE, FMC, RSO)
+    else:
+        ROS = BE * rsi(fuel, ISI, PC, PDF, CC)
+        BROS = BE * rsi(fuel, BISI, PC, PDF, CC)
+    if ROS < 0:
+        ROS = 0.000001
+    if BROS < 0:
+        BROS = 0.000001
+    CFL = _CFL[fuel]
+    if fuel != _C6 and CFL > 0:
+        CFB = _cfb(ROS, RSO)
+    # Total Fuel Consumption (TFCcalc)
+    CFC = CFL * CFB
+    if fuel in (_M1, _M2):
+        CFC = PC / 100 * CFC
+    elif fuel in (_M3, _M4):
+        CFC = PDF / 100 * CFC
+    TFC = SFC + CFC
+    # Eq. 89 (FCFDG 1992) Flank fire spread rate (FROScalc)
+    FROS = (ROS + BROS) / LB / 2
+    # Eqs. 71 & 72 (FCFDG 1992) acceleration adjusted elapsed time (DISTtcalc)
+    alpha = 0.115 if _CONSTANT_ALPHA[fuel] else 0.115 - 18.8 * CFB ** 2.5 * math.exp(-8 * CFB)
+    DISTt = HR + math.exp(-alpha * HR) / alpha - 1 / alpha
+    return {'ISI': ISI, 'BE': BE, 'CSI': CSI, 'RSO': RSO, 'ROS': ROS, 'CFB': CFB, 'TFC': TFC,
+            'HFI': 300 * TFC * ROS, 'BROS': BROS, 'FROS': FROS, 'DH': ROS * DISTt,
+            'DB': BROS * DISTt, 'DF': FROS * DISTt}
@@ -0,0 +1,193 @@
+"""
+Table interface: calculators over the columns of pandas DataFrames and Apache Arrow tables.
+
+Columns are bound to calculator arguments by name, as NumPy views of the table's own memory
+(no copy, for numeric columns without missing values that are stored in one piece).
+Categorical (pandas) and dictionary encoded (Arrow) FUELTYPE columns become FuelType codes
+without materializing strings: only the categories are converted, and the category codes of
+every row are translated with a small lookup array, or used as they are if the categories
+already are FUELTYPES in code order.
+
+Results are added to the table as new columns that wrap the result arrays. Arrow wraps them
+without copying. pandas does so with copy-on-write enabled (the default from pandas 3,
+pd.options.mode.copy_on_write = True before that); otherwise pandas copies them once, when
+they are added.
+
+pandas and pyarrow are optional: neither is imported by this module, and plain mappings of
+arrays (e.g. a dict of NumPy arrays, or an np.load'ed .npz file) work as tables too.
+"""
+import inspect
+import sys
+from typing import Callable, Dict, Iterable, Mapping
+from numpy import ndarray
+import numpy as np
+from pycffdrs.fueltypes import fuel_codes
+
+# Arguments that are bound to FuelType codes, rather than to values
+FUEL_ARGUMENTS = ('FUELTYPE',)
+
+# Calculator arguments that are never bound to columns
+_UNBOUND = ('out', 'workspace')
+
+
+def _is_pandas(table) -> bool:
+    pandas = sys.modules.get('pandas')
+    return pandas is not None and isinstance(table, pandas.DataFrame)
+
+
+def _is_arrow(table) -> bool:
+    pyarrow = sys.modules.get('pyarrow')
+    return pyarrow is not None and isinstance(table, (pyarrow.Table, pyarrow.RecordBatch))
+
+
+def column_names(table) -> Iterable[str]:
+    """ The names of a table's columns. """
+    if _is_arrow(table):
+        return table.column_names
+    if _is_pandas(table):
+        return table.columns
+    return table.keys()
+
+
+def _category_codes(categories: ndarray, codes: ndarray) -> ndarray:
+    """ FuelType codes from the categories of a column, and the category code of each row. """
+    if codes.size and codes.min() < 0:
+        raise KeyError('Unknown fuel type: missing value')
+    lookup = fuel_codes(categories)
+    if np.array_equal(lookup, np.arange(len(lookup))) and codes.dtype.itemsize == 1:
+        # The category codes are FuelType codes
+        return codes.view(np.uint8)
+    return np.take(lookup, codes)
+
+
+def _pandas_column(table, name: str, fuel: bool) -> ndarray:
+    series = table[name]
+    if fuel and series.dtype == 'category':
+        return _category_codes(np.asarray(series.cat.categories),
+                               series.cat.codes.to_numpy())
+    if isinstance(series.dtype, np.dtype):
+        values = series.to_numpy()
+    else:
+        # Extension types (e.g. nullable Float64) have no NumPy view
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return fuel_codes(values) if fuel else values
+
+
+def _arrow_column(table, name: str, fuel: bool) -> ndarray:
+    pyarrow = sys.modules['pyarrow']
+    array = table.column(name)
+    if isinstance(array, pyarrow.ChunkedArray):
+        # Columns stored in several chunks have to be copied into one piece
+        array = array.chunk(0) if array.num_chunks == 1 else array.combine_chunks()
+    if fuel and pyarrow.types.is_dictionary(array.type):
+        if array.null_count:
+            raise KeyError('Unknown fuel type: missing value')
+        return _category_codes(array.dictionary.to_numpy(zero_copy_only=False),
+                               array.indices.to_numpy())
+    # Zero copy, unless there are missing values (which become NaN)
+    values = array.to_numpy(zero_copy_only=False)
+    return fuel_codes(values) if fuel else values
+
+
+def column(table, name: str, fuel: bool = None) -> ndarray:
+    """
+    A column of a table, as a NumPy array (a view of the table's memory wherever possible).
+
+    Keyword arguments:
+    table -- pandas DataFrame, pyarrow Table or RecordBatch, or mapping of arrays
+    name -- Name of the column
+    fuel -- Convert the column to FuelType codes (default: if name is in FUEL_ARGUMENTS)
+
+    Raises:
+    KeyError if there is no such column, or for an unknown (or missing) fuel type.
+    """
+    if fuel is None:
+        fuel = name in FUEL_ARGUMENTS
+    if _is_arrow(table):
+        return _arrow_column(table, name, fuel)
+    if _is_pandas(table):
+        return _pandas_column(table, name, fuel)
+    values = np.asarray(table[name])
+    return fuel_codes(values) if fuel else values
+
+
+def arguments(function: Callable,
+              table,
+              columns: Mapping[str, str] = None) -> Dict[str, ndarray]:
+    """
+    The columns of table that function takes as arguments, by argument name.
+
+    Keyword arguments:
+    function -- A calculator
+    table -- pandas DataFrame, pyarrow Table or RecordBatch, or mapping of arrays
+    columns -- Column names, by argument name, where they differ from the argument names
+               (e.g. {'ISI': 'isi_forecast'})
+    """
+    columns = dict(columns or {})
+    names = set(column_names(table))
+    bound = {}
+    for argument in inspect.signature(function).parameters:
+        name = columns.get(argument, argument)
+        if argument not in _UNBOUND and name in names:
+            bound[argument] = column(table, name, argument in FUEL_ARGUMENTS)
+    missing = set(columns) - set(bound)
+    if missing:
+        raise KeyError(f'No such columns: {sorted(columns[argument] for argument in missing)}')
+    return bound
+
+
+def with_columns(table, results: Mapping[str, ndarray]):
+    """
+    A table with results added as new columns (replacing any columns of the same names).
+
+    pandas DataFrames and pyarrow Tables and RecordBatches are not modified: a new table is
+    returned, that shares the memory of the original table's columns and of the result
+    arrays (see the module documentation). Mappings are copied into a new dict.
+    """
+    if _is_arrow(table):
+        pyarrow = sys.modules['pyarrow']
+        for name, values in results.items():
+            values = pyarrow.array(values)
+            if name in table.column_names:
+                table = table.set_column(table.column_names.index(name), name, values)
+            else:
+                table = table.append_column(name, values)
+        return table
+    if _is_pandas(table):
+        pandas = sys.modules['pandas']
+        columns = {name: results.get(name, table[name]) for name in table.columns}
+        columns.update(results)
+        return pandas.DataFrame(columns, index=table.index, copy=False)
+    return {**table, **results}
+
+
+def apply(function: Callable,
+          table,
+          name: str = None,
+          columns: Mapping[str, str] = None,
+          **kwargs):
+    """
+    Call a calculator on the columns of a table, and add its results to the table.
+
+    Keyword arguments:
+    function -- A calculator. Its arguments are bound to the columns of the same names.
+    table -- pandas DataFrame, pyarrow Table or RecordBatch, or mapping of arrays
+    name -- Column name for the result of a calculator that returns an array (default: the
+            calculator's name). Calculators that return a dictionary (e.g. fbp) add a column
+            per output.
+    columns -- Column names, by argument name, where they differ from the argument names
+    kwargs -- Further arguments for function (e.g. scalars, or options such as fbpMod),
+              instead of columns
+
+    Returns:
+    A new table, with the result columns added (see with_columns):
+
+        weather = table.apply(ffmcCalc, weather, 'ffmc')
+        stations = table.apply(fbp, stations, columns={'FFMC': 'ffmc', 'BUI': 'bui'})
+    """
+    bound = arguments(function, table, columns)
+    bound.update(kwargs)
+    result = function(**bound)
+    if not isinstance(result, dict):
+        result = {name or function.__name__: result}
+    return with_columns(table, result)
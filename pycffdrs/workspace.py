@@ -0,0 +1,138 @@
+"""
+Output and scratch arrays for the calculators.
+
+Every calculator accepts an optional out array to write its result to and, if it needs
+scratch arrays, an optional Workspace. Intermediate results are computed in place, in a
+small, fixed number of scratch arrays taken from the workspace, so that peak memory is a
+small constant multiple of one output array. Passing the same Workspace to repeated calls
+(e.g. one call per day, or per tile) reuses those scratch arrays rather than allocating them
+again.
+
+Unless a calculator's documentation says otherwise, out must not overlap any of its inputs.
+
+Calculations are done in float64 by default. set_float_dtype(np.float32) switches the whole
+package to float32, which halves memory use and memory bandwidth; the calculators that take
+a dtype argument can also be switched per call. In float32 mode inputs are converted to
+float32 once, and all intermediates and outputs stay float32.
+"""
+from typing import Dict, List, Tuple
+from numpy import ndarray
+import numpy as np
+
+# Floating point types that the calculators can compute in
+FLOAT_DTYPES = (np.dtype(np.float64), np.dtype(np.float32))
+
+_float_dtype = FLOAT_DTYPES[0]
+
+
+def set_float_dtype(dtype) -> np.dtype:
+    """
+    Set the floating point type that calculators compute in, when not given per call.
+
+    Keyword arguments:
+    dtype -- np.float64 (the default) or np.float32
+
+    Returns:
+    The previous floating point type, e.g. to restore it later.
+
+    Raises:
+    ValueError if dtype is not one of FLOAT_DTYPES.
+    """
+    global _float_dtype  # pylint: disable=global-statement
+    previous = _float_dtype
+    _float_dtype = float_dtype(dtype)
+    return previous
+
+
+def float_dtype(dtype=None) -> np.dtype:
+    """
+    The floating point type to compute in: dtype, or the package wide setting if None.
+
+    Raises:
+    ValueError if dtype is not one of FLOAT_DTYPES.
+    """
+    if dtype is None:
+        return _float_dtype
+    dtype = np.dtype(dtype)
+    if dtype not in FLOAT_DTYPES:
+        raise ValueError(f'Unsupported dtype {dtype}, expected one of {FLOAT_DTYPES}')
+    return dtype
+
+
+class Workspace:
+    """ Scratch arrays, reused between calculator calls. """
+
+    def __init__(self):
+        self._buffers: Dict[Tuple[str, int, np.dtype], ndarray] = {}
+
+    def scratch(self,
+                owner: str,
+                count: int,
+                shape: Tuple[int, ...],
+                dtype=None) -> List[ndarray]:
+        """
+        Get count scratch arrays of the given shape and dtype.
+
+        Keyword arguments:
+        owner -- Name of the calculator asking for scratch space. Calculators that call each
+                 other must use different owners, so that they don't share scratch arrays.
+        count -- Number of arrays
+        shape -- Shape of each array
+        dtype -- Data type of each array (default: see float_dtype)
+
+        Returns:
+        List of uninitialised arrays. Their contents are only valid until the owner next asks
+        for scratch space.
+        """
+        dtype = float_dtype() if dtype is None else np.dtype(dtype)
+        size = int(np.prod(shape))
+        arrays = []
+        for index in range(count):
+            key = (owner, index, dtype)
+            buffer = self._buffers.get(key)
+            if buffer is None or buffer.size < size:
+                buffer = self._buffers[key] = np.empty(size, dtype=dtype)
+            arrays.append(buffer[:size].reshape(shape))
+        return arrays
+
+    @property
+    def nbytes(self) -> int:
+        """ Total size of the scratch arrays held by this workspace. """
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+    def clear(self):
+        """ Release all scratch arrays. """
+        self._buffers.clear()
+
+
+def workspace_or_new(workspace: Workspace = None) -> Workspace:
+    """ The given workspace, or a new (single use) workspace if None. """
+    return Workspace() if workspace is None else workspace
+
+
+def output(out: ndarray, shape: Tuple[int, ...], dtype=None) -> ndarray:
+    """
+    The array to write a calculator's result to: out, or a new array if out is None.
+
+    Raises:
+    ValueError if out does not have the shape and floating point type of the result.
+    """
+    dtype = float_dtype(dtype)
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if out.shape != tuple(shape):
+        raise ValueError(f'out has shape {out.shape}, expected {tuple(shape)}')
+    if out.dtype != dtype:
+        raise ValueError(f'out has dtype {out.dtype}, expected {dtype}')
+    return out
+
+
+def as_arrays(*values, dtype=None) -> Tuple[ndarray, ...]:
+    """ Inputs as float arrays, without copying inputs that already have the right type. """
+    dtype = float_dtype(dtype)
+    return tuple(np.asarray(value, dtype=dtype) for value in values)
+
+
+def broadcast(*values: ndarray) -> Tuple[ndarray, ...]:
+    """ Arrays broadcast to their common shape, as read only views (no copies). """
+    return tuple(np.broadcast_arrays(*values))
@@ -0,0 +1,39 @@
+"""
+Shared test fixtures.
+"""
+from typing import Dict, Tuple, Union
+from numpy import ndarray
+import numpy as np
+import pytest
+from pycffdrs.fueltypes import FuelType
+
+# Ranges of the random Fire Behaviour Prediction inputs, wide enough for crowning and for
+# the fbp modification of ISI at high wind speeds
+FBP_RANGES = {
+    'FFMC': (0, 101), 'ISI': (0, 60), 'BUI': (0, 200), 'WSV': (0, 80), 'FMC': (80, 130),
+    'SFC': (0.1, 6), 'PC': (0, 100), 'PDF': (0, 100), 'CC': (0, 100), 'CBH': (0, 12),
+    'LB': (1, 8), 'HR': (0, 120), 'CFB': (0, 1),
+}
+
+
+def random_fbp_inputs(shape: Union[int, Tuple[int, ...]], seed: int = 0) -> Dict[str, ndarray]:
+    """
+    Random Fire Behaviour Prediction inputs of the given shape: FUELTYPE (FuelType codes) and
+    each of FBP_RANGES, with BUI zero at about 5% of elements. Every fuel type is present,
+    given at least as many elements as there are fuel types, or else as many distinct ones
+    as there are elements.
+    """
+    rng = np.random.default_rng(seed)
+    size = int(np.prod(shape))
+    fuels = np.resize(rng.permutation(len(FuelType)).astype(np.uint8), size)
+    inputs = {'FUELTYPE': rng.permutation(fuels).reshape(shape)}
+    for name, (low, high) in FBP_RANGES.items():
+        inputs[name] = rng.uniform(low, high, shape)
+    inputs['BUI'][rng.random(shape) < 0.05] = 0
+    return inputs
+
+
+@pytest.fixture(name='fbp_inputs')
+def fixture_fbp_inputs():
+    """ random_fbp_inputs, for tests to call with their own shape and seed. """
+    return random_fbp_inputs
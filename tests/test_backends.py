@@ -0,0 +1,86 @@
+"""
+Test the fused evaluation backends.
+"""
+from functools import partial
+import numpy as np
+import pytest
+from pycffdrs import backends
+from pycffdrs.ffmcCalc import ffmcCalc
+from pycffdrs.ISIcalc import ISIcalc
+from pycffdrs.ROScalc import ROScalc
+from tests.test_pycffdrs import generic_test
+
+FUSED = [pytest.param(name, marks=pytest.mark.skipif(
+    name not in backends.available(), reason=f'{name} is not installed'))
+    for name in ('numexpr', 'numba')]
+
+
+@pytest.mark.parametrize('backend', FUSED)
+@pytest.mark.parametrize('function, fixture', [(ffmcCalc, 'ffmcCalc'),
+                                               (ISIcalc, 'ISIcalc'),
+                                               (ROScalc, 'ROScalc')])
+def test_fixtures(backend, function, fixture):
+    """ Each fused backend matches the R output. """
+    generic_test(f'tests/{fixture}.json', partial(function, backend=backend))
+
+
+@pytest.mark.parametrize('backend', FUSED)
+def test_numpy(backend):  # pylint: disable=too-many-locals
+    """ Each fused backend matches NumPy, for every fuel type, in float64 and float32. """
+    rng = np.random.default_rng(0)
+    shape = (20, 30)
+    ffmc_yda, temp, rh, ws, prec = (rng.uniform(low, high, shape) for low, high in
+                                    ((0, 101), (-10, 40), (1, 100), (0, 70), (0, 10)))
+    prec[0] = 0
+    FUELTYPE = rng.integers(0, 17, shape).astype(np.uint8)
+    ISI, BUI, FMC, SFC, PC, PDF, CC, CBH = (rng.uniform(low, high, shape) for low, high in
+                                            ((0, 60), (0, 200), (80, 120), (0.1, 5), (0, 100),
+                                             (0, 100), (0, 100), (0, 10)))
+    BUI[0] = 0
+    for dtype, rtol in ((np.float64, 1e-12), (np.float32, 1e-3)):
+        for function, values in ((ffmcCalc, (ffmc_yda, temp, rh, ws, prec)),
+                                 (ISIcalc, (ffmc_yda, ws, True)),
+                                 (ISIcalc, (ffmc_yda, ws, False)),
+                                 (ROScalc, (FUELTYPE, ISI, BUI, FMC, SFC, PC, PDF, CC, CBH))):
+            expected = function(*values, dtype=dtype, backend='numpy')
+            result = function(*values, dtype=dtype, backend=backend)
+            assert result.dtype == dtype
+            np.testing.assert_allclose(result, expected, rtol=rtol, atol=1e-12)
+
+
+@pytest.mark.parametrize('backend', FUSED)
+def test_fbpMod(backend):
+    """ Each fused backend applies the fbp modification for the same fbpMod values as NumPy
+    (those equal to True). """
+    ws = np.array([50.0, 50, 50, 50])
+    for fbpMod in (True, False, 2, np.array([True, 1, 2, 0])):
+        np.testing.assert_array_equal(ISIcalc(90, ws, fbpMod, backend=backend),
+                                      ISIcalc(90, ws, fbpMod, backend='numpy'))
+
+
+@pytest.mark.parametrize('backend', FUSED)
+def test_out(backend):
+    """ ffmcCalc may write to ffmc_yda, and scalars are broadcast. """
+    ffmc_yda = np.array([85.0, 90.0, 60.0])
+    expected = ffmcCalc(ffmc_yda, 20, 40, 10, np.array([0, 1, 12]), backend='numpy')
+    result = ffmcCalc(ffmc_yda, 20, 40, 10, np.array([0, 1, 12]), out=ffmc_yda,
+                      backend=backend)
+    assert result is ffmc_yda
+    np.testing.assert_allclose(result, expected, rtol=1e-12)
+
+
+def test_resolve():
+    """ Backends resolve by name, from the package setting, or automatically. """
+    assert backends.resolve('numpy') == 'numpy'
+    assert backends.resolve('auto') in backends.available()
+    with pytest.raises(ValueError):
+        backends.resolve('fortran')
+    with pytest.raises(ValueError):
+        backends.set_backend('fortran')
+    previous = backends.set_backend('numpy')
+    try:
+        assert backends.resolve() == 'numpy'
+        assert backends.set_backend('auto') == 'numpy'
+        assert backends.resolve() == backends.resolve('auto')
+    finally:
+        backends.set_backend(previous)
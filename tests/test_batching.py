@@ -0,0 +1,87 @@
+"""
+Test micro-batching of single point requests.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from pycffdrs.batching import Batcher
+from pycffdrs.fbp import OUTPUTS, fbp
+from pycffdrs.fueltypes import FUELTYPES
+from pycffdrs.ISIcalc import ISIcalc
+from pycffdrs.ROScalc import ROScalc
+
+SIZE = 100
+
+
+@pytest.fixture(name='points')
+def fixture_points(fbp_inputs):
+    """ Random FBP inputs, with fuel types as strings. """
+    points = fbp_inputs(SIZE)
+    points['FUELTYPE'] = np.array(FUELTYPES)[points['FUELTYPE']]
+    return points
+
+
+def test_batches(points):
+    """ Concurrent calls are calculated in batches of at most max_size, with the results of
+    calculating every point on its own. """
+    names = ('FUELTYPE', 'ISI', 'BUI', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH')
+    batcher = Batcher(ROScalc, window=0.05, max_size=40)
+
+    async def main():
+        return await asyncio.gather(*(batcher(*(points[name][index] for name in names))
+                                      for index in range(SIZE)))
+    results = asyncio.run(main())
+    np.testing.assert_array_equal(results, ROScalc(*(points[name] for name in names)))
+    assert (batcher.calls, batcher.batches) == (SIZE, 3)
+
+
+def test_window(points):
+    """ A partial batch is calculated once its window has passed; calls with different
+    signatures are batched separately; options apply to every call. """
+    batcher = Batcher(ISIcalc, window=0.01, fbpMod=True)
+
+    async def main():
+        positional = [batcher(points['FFMC'][index], points['WSV'][index])
+                      for index in range(0, SIZE, 2)]
+        named = [batcher(ffmc=points['FFMC'][index], ws=points['WSV'][index])
+                 for index in range(1, SIZE, 2)]
+        return await asyncio.gather(*positional), await asyncio.gather(*named)
+    positional, named = asyncio.run(main())
+    expected = ISIcalc(points['FFMC'], points['WSV'], fbpMod=True)
+    np.testing.assert_array_equal(positional, expected[0::2])
+    np.testing.assert_array_equal(named, expected[1::2])
+    assert batcher.batches == 2
+
+
+def test_dictionary_results(points):
+    """ Calculators that return dictionaries resolve each call with a dictionary, also when
+    calculated in an executor. """
+    names = ('FUELTYPE', 'FFMC', 'BUI', 'WSV', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH', 'LB',
+             'HR')
+    with ThreadPoolExecutor(1) as executor:
+        batcher = Batcher(fbp, window=0.01, executor=executor)
+
+        async def main():
+            return await asyncio.gather(*(batcher(**{name: points[name][index]
+                                                     for name in names})
+                                          for index in range(SIZE)))
+        results = asyncio.run(main())
+    expected = fbp(*(points[name] for name in names))
+    for name in OUTPUTS:
+        np.testing.assert_array_equal([result[name] for result in results], expected[name])
+
+
+def test_errors_and_flush():
+    """ An error fails every call of its batch; flush calculates waiting calls at once. """
+    batcher = Batcher(ROScalc, window=60)
+
+    async def main():
+        call = asyncio.ensure_future(batcher('X1', 10, 50, 100, 2, 0, 0, 0, 3))
+        await asyncio.sleep(0)
+        await batcher.flush()
+        return await call
+    with pytest.raises(KeyError):
+        asyncio.run(main())
+    with pytest.raises(ValueError):
+        Batcher(ROScalc, max_size=0)
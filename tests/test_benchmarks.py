@@ -0,0 +1,30 @@
+""" Test that the benchmarks run, and that regressions are detected. """
+import numpy as np
+from benchmarks.suite import BENCHMARKS, compare, run
+from benchmarks.workload import workload
+
+
+def test_workload():
+    """ Inputs are reproducible, whichever other inputs are generated with them. """
+    assert np.array_equal(workload(('temp',), 100)['temp'],
+                          workload(('rh', 'temp'), 100)['temp'])
+
+
+def test_benchmarks():
+    """ Every benchmark runs, and results are compared against a baseline. """
+    results = run(sizes=(100,), timed=False)
+    assert set(results) == set(BENCHMARKS)
+    assert all(result['100']['peak_bytes'] > 0 for result in results.values())
+    assert not compare(results, results)
+
+
+def test_compare():
+    """ Slower or larger results than the baseline are regressions. """
+    baseline = {'fbp': {'1000000': {'seconds': 1.0, 'peak_bytes': 10**8}}}
+    assert not compare({'fbp': {'1000000': {'seconds': 1.2, 'peak_bytes': 10**8}}}, baseline)
+    assert len(compare({'fbp': {'1000000': {'seconds': 2.0, 'peak_bytes': 10**8}}},
+                       baseline)) == 1
+    assert len(compare({'fbp': {'1000000': {'seconds': 1.0, 'peak_bytes': 2 * 10**8}}},
+                       baseline)) == 1
+    # Sizes that are not in the baseline are not compared
+    assert not compare({'fbp': {'100': {'seconds': 1.0, 'peak_bytes': 10**8}}}, baseline)
@@ -0,0 +1,123 @@
+"""
+Test that every calculator takes N-dimensional arrays and broadcastable scalars.
+"""
+import numpy as np
+import pytest
+from pycffdrs.BEcalc import BEcalc
+from pycffdrs.BROScalc import BROScalc
+from pycffdrs.buiCalc import buiCalc
+from pycffdrs.C6calc import C6calc
+from pycffdrs.CFBcalc import CFBcalc
+from pycffdrs.dcCalc import dcCalc
+from pycffdrs.DISTtcalc import DISTtcalc
+from pycffdrs.dmcCalc import dmcCalc
+from pycffdrs.fbp import fbp
+from pycffdrs.ffmcCalc import ffmcCalc
+from pycffdrs.FIcalc import FIcalc
+from pycffdrs.FMCcalc import FMCcalc
+from pycffdrs.FROScalc import FROScalc
+from pycffdrs.fwiCalc import fwiCalc
+from pycffdrs.hffmc import hffmcCalc
+from pycffdrs.ISIcalc import ISIcalc
+from pycffdrs.ROScalc import ROScalc, RSIcalc
+from pycffdrs.TFCcalc import TFCcalc
+from tests.conftest import random_fbp_inputs
+
+SHAPE = (3, 4)
+
+# Ranges of the inputs other than FBP_RANGES' (see tests.conftest)
+RANGES = {
+    'ROS': (0, 40), 'BROS': (0, 5), 'FC': (0, 5), 'LAT': (40, 70), 'LONG': (-130, -60),
+    'ELV': (0, 2000), 'DJ': (1, 365), 'D0': (0, 0), 'CFL': (0, 2), 'ffmc': (0, 101),
+    'ws': (0, 60), 'isi': (0, 50), 'bui': (0, 200), 'dmc': (0, 100), 'dc': (0, 500),
+    'temp': (-5, 35), 'rh': (10, 100), 'prec': (0, 5), 'lat': (40, 70), 'dmc_yda': (0, 100),
+    'dc_yda': (0, 500), 'ffmc_yda': (0, 101),
+}
+
+CALCULATORS = [
+    (BEcalc, 'FUELTYPE BUI', {}),
+    (BROScalc, 'FUELTYPE FFMC BUI WSV FMC SFC PC PDF CC CBH', {}),
+    (C6calc, 'FUELTYPE ISI BUI FMC SFC CBH', {'option': 'ROS'}),
+    (C6calc, 'FUELTYPE ISI BUI FMC SFC CBH', {'option': 'CFB'}),
+    (CFBcalc, 'FUELTYPE FMC SFC ROS CBH', {}),
+    (DISTtcalc, 'FUELTYPE ROS HR CFB', {}),
+    (FIcalc, 'FC ROS', {}),
+    (FMCcalc, 'LAT LONG ELV DJ D0', {}),
+    (FROScalc, 'ROS BROS LB', {}),
+    (ISIcalc, 'ffmc ws', {}),
+    (ROScalc, 'FUELTYPE ISI BUI FMC SFC PC PDF CC CBH', {}),
+    (RSIcalc, 'FUELTYPE ISI PC PDF CC', {}),
+    (TFCcalc, 'FUELTYPE CFL CFB SFC PC PDF', {}),
+    (buiCalc, 'dmc dc', {}),
+    (dcCalc, 'dc_yda temp rh prec lat mon', {}),
+    (dmcCalc, 'dmc_yda temp rh prec lat mon', {}),
+    (fbp, 'FUELTYPE FFMC BUI WSV FMC SFC PC PDF CC CBH LB HR', {}),
+    (ffmcCalc, 'ffmc_yda temp rh ws prec', {}),
+    (fwiCalc, 'isi bui', {}),
+    (hffmcCalc, 'ffmc_yda temp rh ws prec', {}),
+]
+
+
+def _inputs(names, seed=0):
+    rng = np.random.default_rng(seed)
+    fbp_inputs = random_fbp_inputs(SHAPE, seed)
+    inputs = {}
+    for name in names.split():
+        if name in fbp_inputs:
+            inputs[name] = fbp_inputs[name]
+        elif name == 'mon':
+            inputs[name] = rng.integers(1, 13, SHAPE)
+        else:
+            inputs[name] = rng.uniform(*RANGES[name], SHAPE)
+    return inputs
+
+
+def _assert_equal(result, expected):
+    if isinstance(expected, dict):
+        for name, value in expected.items():
+            _assert_equal(result[name], value)
+    else:
+        assert np.shape(result) == np.shape(expected)
+        np.testing.assert_array_equal(result, expected)
+
+
+def _id(calculator):
+    return calculator[0].__name__ + ''.join(calculator[2].values())
+
+
+@pytest.mark.parametrize('function, names, kwargs', CALCULATORS,
+                         ids=[_id(calculator) for calculator in CALCULATORS])
+def test_broadcasting(function, names, kwargs):
+    """ Arrays of any number of dimensions give outputs of the same shape; scalars and
+    broadcastable arrays give the results of the full arrays they broadcast to. """
+    inputs = _inputs(names)
+    expected = function(*inputs.values(), **kwargs)
+    _assert_equal(function(*(value.reshape(2, 3, 2) for value in inputs.values()), **kwargs),
+                  {name: value.reshape(2, 3, 2) for name, value in expected.items()}
+                  if isinstance(expected, dict) else expected.reshape(2, 3, 2))
+    for name, value in inputs.items():
+        scalar = dict(inputs, **{name: value.flat[0]})
+        full = dict(inputs, **{name: np.full(SHAPE, value.flat[0])})
+        _assert_equal(function(*scalar.values(), **kwargs),
+                      function(*full.values(), **kwargs))
+    # Alternate arguments as rows and columns
+    parts = {name: value[:, :1] if index % 2 else value[:1]
+             for index, (name, value) in enumerate(inputs.items())}
+    _assert_equal(function(*parts.values(), **kwargs),
+                  function(*(np.broadcast_to(value, SHAPE).copy()
+                             for value in parts.values()), **kwargs))
+    # All scalars
+    result = function(*(value.flat[0] for value in inputs.values()), **kwargs)
+    single = function(*(value.flat[:1] for value in inputs.values()), **kwargs)
+    for name in (single if isinstance(single, dict) else [None]):
+        value, one = (result, single) if name is None else (result[name], single[name])
+        assert np.shape(value) == ()
+        np.testing.assert_allclose(value, one[0], rtol=1e-14)
+
+
+def test_fuel_type_strings():
+    """ A single fuel type string applies to every element. """
+    np.testing.assert_array_equal(
+        ROScalc('M1', [5, 10], 50, 100, 2, 50, 0, 0, 3),
+        ROScalc(['M1', 'M1'], [5, 10], [50, 50], [100, 100], [2, 2], [50, 50], [0, 0],
+                [0, 0], [3, 3]))
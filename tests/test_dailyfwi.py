@@ -0,0 +1,52 @@
+"""
+Test the streaming daily FWI engine.
+"""
+import numpy as np
+from pycffdrs.dailyfwi import DailyFWI, OUTPUTS
+
+# Standard test data for the FWI System, with the expected outputs (rounded to 1 decimal),
+# from Van Wagner & Pickett (1985), starting from FFMC 85, DMC 6 and DC 15 at 46N:
+# mon, temp, rh, ws, prec, FFMC, DMC, DC, ISI, BUI, FWI
+STANDARD = np.array((
+    (4, 17.0, 42, 25, 0.0, 87.7, 8.5, 19.0, 10.9, 8.5, 10.1),
+    (4, 20.0, 21, 25, 2.4, 86.2, 10.4, 23.6, 8.8, 10.4, 9.3),
+    (4, 8.5, 40, 17, 0.0, 87.0, 11.8, 26.1, 6.5, 11.7, 7.6),
+    (4, 6.5, 25, 6, 0.0, 88.8, 13.2, 28.2, 4.9, 13.1, 6.2),
+    (4, 13.0, 34, 24, 0.0, 89.1, 15.4, 31.5, 12.6, 15.3, 14.8),
+    (4, 6.0, 40, 22, 0.4, 88.7, 16.5, 33.5, 10.7, 16.4, 13.5),
+    (4, 5.5, 52, 6, 0.0, 87.4, 17.2, 35.4, 4.0, 17.1, 5.9),
+    (4, 8.5, 46, 16, 0.0, 87.4, 18.5, 37.9, 6.6, 18.4, 9.7),
+    (4, 9.5, 54, 20, 0.0, 86.8, 19.7, 40.6, 7.4, 19.6, 11.0),
+    (4, 7.0, 93, 14, 9.0, 29.9, 10.1, 29.5, 0.0, 10.9, 0.0)))
+
+STATIONS = 3
+
+
+def weather_chunks(days_per_chunk: int):
+    """ Yield the standard weather, for all stations, in chunks of days. """
+    for start in range(0, len(STANDARD), days_per_chunk):
+        chunk = STANDARD[start:start + days_per_chunk]
+        yield {name: np.repeat(chunk[:, [column]], STATIONS, axis=1)
+               for column, name in enumerate(('mon', 'temp', 'rh', 'ws', 'prec'))}
+
+
+def test_run_chunks():
+    """ Test stepping through chunks of weather against the standard FWI test data. """
+    engine = DailyFWI(np.full(STATIONS, 46.0))
+    results = [{name: value.copy() for name, value in chunk.items()}
+               for chunk in engine.run(weather_chunks(4))]
+    assert [len(result['FWI']) for result in results] == [4, 4, 2]
+    for column, name in enumerate(OUTPUTS, start=5):
+        values = np.concatenate([result[name] for result in results])
+        np.testing.assert_array_equal(np.round(values, 1),
+                                      np.repeat(STANDARD[:, [column]], STATIONS, axis=1))
+    np.testing.assert_array_equal(engine.ffmc, results[-1]['FFMC'][-1])
+
+
+def test_run_per_day():
+    """ Test per day output matches per chunk output, and that state carries over. """
+    per_chunk = np.concatenate([chunk['FWI'].copy() for chunk in
+                                DailyFWI(np.full(STATIONS, 46.0)).run(weather_chunks(3))])
+    per_day = [day['FWI'].copy() for day in
+               DailyFWI(np.full(STATIONS, 46.0)).run(weather_chunks(3), per_day=True)]
+    np.testing.assert_array_equal(per_chunk, per_day)
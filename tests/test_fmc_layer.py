@@ -0,0 +1,37 @@
+""" Tests for calculating the date of minimum foliar moisture content once per grid. """
+import numpy as np
+from pycffdrs.FMCcalc import FMCcalc, FMCLayer
+
+SHAPE = (20, 30)
+
+
+def _grid(seed):
+    rng = np.random.default_rng(seed)
+    # Known D0 for some cells, unknown (0) for the rest
+    D0 = np.where(rng.random(SHAPE) < 0.2, rng.integers(120, 200, SHAPE), 0)
+    return (rng.uniform(40, 60, SHAPE), rng.uniform(-130, -60, SHAPE),
+            np.where(rng.random(SHAPE) < 0.3, 0, rng.uniform(0, 2000, SHAPE)), D0)
+
+
+def test_fmc():
+    """ A day's FMC from the layer matches FMCcalc. """
+    LAT, LONG, ELV, D0 = _grid(0)
+    layer = FMCLayer(LAT, LONG, ELV, D0)
+    for DJ in (1, 150, 170, 200, 365):
+        assert np.array_equal(layer.fmc(DJ), FMCcalc(LAT, LONG, ELV, DJ, D0))
+    DJ = np.random.default_rng(1).uniform(1, 365, SHAPE)
+    assert np.array_equal(layer.fmc(DJ), FMCcalc(LAT, LONG, ELV, DJ, D0))
+
+
+def test_days():
+    """ The FMC of a range of days, in one call, matches FMCcalc day by day. """
+    LAT, LONG, ELV, D0 = _grid(2)
+    layer = FMCLayer(LAT, LONG, ELV, D0)
+    days = np.arange(100, 250)
+    expected = np.stack([FMCcalc(LAT, LONG, ELV, DJ, D0) for DJ in days])
+    FMC = layer.days(days)
+    assert FMC.shape == (len(days),) + SHAPE
+    assert np.array_equal(FMC, expected)
+    # The result can be written to the same array, run after run
+    assert layer.days(days, out=FMC) is FMC
+    assert np.array_equal(FMC, expected)
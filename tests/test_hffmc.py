@@ -0,0 +1,113 @@
+"""
+Test the vectorized hourly FFMC.
+"""
+import math
+import time
+import numpy as np
+from pycffdrs.hffmc import HourlyFFMC, hffmc, hffmcCalc
+
+HOURS = 48
+STATIONS = 50
+
+
+def reference(ffmc_old, temp, rh, ws, prec, time_step=1):
+    """ The R hffmc function, one value at a time. """
+    # pylint: disable=too-many-arguments, too-many-locals
+    mo = 147.27723 * (101 - ffmc_old) / (59.5 + ffmc_old)
+    if prec > 0:
+        mr = mo + 42.5 * prec * math.exp(-100 / (251 - mo)) * (1 - math.exp(-6.93 / prec))
+        if mo > 150:
+            mr += 0.0015 * (mo - 150) ** 2 * prec ** 0.5
+        mo = min(mr, 250)
+    ed = (0.942 * rh ** 0.679 + 11 * math.exp((rh - 100) / 10) + 0.18 * (21.1 - temp) *
+          (1 - math.exp(-0.115 * rh)))
+    ew = (0.618 * rh ** 0.753 + 10 * math.exp((rh - 100) / 10) + 0.18 * (21.1 - temp) *
+          (1 - math.exp(-0.115 * rh)))
+    if ew < mo < ed:
+        m = mo
+    elif mo > ed:
+        ko = 0.424 * (1 - (rh / 100) ** 1.7) + 0.0694 * ws ** 0.5 * (1 - (rh / 100) ** 8)
+        kd = ko * 0.0579 * math.exp(0.0365 * temp)
+        m = ed + (mo - ed) * 10 ** (-kd * time_step)
+    else:
+        kl = (0.424 * (1 - ((100 - rh) / 100) ** 1.7) + 0.0694 * ws ** 0.5 *
+              (1 - ((100 - rh) / 100) ** 8))
+        kw = kl * 0.0579 * math.exp(0.0365 * temp)
+        m = ew + (mo - ew) * 10 ** (-kw * time_step)
+    return min(max(59.5 * (250 - m) / (147.27723 + m), 0), 101)
+
+
+def weather(hours: int = HOURS, stations: int = STATIONS, seed: int = 1):
+    """ Random hourly weather, shaped (hours, stations), with rain about 1 hour in 5. """
+    rng = np.random.default_rng(seed)
+    shape = (hours, stations)
+    return {'temp': rng.uniform(-5, 40, shape),
+            'rh': rng.uniform(5, 100, shape),
+            'ws': rng.uniform(0, 60, shape),
+            'prec': np.where(rng.random(shape) < 0.2, rng.uniform(0, 20, shape), 0)}
+
+
+def test_hffmcCalc():
+    """ Test one step against the R formulation, across drying, wetting and rain. """
+    rng = np.random.default_rng(2)
+    ffmc_old = rng.uniform(0, 101, 2000)
+    values = weather(1, 2000, seed=3)
+    temp, rh, ws, prec = (values[name][0] for name in ('temp', 'rh', 'ws', 'prec'))
+    for time_step in (1, 0.5):
+        result = hffmcCalc(ffmc_old, temp, rh, ws, prec, time_step)
+        expected = [reference(*args, time_step) for args in zip(ffmc_old, temp, rh, ws, prec)]
+        np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-12)
+
+
+def test_hffmc():
+    """ Test a series of hours against stepping one station and hour at a time. """
+    values = weather()
+    result = hffmc(values['temp'], values['rh'], values['ws'], values['prec'], ffmc_old=80)
+    assert result.shape == (HOURS, STATIONS)
+    for station in range(0, STATIONS, 7):
+        ffmc = 80
+        for hour in range(HOURS):
+            ffmc = reference(ffmc, *(values[name][hour, station]
+                                     for name in ('temp', 'rh', 'ws', 'prec')))
+            assert math.isclose(result[hour, station], ffmc, rel_tol=1e-9, abs_tol=1e-9)
+
+
+def test_run_chunks():
+    """ Test that chunked and per hour runs match the whole series, and that state carries
+    over. """
+    values = weather()
+    expected = hffmc(values['temp'], values['rh'], values['ws'], values['prec'])
+
+    def chunks(size):
+        for start in range(0, HOURS, size):
+            yield {name: value[start:start + size] for name, value in values.items()}
+    engine = HourlyFFMC(np.full(STATIONS, 85.0))
+    results = [chunk.copy() for chunk in engine.run(chunks(20))]
+    assert [len(result) for result in results] == [20, 20, 8]
+    np.testing.assert_array_equal(np.concatenate(results), expected)
+    np.testing.assert_array_equal(engine.ffmc, expected[-1])
+    per_hour = [hour.copy() for hour in HourlyFFMC(np.full(STATIONS, 85.0)).run(
+        chunks(20), per_hour=True)]
+    np.testing.assert_array_equal(per_hour, expected)
+
+
+def test_out():
+    """ Test writing into a given array, and float32. """
+    values = weather()
+    out = np.empty((HOURS, STATIONS))
+    result = hffmc(values['temp'], values['rh'], values['ws'], values['prec'], out=out)
+    assert result is out
+    ffmc = np.full(STATIONS, 85.0)
+    assert hffmcCalc(ffmc, 20, 40, 10, 0, out=ffmc) is ffmc
+    np.testing.assert_array_equal(ffmc, hffmcCalc(85, 20, 40, 10, 0))
+    single = hffmcCalc(np.float32(85), 20, 40, 10, 0, dtype=np.float32)
+    assert single.dtype == np.float32
+    assert abs(single - hffmcCalc(85, 20, 40, 10, 0)) < 1e-4
+
+
+def test_forecast_time():
+    """ A 5 day hourly forecast for 2000 stations takes well under a second. """
+    values = weather(5 * 24, 2000)
+    start = time.perf_counter()
+    hffmc(values['temp'], values['rh'], values['ws'], values['prec'])
+    assert time.perf_counter() - start < 1
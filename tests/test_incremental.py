@@ -0,0 +1,98 @@
+"""
+Test incremental recalculation of forecasts.
+"""
+import numpy as np
+import pytest
+from pycffdrs.BEcalc import BEcalc
+from pycffdrs.buiCalc import buiCalc
+from pycffdrs.CFBcalc import CFBcalc
+from pycffdrs.dcCalc import dcCalc
+from pycffdrs.dmcCalc import dmcCalc
+from pycffdrs.ffmcCalc import ffmcCalc
+from pycffdrs.fueltypes import FuelType
+from pycffdrs.fwiCalc import fwiCalc
+from pycffdrs.incremental import INPUTS, OUTPUTS, Forecast
+from pycffdrs.ISIcalc import ISIcalc
+from pycffdrs.ROScalc import ROScalc
+
+SHAPE = (20, 30)
+
+
+def _inputs(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    ranges = {'ffmc_yda': (0, 101), 'dmc_yda': (0, 100), 'dc_yda': (0, 500),
+              'temp': (-10, 35), 'rh': (10, 100), 'ws': (0, 60), 'prec': (0, 20),
+              'lat': (40, 70), 'FMC': (80, 120), 'SFC': (0.1, 5), 'PC': (0, 100),
+              'PDF': (0, 100), 'CC': (0, 100), 'CBH': (0, 10)}
+    inputs = {name: rng.uniform(low, high, SHAPE) for name, (low, high) in ranges.items()}
+    inputs['prec'][inputs['prec'] < 10] = 0
+    inputs['mon'] = 7
+    inputs['FUELTYPE'] = rng.integers(0, len(FuelType), SHAPE).astype(np.uint8)
+    return inputs
+
+
+def _calculate(inputs):
+    """ Every output, calculated for the whole grid with the calculators. """
+    i = inputs
+    FFMC = ffmcCalc(i['ffmc_yda'], i['temp'], i['rh'], i['ws'], i['prec'])
+    DMC = dmcCalc(i['dmc_yda'], i['temp'], i['rh'], i['prec'], i['lat'], i['mon'])
+    DC = dcCalc(i['dc_yda'], i['temp'], i['rh'], i['prec'], i['lat'], i['mon'])
+    ISI = ISIcalc(FFMC, i['ws'])
+    BUI = buiCalc(DMC, DC)
+    ROS = ROScalc(i['FUELTYPE'], ISI, BUI, i['FMC'], i['SFC'], i['PC'], i['PDF'], i['CC'],
+                  i['CBH'])
+    fuel = (i['FUELTYPE'], i['FMC'], i['SFC'], ROS, i['CBH'])
+    return {'FFMC': FFMC, 'DMC': DMC, 'DC': DC, 'ISI': ISI, 'BUI': BUI,
+            'FWI': fwiCalc(ISI, BUI), 'BE': BEcalc(i['FUELTYPE'], BUI), 'ROS': ROS,
+            'RSO': CFBcalc(*fuel, option='RSO'), 'CFB': CFBcalc(*fuel)}
+
+
+def _check(forecast, inputs):
+    expected = _calculate(inputs)
+    for name in OUTPUTS:
+        np.testing.assert_array_equal(forecast[name], expected[name], err_msg=name)
+
+
+def test_updates():
+    """ Outputs match a full calculation after each update, and only the outputs that depend
+    on the changed inputs are recalculated, at the changed cells. """
+    inputs = _inputs()
+    forecast = Forecast(**inputs)
+    _check(forecast, inputs)
+    # Wind, at a tenth of the cells
+    ws = inputs['ws'].copy()
+    ws[::10] += 5
+    forecast.update(ws=ws)
+    inputs['ws'] = ws
+    _check(forecast, inputs)
+    assert set(forecast.recalculated) == {'FFMC', 'ISI', 'FWI', 'ROS', 'CFB'}
+    assert forecast.recalculated['FFMC'] == ws[::10].size
+    # Precipitation, everywhere
+    inputs['prec'] = inputs['prec'] + 1
+    forecast.update(prec=inputs['prec'])
+    _check(forecast, inputs)
+    assert {'DMC', 'DC', 'BUI', 'BE'} <= set(forecast.recalculated)
+    assert 'RSO' not in forecast.recalculated
+    # Fuels and a value for every cell
+    inputs['FUELTYPE'] = np.where(inputs['FMC'] > 100, 'C6', 'M1')
+    forecast.update(FUELTYPE=inputs['FUELTYPE'], CBH=4.0)
+    inputs['CBH'] = np.full(SHAPE, 4.0)
+    _check(forecast, inputs)
+    # Nothing changes
+    outputs = forecast.update(ws=ws)
+    assert not forecast.recalculated
+    assert set(outputs) == set(OUTPUTS)
+
+
+def test_inputs():
+    """ Every input is needed, and only inputs can be updated. """
+    inputs = _inputs()
+    del inputs['CC']
+    with pytest.raises(TypeError):
+        Forecast(**inputs)
+    inputs = _inputs()
+    forecast = Forecast(**inputs)
+    assert forecast.shape == SHAPE
+    assert set(INPUTS) == set(inputs)
+    with pytest.raises(KeyError):
+        forecast.update(FFMC=90)
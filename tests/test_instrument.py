@@ -0,0 +1,62 @@
+""" Tests for the opt-in instrumentation of the calculators. """
+import json
+import numpy as np
+import pytest
+from pycffdrs import instrument
+from pycffdrs.fbp import fbp
+from pycffdrs.ffmcCalc import ffmcCalc
+from pycffdrs.fueltypes import FUELTYPES
+
+N = 1000
+
+
+@pytest.fixture(name='recording')
+def fixture_recording():
+    """ Enable instrumentation for a test, with fresh statistics. """
+    instrument.reset()
+    instrument.enable()
+    yield
+    instrument.disable()
+    instrument.reset()
+
+
+def _ffmc_args():
+    rng = np.random.default_rng(0)
+    return (rng.uniform(0, 101, N), rng.uniform(-20, 40, N), rng.uniform(0, 100, N),
+            rng.uniform(0, 60, N), rng.uniform(0, 10, N))
+
+
+def test_disabled():
+    """ Nothing is recorded unless instrumentation is enabled. """
+    instrument.reset()
+    ffmcCalc(*_ffmc_args())
+    assert not instrument.is_enabled()
+    assert not instrument.stats()
+
+
+def test_stats(recording):  # pylint: disable=unused-argument
+    """ Calls, elements, time and memory are recorded per calculator. """
+    args = _ffmc_args()
+    expected = ffmcCalc(*args)
+    instrument.reset()
+    assert np.array_equal(ffmcCalc(*args), expected)
+    ffmcCalc(*args)
+    record = instrument.stats()['ffmcCalc']
+    assert record['calls'] == 2
+    assert record['elements'] == 2 * N
+    assert record['seconds'] > 0
+    # At least the result of each call is allocated
+    assert record['bytes'] >= 2 * expected.nbytes
+    assert json.loads(instrument.to_json()) == instrument.stats()
+
+
+def test_nested(recording):  # pylint: disable=unused-argument
+    """ Calculators that fbp calls are recorded, as well as fbp itself. """
+    rng = np.random.default_rng(1)
+    fbp(np.array(FUELTYPES)[rng.integers(0, len(FUELTYPES), N)], *rng.uniform(1, 100, (11, N)))
+    stats = instrument.stats()
+    assert stats['fbp']['calls'] == 1
+    assert stats['fbp']['elements'] == N
+    assert stats['FIcalc']['calls'] >= 1
+    assert stats['fbp']['seconds'] >= stats['FIcalc']['seconds']
+    assert stats['fbp']['bytes'] >= stats['FIcalc']['bytes']
@@ -0,0 +1,60 @@
+""" Test the approximation mode against the exact calculations, over the whole input domain. """
+import numpy as np
+import pytest
+from pycffdrs.ISIcalc import FF_MAX_ERROR, FF_TABLE, ISIcalc, fFcalc
+from pycffdrs.ROScalc import ISI_MAX, RSI_MAX_ERROR, RSI_TABLE, ROScalc, RSIcalc, _RSI26calc
+from pycffdrs.fbp import fbp
+from pycffdrs.fueltypes import FuelType
+
+N = 10000
+
+
+def _domain(table, samples):
+    """ Evenly spaced samples of a table's domain, every midpoint between nodes (where linear
+    interpolation is furthest from the nodes), and a dense sampling of the first intervals
+    (where curves with exponents between 1 and 2 bend most). """
+    nodes = table.nodes()
+    return np.concatenate((np.linspace(table.low, table.high, samples),
+                           (nodes[:-1] + nodes[1:]) / 2,
+                           np.linspace(table.low, nodes[4], samples)))
+
+
+def test_fF_error():
+    """ The FFMC function is approximated within FF_MAX_ERROR over the FFMC scale. """
+    ffmc = _domain(FF_TABLE, 1000001)
+    assert np.abs(fFcalc(ffmc, approx=True) - fFcalc(ffmc)).max() <= FF_MAX_ERROR
+
+
+@pytest.mark.parametrize('fuel', list(FuelType), ids=lambda fuel: fuel.name)
+def test_RSI_error(fuel):
+    """ Each fuel type's Eq. 26 curve is approximated within RSI_MAX_ERROR. """
+    ISI = _domain(RSI_TABLE, 200001)
+    assert np.abs(RSI_TABLE(ISI, fuel) - _RSI26calc(fuel, ISI)).max() <= RSI_MAX_ERROR
+
+
+def test_calculators():  # pylint: disable=too-many-locals
+    """ The calculators, in approximation mode, stay within the bounds of the tables. """
+    rng = np.random.default_rng(0)
+    fuel = rng.integers(0, len(FuelType), N).astype(np.uint8)
+    ffmc, ws, ISI, BUI, FMC, SFC, PC, PDF, CC, CBH = (
+        rng.uniform(0, 101, N), rng.uniform(0, 100, N), rng.uniform(0, 300, N),
+        rng.uniform(0, 200, N), rng.uniform(80, 120, N), rng.uniform(0, 5, N),
+        rng.uniform(0, 100, N), rng.uniform(0, 100, N), rng.uniform(0, 100, N),
+        rng.uniform(1, 10, N))
+    # ISI = 0.208 * fW * fF
+    fW = ISIcalc(ffmc, ws) / 0.208 / fFcalc(ffmc)
+    assert np.all(np.abs(ISIcalc(ffmc, ws, approx=True) - ISIcalc(ffmc, ws))
+                  <= 0.208 * fW * FF_MAX_ERROR * (1 + 1e-9))
+    RSI = RSIcalc(fuel, ISI, PC, PDF, CC)
+    assert np.abs(RSIcalc(fuel, ISI, PC, PDF, CC, approx=True) - RSI).max() <= RSI_MAX_ERROR
+    # Past ISI_MAX, RSI is calculated exactly
+    beyond = ISI > ISI_MAX
+    assert beyond.any()
+    assert np.array_equal(RSIcalc(fuel, ISI, PC, PDF, CC, approx=True)[beyond], RSI[beyond])
+    ROS = ROScalc(fuel, ISI, BUI, FMC, SFC, PC, PDF, CC, CBH)
+    assert np.allclose(ROScalc(fuel, ISI, BUI, FMC, SFC, PC, PDF, CC, CBH, approx=True), ROS,
+                       rtol=0, atol=10 * RSI_MAX_ERROR)
+    args = (fuel, ffmc, BUI, ws, FMC, SFC, PC, PDF, CC, CBH, rng.uniform(1, 8, N),
+            rng.uniform(0, 120, N))
+    exact, approx = fbp(*args), fbp(*args, approx=True)
+    assert np.allclose(approx['ROS'], exact['ROS'], rtol=1e-4, atol=10 * RSI_MAX_ERROR)
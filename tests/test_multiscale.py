@@ -0,0 +1,87 @@
+"""
+Test evaluation of fine fuel grids under coarse weather grids.
+"""
+import numpy as np
+import pytest
+from pycffdrs.BEcalc import BEcalc
+from pycffdrs.BROScalc import BROScalc
+from pycffdrs.fbp import fbp
+from pycffdrs.ISIcalc import ISIcalc
+from pycffdrs.multiscale import CoarseWeather, coarse_index
+from pycffdrs.ROScalc import ROScalc
+from tests.conftest import random_fbp_inputs
+
+COARSE = (4, 5)
+FINE = (40, 60)
+
+
+def test_coarse_index():
+    """ Every fine cell maps to the coarse cell it lies in. """
+    index = coarse_index((4, 6), (2, 3))
+    np.testing.assert_array_equal(index, [[0, 0, 1, 1, 2, 2]] * 2 + [[3, 3, 4, 4, 5, 5]] * 2)
+    np.testing.assert_array_equal(coarse_index((5,), (2,)), [0, 0, 0, 1, 1])
+    with pytest.raises(ValueError):
+        coarse_index((4, 6), (5, 3))
+    with pytest.raises(ValueError):
+        coarse_index((4, 6), (4,))
+
+
+def _grids(seed: int = 0):
+    weather, fuels = random_fbp_inputs(COARSE, seed), random_fbp_inputs(FINE, seed)
+    return ((weather['FFMC'], weather['BUI'], weather['WSV']),
+            tuple(fuels[name] for name in ('FUELTYPE', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH')))
+
+
+@pytest.mark.parametrize('approx', [False, True])
+def test_identical_to_upsampled(approx):
+    """ BE and the head and back fire ROS are those of the calculators on the upsampled
+    weather. """
+    (FFMC, BUI, WSV), (FUELTYPE, FMC, SFC, PC, PDF, CC, CBH) = _grids()
+    index = coarse_index(FINE, COARSE)
+    weather = CoarseWeather(index, FFMC, BUI, WSV, approx=approx)
+    FFMC, BUI, WSV = (weather.fine(value) for value in (FFMC, BUI, WSV))
+    np.testing.assert_array_equal(weather.BE(FUELTYPE), BEcalc(FUELTYPE, BUI))
+    ISI = ISIcalc(FFMC, WSV, True, approx=approx)
+    np.testing.assert_array_equal(
+        weather.ROS(FUELTYPE, FMC, SFC, PC, PDF, CC, CBH),
+        ROScalc(FUELTYPE, ISI, BUI, FMC, SFC, PC, PDF, CC, CBH, approx=approx))
+    np.testing.assert_array_equal(
+        weather.ROS(FUELTYPE, FMC, SFC, PC, PDF, CC, CBH, back=True),
+        BROScalc(FUELTYPE, FFMC, BUI, WSV, FMC, SFC, PC, PDF, CC, CBH, approx=approx))
+
+
+def test_crown_fraction_burned():
+    """ CFB, from the fine grid's ROS, is fbp's on the upsampled weather. """
+    (FFMC, BUI, WSV), (FUELTYPE, FMC, SFC, PC, PDF, CC, CBH) = _grids(3)
+    weather = CoarseWeather(coarse_index(FINE, COARSE), FFMC, BUI, WSV)
+    ROS = weather.ROS(FUELTYPE, FMC, SFC, PC, PDF, CC, CBH)
+    out = np.empty(FINE)
+    CFB = weather.CFB(FUELTYPE, FMC, SFC, CBH, ROS, out=out)
+    assert CFB is out
+    FFMC, BUI, WSV = (weather.fine(value) for value in (FFMC, BUI, WSV))
+    expected = fbp(FUELTYPE, FFMC, BUI, WSV, FMC, SFC, PC, PDF, CC, CBH, 2, 60)['CFB']
+    np.testing.assert_array_equal(CFB, expected)
+    assert 0 < np.count_nonzero(CFB) < CFB.size
+
+
+def test_few_fuel_types():
+    """ Grids with a few fuel types, and no mixedwoods, only tabulate those. """
+    (FFMC, BUI, WSV), (_, FMC, SFC, PC, PDF, CC, CBH) = _grids(1)
+    FUELTYPE = np.where(FMC > 100, 'C7', 'D1')
+    weather = CoarseWeather(coarse_index(FINE, COARSE), FFMC, BUI, WSV)
+    out = np.empty(FINE)
+    ROS = weather.ROS(FUELTYPE, FMC, SFC, PC, PDF, CC, CBH, out=out)
+    assert ROS is out
+    BUI, WSV, FFMC = (weather.fine(value) for value in (BUI, WSV, FFMC))
+    np.testing.assert_array_equal(
+        ROS, ROScalc(FUELTYPE, ISIcalc(FFMC, WSV, True), BUI, FMC, SFC, PC, PDF, CC, CBH))
+
+
+def test_scalars():
+    """ Values for every fine cell may be given as scalars. """
+    (FFMC, BUI, WSV), (_, FMC, SFC, _, PDF, CC, CBH) = _grids(2)
+    weather = CoarseWeather(coarse_index(FINE, COARSE), FFMC, BUI, WSV)
+    np.testing.assert_array_equal(weather.ROS('M1', FMC, SFC, 50, PDF, CC, CBH),
+                                  weather.ROS(np.full(FINE, 'M1'), FMC, SFC, np.full(FINE, 50.0),
+                                              PDF, CC, CBH))
+    np.testing.assert_array_equal(weather.BE('C2'), weather.BE(np.full(FINE, 'C2')))
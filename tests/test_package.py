@@ -0,0 +1,66 @@
+"""
+Test the package namespace, and the time it takes to import.
+"""
+import importlib
+import importlib.util
+import subprocess
+import sys
+import pytest
+import pycffdrs
+
+# Most time `import pycffdrs` may take (seconds), with none of its modules imported yet. It
+# needs only the standard library: importing NumPy alone takes about 0.2 s.
+IMPORT_BUDGET = 0.05
+
+EXPORTS = sorted(pycffdrs._EXPORTS.items())  # pylint: disable=protected-access
+
+
+def _import_time() -> float:
+    """ Cumulative time (seconds) of `import pycffdrs`, as reported by -X importtime. """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import pycffdrs'],
+                            capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        _, _, cumulative, name = (field.strip() for field in line.replace(':', '|').split('|'))
+        if name == 'pycffdrs':
+            return int(cumulative) / 1e6
+    raise AssertionError('pycffdrs is not in the import time report')
+
+
+def test_lazy():
+    """ Importing pycffdrs imports none of its modules, nor NumPy. """
+    code = ('import sys, pycffdrs; '
+            'print(sorted(m for m in sys.modules if m.split(".")[0] in ("pycffdrs", "numpy")))')
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            check=True)
+    assert result.stdout.strip() == "['pycffdrs']"
+
+
+def test_import_time():
+    """ Importing pycffdrs stays within its budget (the best of a few tries, as timings on a
+    busy machine vary). """
+    assert min(_import_time() for _ in range(3)) < IMPORT_BUDGET
+
+
+@pytest.mark.parametrize('name, module', EXPORTS)
+def test_exports(name, module):
+    """ Each name is its module's object, even once its module has been imported. """
+    value = getattr(importlib.import_module(f'pycffdrs.{module}'), name)
+    assert getattr(pycffdrs, name) is value
+    assert name in dir(pycffdrs)
+    assert name in pycffdrs.__all__
+
+
+def test_modules():
+    """ Modules are available from the package, including those named after their
+    calculator, and unknown names are not. """
+    # pylint: disable=import-outside-toplevel
+    from pycffdrs import scalar
+    import pycffdrs.ROScalc as ros  # pylint: disable=consider-using-from-import
+    assert pycffdrs.scalar is scalar is sys.modules['pycffdrs.scalar']
+    assert pycffdrs.ROScalc is ros is sys.modules['pycffdrs.ROScalc']
+    assert pycffdrs.ROScalc.RSIcalc is pycffdrs.RSIcalc
+    # No exported name hides a module
+    assert not any(importlib.util.find_spec(f'pycffdrs.{name}') for name, _ in EXPORTS)
+    with pytest.raises(AttributeError):
+        pycffdrs.ROSthetacalc  # pylint: disable=pointless-statement
+    assert not hasattr(pycffdrs, '__wrapped__')
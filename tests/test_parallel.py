@@ -0,0 +1,55 @@
+""" Tests for splitting calculator calls across workers. """
+import numpy as np
+import pytest
+from pycffdrs.ROScalc import ROScalc
+from pycffdrs.fbp import fbp
+from pycffdrs.ffmcCalc import ffmcCalc
+from pycffdrs.fueltypes import FUELTYPES
+from pycffdrs.parallel import BACKENDS, Executor
+from pycffdrs.workspace import Workspace
+from tests.conftest import random_fbp_inputs
+
+N = 1000
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_executor(backend):
+    """ Results are bit-identical to calling the calculators directly. """
+    rng = np.random.default_rng(0)
+    inputs = random_fbp_inputs(N)
+    fuel = np.array(FUELTYPES)[inputs['FUELTYPE']]
+    ffmc_args = (rng.uniform(0, 101, N), rng.uniform(-20, 40, N), rng.uniform(0, 100, N),
+                 rng.uniform(0, 60, N), np.where(rng.random(N) < 0.5, 0, rng.uniform(0, 30, N)))
+    ros_args = (fuel, *(inputs[name] for name in
+                        ('ISI', 'BUI', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH')))
+    # Scalars and lists are passed to, or split between, the workers as well as arrays
+    fbp_args = (list(fuel), inputs['FFMC'], inputs['BUI'], inputs['WSV'], 100, inputs['SFC'],
+                50, 50, 80, 7, inputs['LB'], inputs['HR'])
+    with Executor(workers=2, backend=backend, chunk_size=300) as executor:
+        assert np.array_equal(executor.run(ffmcCalc, *ffmc_args), ffmcCalc(*ffmc_args))
+        assert np.array_equal(executor.run(ROScalc, *ros_args), ROScalc(*ros_args))
+        result = executor.run(fbp, *fbp_args, fbpMod=False)
+        expected = fbp(*fbp_args, fbpMod=False)
+        assert set(result) == set(expected)
+        for name, value in expected.items():
+            assert np.array_equal(result[name], value, equal_nan=True), name
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_workspace(backend):
+    """ A workspace argument is not shared between concurrent chunks. """
+    inputs = random_fbp_inputs(50 * N, seed=1)
+    ros_args = (inputs['FUELTYPE'], inputs['ISI'], inputs['BUI'], 100, 2, inputs['PC'], 50, 80,
+                7)
+    expected = ROScalc(*ros_args)
+    workspace = Workspace()
+    with Executor(workers=4, backend=backend, chunk_size=2000) as executor:
+        for _ in range(3):
+            assert np.array_equal(executor.run(ROScalc, *ros_args, workspace=workspace),
+                                  expected)
+
+
+def test_backend():
+    """ Unknown backends are rejected. """
+    with pytest.raises(ValueError):
+        Executor(backend='cluster')
@@ -0,0 +1,100 @@
+"""
+Test grouping of grid elements by fuel type.
+"""
+import numpy as np
+import pytest
+from pycffdrs.BEcalc import BEcalc
+from pycffdrs.BROScalc import BROScalc
+from pycffdrs.C6calc import C6calc
+from pycffdrs.DISTtcalc import DISTtcalc
+from pycffdrs.fueltypes import FuelType
+from pycffdrs.partition import FuelPartition
+from pycffdrs.ROScalc import ROScalc
+from pycffdrs.workspace import Workspace
+from tests.conftest import random_fbp_inputs
+
+SHAPE = (30, 40)
+
+
+def _grid(seed: int = 0):
+    grid = random_fbp_inputs(SHAPE, seed)
+    return grid.pop('FUELTYPE'), grid
+
+
+def test_partition():
+    """ Elements are grouped by fuel type, stably; scatter undoes gather. """
+    FUELTYPE = np.array([['D1', 'C2', 'D1'], ['O1B', 'O1A', 'C2']])
+    partition = FuelPartition(FUELTYPE)
+    np.testing.assert_array_equal(partition.order, [1, 5, 0, 2, 4, 3])
+    np.testing.assert_array_equal(partition.FUELTYPE, [1, 1, 7, 7, 15, 16])
+    assert partition.fuels() == (FuelType.C2, FuelType.D1, FuelType.O1A, FuelType.O1B)
+    assert partition.group(FuelType.D1) == slice(2, 4)
+    assert partition.group(FuelType.O1A, FuelType.O1B) == slice(4, 6)
+    assert partition.group(FuelType.C6) == slice(2, 2)
+    with pytest.raises(ValueError):
+        partition.group(FuelType.C2, FuelType.D1)
+    values = np.arange(6.0).reshape(2, 3)
+    gathered, scalar = partition.gather(values, 3.0)
+    np.testing.assert_array_equal(gathered, [1, 5, 0, 2, 4, 3])
+    assert scalar == 3.0
+    np.testing.assert_array_equal(partition.scatter(gathered), values)
+    np.testing.assert_array_equal(partition.gather(np.arange(3.0)), [1, 2, 0, 2, 1, 0])
+
+
+def test_calculators():
+    """ The calculators give identical results by fuel type, for a shared partition and
+    workspace. """
+    FUELTYPE, grid = _grid()
+    partition = FuelPartition(FUELTYPE)
+    g = dict(zip(grid, partition.gather(*grid.values())))
+    fuels = partition.FUELTYPE
+    workspace = Workspace()
+    calls = (
+        (BEcalc, ('BUI',), {}),
+        (ROScalc, ('ISI', 'BUI', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH'), {}),
+        (ROScalc, ('ISI', 'BUI', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH'), {'approx': True}),
+        (BROScalc, ('FFMC', 'BUI', 'WSV', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH'), {}),
+        (C6calc, ('ISI', 'BUI', 'FMC', 'SFC', 'CBH'), {'option': 'ROS'}),
+        (DISTtcalc, ('ISI', 'BUI', 'CFB'), {}),
+    )
+    for function, names, kwargs in calls:
+        expected = function(FUELTYPE, *(grid[name] for name in names), **kwargs)
+        result = function(fuels, *(g[name] for name in names), workspace=workspace,
+                          partition=partition, **kwargs)
+        np.testing.assert_array_equal(partition.scatter(result), expected)
+    # Scalars are broadcast to every element
+    np.testing.assert_array_equal(
+        partition.scatter(DISTtcalc(fuels, g['ISI'], 60, g['CFB'], partition=partition)),
+        DISTtcalc(FUELTYPE, grid['ISI'], 60, grid['CFB']))
+
+
+def test_grid_order():
+    """ Given a partition, inputs in grid order or shape are rejected, rather than giving
+    wrong results. """
+    FUELTYPE, grid = _grid(1)
+    partition = FuelPartition(FUELTYPE)
+    g = dict(zip(grid, partition.gather(*grid.values())))
+    fuels = partition.FUELTYPE
+    # FUELTYPE gathered again, rather than partition.FUELTYPE itself, is in partition order
+    np.testing.assert_array_equal(
+        BEcalc(partition.gather(FUELTYPE), g['BUI'], partition=partition),
+        BEcalc(fuels, g['BUI'], partition=partition))
+    for fuel, values in ((FUELTYPE, g), (FUELTYPE.ravel(), g), (fuels, grid)):
+        with pytest.raises(ValueError):
+            BEcalc(fuel, values['BUI'], partition=partition)
+        with pytest.raises(ValueError):
+            ROScalc(fuel, *(values[name] for name in
+                            ('ISI', 'BUI', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH')),
+                    partition=partition)
+        with pytest.raises(ValueError):
+            BROScalc(fuel, *(values[name] for name in
+                             ('FFMC', 'BUI', 'WSV', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH')),
+                     partition=partition)
+        with pytest.raises(ValueError):
+            C6calc(fuel, *(values[name] for name in ('ISI', 'BUI', 'FMC', 'SFC', 'CBH')),
+                   option='ROS', partition=partition)
+        with pytest.raises(ValueError):
+            DISTtcalc(fuel, values['ISI'], 60, values['CFB'], partition=partition)
+    # One input in grid shape is enough
+    with pytest.raises(ValueError):
+        DISTtcalc(fuels, g['ISI'], 60, grid['CFB'], partition=partition)
@@ -0,0 +1,111 @@
+"""
+Test elliptical fire perimeters.
+"""
+import numpy as np
+import pytest
+from pycffdrs.BROScalc import BROScalc
+from pycffdrs.DISTtcalc import DISTtcalc
+from pycffdrs.FROScalc import FROScalc
+from pycffdrs.perimeter import perimeter_chunks, perimeters
+from pycffdrs.ROScalc import ROScalc
+from pycffdrs.workspace import Workspace
+
+COUNT = 500
+
+
+def _ignitions(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X, Y = rng.uniform(0, 1e5, (2, COUNT))
+    RAZ = rng.uniform(0, 360, COUNT)
+    ROS = rng.uniform(0.1, 50, COUNT)
+    BROS = ROS * rng.uniform(0, 0.3, COUNT)
+    FROS = FROScalc(ROS, BROS, rng.uniform(1, 8, COUNT))
+    return X, Y, RAZ, ROS, BROS, FROS
+
+
+def test_ellipse():
+    """ Perimeters start at the head fire, and run counterclockwise around the ignition. """
+    np.testing.assert_allclose(perimeters(0, 0, 0, 10, 2, 3, 10, vertices=4),
+                               [[0, 100], [-30, 40], [0, -20], [30, 40]], atol=1e-12)
+    np.testing.assert_allclose(perimeters(100, 50, 90, 10, 2, 3, 10, vertices=4),
+                               [[200, 50], [140, 80], [80, 50], [140, 20]], atol=1e-12)
+
+
+def test_perimeters():  # pylint: disable=too-many-locals
+    """ Every vertex is on its ignition's ellipse, whose head and back are DH and DB from the
+    ignition. """
+    X, Y, RAZ, ROS, BROS, FROS = _ignitions()
+    HR = 60
+    vertices = perimeters(X, Y, RAZ, ROS, BROS, FROS, HR)
+    assert vertices.shape == (COUNT, 64, 2)
+    # The vertices, in each ellipse's frame: along and across its head direction
+    x, y = vertices[..., 0] - X[:, None], vertices[..., 1] - Y[:, None]
+    sin, cos = np.sin(np.radians(RAZ))[:, None], np.cos(np.radians(RAZ))[:, None]
+    along, across = x * sin + y * cos, y * sin - x * cos
+    DH, DB, DF = (rate[:, None] * HR for rate in (ROS, BROS, FROS))
+    np.testing.assert_allclose(((along - (DH - DB) / 2) / ((DH + DB) / 2)) ** 2 +
+                               (across / DF) ** 2, 1, rtol=1e-9)
+    np.testing.assert_allclose(along[:, 0], DH[:, 0], rtol=1e-9)
+    np.testing.assert_allclose(along[:, 32], -DB[:, 0], rtol=1e-9, atol=1e-9)
+    # Counterclockwise: positive (shoelace) area
+    area = np.sum(x * np.roll(y, -1, axis=1) - np.roll(x, -1, axis=1) * y, axis=1) / 2
+    assert np.all(area > 0)
+
+
+def test_acceleration():  # pylint: disable=too-many-locals
+    """ With fuel types and crown fraction burned, spread distances are as DISTtcalc. """
+    FUELTYPE = np.array(['C2', 'C6', 'D1', 'O1A'])
+    ISI, BUI, FMC, SFC, PC, PDF, CC, CBH = 10, 60, 100, 2, 50, 50, 80, 3
+    ROS = ROScalc(FUELTYPE, ISI, BUI, FMC, SFC, PC, PDF, CC, CBH)
+    BROS = BROScalc(FUELTYPE, 90, BUI, 20, FMC, SFC, PC, PDF, CC, CBH)
+    FROS = FROScalc(ROS, BROS, 2)
+    CFB = np.array([0.5, 0.8, 0, 0])
+    vertices = perimeters(0, 0, 0, ROS, BROS, FROS, 30, FUELTYPE, CFB)
+    np.testing.assert_allclose(vertices[:, 0, 1], DISTtcalc(FUELTYPE, ROS, 30, CFB))
+    np.testing.assert_allclose(vertices[:, 32, 1], -DISTtcalc(FUELTYPE, BROS, 30, CFB),
+                               atol=1e-12)
+    # Fuel types and crown fraction burned for all ignitions
+    np.testing.assert_array_equal(perimeters(0, 0, 0, ROS[:2], BROS[:2], FROS[:2], 30,
+                                             'C2', 0.5),
+                                  perimeters(0, 0, 0, ROS[:2], BROS[:2], FROS[:2], 30,
+                                             ['C2', 'C2'], [0.5, 0.5]))
+    vertices = perimeters(0, 0, 45, 10, 1, 2, 60, FUELTYPE, 0.5)
+    assert vertices.shape == (4, 64, 2)
+    for fuel, crown in ((FUELTYPE, None), (None, CFB)):
+        with pytest.raises(ValueError):
+            perimeters(0, 0, 45, 10, 1, 2, 60, fuel, crown)
+        with pytest.raises(ValueError):
+            next(perimeter_chunks(0, 0, 45, 10, 1, 2, 60, fuel, crown))
+
+
+def test_chunks():
+    """ Streamed perimeters are the perimeters of each chunk of ignitions, in order. """
+    X, Y, RAZ, ROS, BROS, FROS = (value.reshape(20, 25) for value in _ignitions(1))
+    FUELTYPE = np.where(X > 5e4, 'C2', 'M1')
+    CFB = np.linspace(0, 1, COUNT).reshape(20, 25)
+    expected = perimeters(X, Y, RAZ, ROS, BROS, FROS, 45, FUELTYPE, CFB, vertices=16)
+    assert expected.shape == (20, 25, 16, 2)
+    chunks = list(perimeter_chunks(X, Y, RAZ, ROS, BROS, FROS, 45, FUELTYPE, CFB, vertices=16,
+                                   chunk_size=96))
+    assert [chunk for chunk, _ in chunks][-1] == slice(480, 500)
+    streamed = np.concatenate([vertices.copy() for _, vertices in
+                               perimeter_chunks(X, Y, RAZ, ROS, BROS, FROS, 45, FUELTYPE, CFB,
+                                                vertices=16, chunk_size=96)])
+    np.testing.assert_array_equal(streamed, expected.reshape(COUNT, 16, 2))
+    with pytest.raises(ValueError):
+        next(perimeter_chunks(X, Y, RAZ, ROS, BROS, FROS, 45, chunk_size=0))
+
+
+def test_out():
+    """ Results can be written to out, reusing a workspace, in float32. """
+    ignitions = _ignitions(2)
+    workspace = Workspace()
+    out = np.empty((COUNT, 8, 2), dtype=np.float32)
+    for HR in (10, 20):
+        result = perimeters(*ignitions, HR, vertices=8, out=out, workspace=workspace,
+                            dtype=np.float32)
+        assert result is out
+        np.testing.assert_allclose(result, perimeters(*ignitions, HR, vertices=8),
+                                   rtol=1e-6, atol=0.05)
+    with pytest.raises(ValueError):
+        perimeters(*ignitions, 10, vertices=4, out=out, dtype=np.float32)
@@ -4,6 +4,7 @@ Test pycffdrs by comparing it to output from the R cffdrs package.
 import json
 from typing import List, Dict
 import numpy as np
+import pytest
 from pycffdrs import __version__
 from pycffdrs.fwiCalc import fwiCalc
 from pycffdrs.buiCalc import buiCalc
@@ -18,6 +19,10 @@ from pycffdrs.ffmcCalc import ffmcCalc
 from pycffdrs.FIcalc import FIcalc
 from pycffdrs.FMCcalc import FMCcalc
 from pycffdrs.FROScalc import FROScalc
+from pycffdrs.TFCcalc import TFCcalc
+from pycffdrs.fbp import fbp
+from pycffdrs.fueltypes import FuelType, FUELTYPES, FUEL_PARAMETERS, fuel_codes
+from pycffdrs.partition import FuelPartition
 
 
 def generic_test(filename, function):
@@ -39,6 +44,13 @@ def generic_test(filename, function):
             np.testing.assert_almost_equal(python_result, r_result, 13)
 
 
+def fuel_coded(function):
+    """ Wrap a function, so that it's FUELTYPE argument is passed as FuelType codes. """
+    def wrapper(FUELTYPE, *args):
+        return function(fuel_codes(FUELTYPE), *args)
+    return wrapper
+
+
 def test_BEcalc():
     """ Test BEcalc by comparing output from R with that of Python.
     """
@@ -63,6 +75,17 @@ def test_ISIcalc():
     generic_test('tests/ISIcalc.json', ISIcalc)
 
 
+def test_fbpMod():
+    """ As in R (fbpMod == TRUE), only fbpMod values equal to True apply the fbp
+    modification. """
+    ws = np.array([50.0, 50, 50, 50])
+    expected = np.where([True, True, False, False], ISIcalc(90, ws, True, backend='numpy'),
+                        ISIcalc(90, ws, False, backend='numpy'))
+    np.testing.assert_array_equal(
+        ISIcalc(90, ws, np.array([True, 1, 2, 0]), backend='numpy'), expected)
+    assert ISIcalc(90, 50, 2, backend='numpy') == ISIcalc(90, 50, False, backend='numpy')
+
+
 def test_CFBCalc():
     """ Test CFBcalc by comparing output from R with that of Python.
     """
@@ -108,3 +131,116 @@ def test_FMCcalc():
 def test_FROScalc():
     """ Test FROScalc by comparing output from R with that of Python """
     generic_test('tests/FROScalc.json', FROScalc)
+
+
+def test_fuel_codes():
+    """ Test converting fuel type strings to FuelType codes and back. """
+    codes = fuel_codes(np.array(["C1", "O1B", "M3", "C1", "S2"]))
+    assert codes.dtype == np.uint8
+    np.testing.assert_array_equal(
+        codes, (FuelType.C1, FuelType.O1B, FuelType.M3, FuelType.C1, FuelType.S2))
+    np.testing.assert_array_equal(np.array(FUELTYPES)[fuel_codes(np.array(FUELTYPES))],
+                                  FUELTYPES)
+    assert fuel_codes(codes) is codes
+    with pytest.raises(KeyError):
+        fuel_codes(np.array(["C1", "O1"]))
+    with pytest.raises(KeyError):
+        fuel_codes(np.array([0, len(FuelType)]))
+
+
+def test_fuel_parameters():
+    """ Test the fuel parameter table is read-only and indexed by FuelType code. """
+    assert not FUEL_PARAMETERS.flags.writeable
+    with pytest.raises(ValueError):
+        FUEL_PARAMETERS['a'][FuelType.C1] = 0
+    assert FUEL_PARAMETERS['BUIo'][FuelType.C7] == 106
+    np.testing.assert_array_equal(FUEL_PARAMETERS['Q50log'], 50 * np.log(FUEL_PARAMETERS['Q']))
+
+
+def test_fuel_coded_functions():
+    """ Test FBP functions with FuelType codes by comparing output from R with that of Python. """
+    generic_test('tests/BEcalc.json', fuel_coded(BEcalc))
+    generic_test('tests/ROScalc.json', fuel_coded(ROScalc))
+    generic_test('tests/C6calc.json', fuel_coded(C6calc))
+    generic_test('tests/BROScalc.json', fuel_coded(BROScalc))
+    generic_test('tests/DISTtcalc.json', fuel_coded(DISTtcalc))
+
+
+def test_fbp():  # pylint: disable=too-many-locals
+    """ Test fbp against the R output for BROScalc, and against chaining the individual
+    functions (each of which is tested against R output). """
+    with open('tests/BROScalc.json', 'rb') as f:
+        data: List[Dict[str, List]] = json.load(f)
+    for record in data:
+        inputs = {key: np.array(value) for key, value in record.get("input").items()}
+        LB = np.linspace(1, 8, len(inputs['FFMC']))
+        HR = np.linspace(0, 120, len(inputs['FFMC']))
+        result = fbp(**inputs, LB=LB, HR=HR)
+        np.testing.assert_almost_equal(result['BROS'], record.get("result"), 13)
+
+        FUELTYPE, FFMC, BUI, WSV, FMC, SFC, PC, PDF, CC, CBH = inputs.values()
+        ISI = ISIcalc(FFMC, WSV, True)
+        ROS = ROScalc(FUELTYPE, ISI, BUI, FMC, SFC, PC, PDF, CC, CBH)
+        CFL = FUEL_PARAMETERS['CFL'][fuel_codes(FUELTYPE)]
+        CFB = np.where(FUELTYPE == "C6",
+                       C6calc(FUELTYPE, ISI, BUI, FMC, SFC, CBH, option="CFB"),
+                       np.where(CFL > 0, CFBcalc(FUELTYPE, FMC, SFC, ROS, CBH), 0))
+        FROS = FROScalc(ROS, result['BROS'], LB)
+        np.testing.assert_array_equal(result['ISI'], ISI)
+        np.testing.assert_array_equal(result['ROS'], ROS)
+        np.testing.assert_array_equal(result['CFB'], CFB)
+        np.testing.assert_array_equal(
+            result['HFI'], FIcalc(TFCcalc(FUELTYPE, CFL, CFB, SFC, PC, PDF), ROS))
+        np.testing.assert_array_equal(result['FROS'], FROS)
+        np.testing.assert_array_equal(result['DH'], DISTtcalc(FUELTYPE, ROS, HR, CFB))
+        np.testing.assert_array_equal(result['DB'], DISTtcalc(FUELTYPE, result['BROS'], HR, CFB))
+        np.testing.assert_array_equal(result['DF'], DISTtcalc(FUELTYPE, FROS, HR, CFB))
+
+
+@pytest.mark.parametrize('filename, function', (
+    ('tests/ffmcCalc.json', ffmcCalc),
+    ('tests/buiCalc.json', buiCalc),
+    ('tests/FMCcalc.json', FMCcalc),
+    ('tests/CFBcalc.json', CFBcalc),
+    ('tests/C6calc.json', C6calc)))
+def test_no_floating_point_warnings(filename, function):
+    """ Branches are only evaluated where they apply, so valid input gives no floating point
+    warnings (underflow to 0 is not a concern). """
+    with open(filename, 'rb') as f:
+        data: List[Dict[str, List]] = json.load(f)
+    with np.errstate(divide='raise', over='raise', invalid='raise'):
+        for record in data:
+            function(*(np.array(value) for value in record.get("input").values()
+                       if value is not None))
+        # Dry days, and days with no DMC and DC, have branches that are undefined
+        ffmcCalc(np.array([85.0, 0, 101]), 20, 40, 10, 0)
+        buiCalc(np.array([0.0, 0, 10]), np.array([0.0, 10, 0]))
+        # BUI = 0, and fuel types without a Buildup Effect, have Buildup Effect branches that
+        # are undefined, also for C6 and by fuel type
+        for option in ('ROS', 'CFB'):
+            C6calc(np.array(['C6', 'C2', 'O1A']), 10, np.array([0.0, 0, 50]), 100, 2, 5,
+                   option=option)
+        partition = FuelPartition(np.array(['C6', 'D1', 'O1A', 'C2']))
+        BEcalc(partition.FUELTYPE, np.array([0.0, 0, 50, 0]), partition=partition)
+
+
+@pytest.mark.parametrize('filename, function', (
+    ('tests/ffmcCalc.json', ffmcCalc),
+    ('tests/buiCalc.json', buiCalc),
+    ('tests/ISIcalc.json', ISIcalc),
+    ('tests/fwiCalc.json', fwiCalc),
+    ('tests/ROScalc.json', ROScalc),
+    ('tests/CFBcalc.json', CFBcalc),
+    ('tests/C6calc.json', C6calc)))
+def test_float32(filename, function):
+    """ In float32, results stay float32 and are within 1e-4 + 2e-5 * |R| of the R output (see
+    README.md for the measured deviations). """
+    with open(filename, 'rb') as f:
+        data: List[Dict[str, List]] = json.load(f)
+    for record in data:
+        values = [np.array(value) for value in record.get("input").values() if value is not None]
+        r_result = np.array([np.float64(x) for x in record.get("result")])
+        with np.errstate(all='ignore'):
+            python_result = function(*values, dtype=np.float32)
+        assert python_result.dtype == np.float32
+        np.testing.assert_allclose(python_result, r_result, rtol=2e-5, atol=1e-4)
@@ -0,0 +1,84 @@
+""" Tests for tiled processing of memory-mapped grids. """
+import numpy as np
+import pytest
+from pycffdrs.dailyfwi import OUTPUTS as FWI_OUTPUTS
+from pycffdrs.dcCalc import dcCalc
+from pycffdrs.dmcCalc import dmcCalc
+from pycffdrs.fbp import OUTPUTS as FBP_OUTPUTS, fbp
+from pycffdrs.ffmcCalc import ffmcCalc
+from pycffdrs.fueltypes import FUELTYPES
+from pycffdrs.ISIcalc import ISIcalc
+from pycffdrs.buiCalc import buiCalc
+from pycffdrs.fwiCalc import fwiCalc
+from pycffdrs.raster import create_grid, fbp_grid, fwi_grid, open_grid
+
+SHAPE = (13, 17)
+
+
+def _save(tmp_path, grids):
+    """ Save grids as .npy files, and open them memory-mapped. """
+    for name, grid in grids.items():
+        np.save(tmp_path / f'{name}.npy', grid)
+    return {name: open_grid(tmp_path / f'{name}.npy') for name in grids}
+
+
+def test_fwi_grid(tmp_path):
+    """ A tiled grid gives the same results as calculating all cells at once. """
+    rng = np.random.default_rng(0)
+    weather = {
+        'ffmc_yda': rng.uniform(0, 101, SHAPE),
+        'dmc_yda': rng.uniform(0, 200, SHAPE),
+        'dc_yda': rng.uniform(0, 800, SHAPE),
+        'temp': rng.uniform(-10, 40, SHAPE),
+        'rh': rng.uniform(0, 100, SHAPE),
+        'ws': rng.uniform(0, 60, SHAPE),
+        'prec': np.where(rng.random(SHAPE) < 0.5, 0, rng.uniform(0, 30, SHAPE)),
+        'lat': rng.uniform(-90, 90, SHAPE),
+    }
+    inputs = {**_save(tmp_path, weather), 'mon': 7}
+    outputs = {name: create_grid(tmp_path / f'{name}_out.npy', SHAPE) for name in FWI_OUTPUTS}
+    fwi_grid(inputs, outputs, tile_size=10)
+
+    ffmc = ffmcCalc(*(weather[name] for name in ('ffmc_yda', 'temp', 'rh', 'ws', 'prec')))
+    dmc = dmcCalc(*(weather[name] for name in ('dmc_yda', 'temp', 'rh', 'prec', 'lat')), 7)
+    dc = dcCalc(*(weather[name] for name in ('dc_yda', 'temp', 'rh', 'prec', 'lat')), 7)
+    isi = ISIcalc(ffmc, weather['ws'])
+    bui = buiCalc(dmc, dc)
+    expected = dict(zip(FWI_OUTPUTS, (ffmc, dmc, dc, isi, bui, fwiCalc(isi, bui))))
+    for name in FWI_OUTPUTS:
+        np.testing.assert_array_equal(open_grid(tmp_path / f'{name}_out.npy'), expected[name])
+
+
+def test_fbp_grid(tmp_path):
+    """ fbp over raw binary grids, writing only some of the outputs. """
+    rng = np.random.default_rng(1)
+    grids = {
+        'FUELTYPE': rng.integers(0, len(FUELTYPES), SHAPE).astype(np.uint8),
+        'FFMC': rng.uniform(0, 101, SHAPE),
+        'BUI': rng.uniform(0, 200, SHAPE),
+        'WSV': rng.uniform(0, 60, SHAPE),
+        'SFC': rng.uniform(0.1, 5, SHAPE),
+        'CBH': rng.uniform(1, 10, SHAPE),
+    }
+    for name, grid in grids.items():
+        grid.tofile(tmp_path / f'{name}.raw')
+    inputs = {name: open_grid(tmp_path / f'{name}.raw', SHAPE, grid.dtype)
+              for name, grid in grids.items()}
+    inputs.update(FMC=100.0, PC=50.0, PDF=35.0, CC=80.0, LB=2.0, HR=60.0)
+    outputs = {name: create_grid(tmp_path / f'{name}.raw', SHAPE) for name in ('ROS', 'HFI')}
+    fbp_grid(inputs, outputs, tile_size=32)
+
+    expected = fbp(*(np.broadcast_to(inputs[name], SHAPE).ravel() for name in
+                     ('FUELTYPE', 'FFMC', 'BUI', 'WSV', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH',
+                      'LB', 'HR')))
+    assert set(outputs) < set(FBP_OUTPUTS)
+    for name, grid in outputs.items():
+        np.testing.assert_array_equal(grid.ravel(), expected[name])
+
+
+def test_grid_shape(tmp_path):
+    """ All grids must have the same shape. """
+    with pytest.raises(ValueError):
+        fwi_grid({'ffmc_yda': np.zeros((2, 2)), 'dmc_yda': 6, 'dc_yda': 15, 'temp': 20,
+                  'rh': 40, 'ws': 10, 'prec': 0, 'lat': 50, 'mon': 7},
+                 {'FWI': create_grid(tmp_path / 'FWI.npy', SHAPE)})
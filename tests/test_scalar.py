@@ -0,0 +1,102 @@
+"""
+Test the scalar fast path against the vectorized calculators.
+"""
+import math
+import time
+import numpy as np
+import pytest
+from pycffdrs import scalar
+from pycffdrs.BEcalc import BEcalc
+from pycffdrs.BROScalc import BROScalc
+from pycffdrs.CFBcalc import CFBcalc
+from pycffdrs.fbp import OUTPUTS, fbp
+from pycffdrs.fueltypes import FUELTYPES
+from pycffdrs.ISIcalc import ISIcalc
+from pycffdrs.ROScalc import ROScalc, RSIcalc
+
+SIZE = 400
+
+
+def _exact() -> bool:
+    """ Whether NumPy's exp and pow are the C library's (as math's are) on this machine. """
+    x = np.linspace(-20, 5, 1001)
+    return (np.array_equal(np.exp(x), [math.exp(value) for value in x]) and
+            np.array_equal(np.power(x + 21, 5.31), [(value + 21) ** 5.31 for value in x]))
+
+
+def _assert_matches(actual, expected):
+    """ Identical where NumPy uses the C library's exp and pow, else within a few ulp. """
+    if _exact():
+        np.testing.assert_array_equal(actual, expected)
+    else:
+        np.testing.assert_allclose(actual, expected, rtol=1e-12, atol=1e-12)
+
+
+@pytest.fixture(name='inputs')
+def fixture_inputs(fbp_inputs):
+    """ Random FBP inputs, covering every fuel type, crowning and the fbp modification. """
+    return fbp_inputs(SIZE)
+
+
+def _points(inputs, names):
+    """ The inputs of each point, as Python numbers. """
+    return zip(*(inputs[name].tolist() for name in names))
+
+
+def test_isi(inputs):
+    """ Test the Initial Spread Index, with and without the fbp modification. """
+    for fbpMod in (False, True):
+        _assert_matches([scalar.isi(*point, fbpMod) for point in
+                         _points(inputs, ('FFMC', 'WSV'))],
+                        ISIcalc(inputs['FFMC'], inputs['WSV'], fbpMod))
+
+
+def test_be_rsi_cfb(inputs):
+    """ Test the Buildup Effect, Initial Rate of Spread and Crown Fraction Burned. """
+    _assert_matches([scalar.be(*point) for point in _points(inputs, ('FUELTYPE', 'BUI'))],
+                    BEcalc(inputs['FUELTYPE'], inputs['BUI']))
+    names = ('FUELTYPE', 'ISI', 'PC', 'PDF', 'CC')
+    _assert_matches([scalar.rsi(*point) for point in _points(inputs, names)],
+                    RSIcalc(*(inputs[name] for name in names)))
+    names = ('FMC', 'SFC', 'ISI', 'CBH')
+    _assert_matches([scalar.cfb(*point) for point in _points(inputs, names)],
+                    CFBcalc(inputs['FUELTYPE'], *(inputs[name] for name in names)))
+
+
+def test_ros_bros(inputs):
+    """ Test the head and back fire rates of spread, with fuel types as strings too. """
+    names = ('FUELTYPE', 'ISI', 'BUI', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH')
+    expected = ROScalc(*(inputs[name] for name in names))
+    _assert_matches([scalar.ros(*point) for point in _points(inputs, names)], expected)
+    _assert_matches([scalar.ros(FUELTYPES[point[0]], *point[1:]) for point in
+                     _points(inputs, names)], expected)
+    names = ('FUELTYPE', 'FFMC', 'BUI', 'WSV', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH')
+    _assert_matches([scalar.bros(*point) for point in _points(inputs, names)],
+                    BROScalc(*(inputs[name] for name in names)))
+
+
+def test_fbp(inputs):
+    """ Test every fbp output. """
+    names = ('FUELTYPE', 'FFMC', 'BUI', 'WSV', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH', 'LB',
+             'HR')
+    expected = fbp(*(inputs[name] for name in names))
+    results = [scalar.fbp(*point) for point in _points(inputs, names)]
+    for name in OUTPUTS:
+        _assert_matches([result[name] for result in results], expected[name])
+
+
+def test_fuel_code():
+    """ Test fuel types given as names and codes, and unknown fuel types. """
+    assert scalar.fuel_code('O1A') == scalar.fuel_code(15) == 15
+    with pytest.raises(KeyError):
+        scalar.fuel_code('X1')
+    with pytest.raises(KeyError):
+        scalar.fuel_code(len(FUELTYPES))
+
+
+def test_latency():
+    """ A single point takes microseconds, rather than the tens of microseconds of NumPy. """
+    start = time.perf_counter()
+    for _ in range(1000):
+        scalar.ros('C2', 10, 50, 100, 2, 0, 0, 0, 3)
+    assert (time.perf_counter() - start) / 1000 < 50e-6
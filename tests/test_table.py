@@ -0,0 +1,115 @@
+""" Tests for the pandas / Arrow table interface. """
+import numpy as np
+import pytest
+from pycffdrs.fbp import OUTPUTS as FBP_OUTPUTS, fbp
+from pycffdrs.ffmcCalc import ffmcCalc
+from pycffdrs.fueltypes import FUELTYPES, fuel_codes
+from pycffdrs.ROScalc import ROScalc
+from pycffdrs import table
+
+SIZE = 200
+
+
+def _weather():
+    rng = np.random.default_rng(0)
+    return {
+        'ffmc_yda': rng.uniform(0, 101, SIZE),
+        'temp': rng.uniform(-10, 40, SIZE),
+        'rh': rng.uniform(0, 100, SIZE),
+        'ws': rng.uniform(0, 60, SIZE),
+        'prec': np.where(rng.random(SIZE) < 0.5, 0, rng.uniform(0, 30, SIZE)),
+    }
+
+
+STAND_NAMES = ('FUELTYPE', 'ISI', 'BUI', 'FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH')
+
+
+@pytest.fixture(name='stands')
+def fixture_stands(fbp_inputs):
+    """ Random ROScalc inputs, with fuel types as strings. """
+    stands = {name: value for name, value in fbp_inputs(SIZE, seed=1).items()
+              if name in STAND_NAMES}
+    stands['FUELTYPE'] = np.array(FUELTYPES)[stands['FUELTYPE']]
+    return stands
+
+
+def _ros(stands):
+    return ROScalc(*(stands[name] for name in STAND_NAMES))
+
+
+def test_mapping():
+    """ Plain mappings of arrays work as tables, and columns can be renamed. """
+    weather = _weather()
+    result = table.apply(ffmcCalc, weather, 'FFMC')
+    np.testing.assert_array_equal(result['FFMC'], ffmcCalc(*weather.values()))
+    assert 'FFMC' not in weather
+    renamed = {('yesterday' if name == 'ffmc_yda' else name): value
+               for name, value in weather.items()}
+    result = table.apply(ffmcCalc, renamed, columns={'ffmc_yda': 'yesterday'})
+    np.testing.assert_array_equal(result['ffmcCalc'], ffmcCalc(*weather.values()))
+    with pytest.raises(KeyError):
+        table.apply(ffmcCalc, weather, columns={'ffmc_yda': 'missing'})
+
+
+def test_pandas(stands):
+    """ Columns are zero copy views, and categorical fuel types become FuelType codes. """
+    pd = pytest.importorskip('pandas')
+    weather = pd.DataFrame(_weather())
+    assert np.shares_memory(table.column(weather, 'temp'), weather['temp'].to_numpy())
+    result = table.apply(ffmcCalc, weather, 'FFMC')
+    assert list(result.columns) == list(weather.columns) + ['FFMC']
+    np.testing.assert_array_equal(result['FFMC'], ffmcCalc(*_weather().values()))
+
+    expected = _ros(stands)
+    for categories in (FUELTYPES, sorted(FUELTYPES)):
+        frame = pd.DataFrame(stands).astype({'FUELTYPE': pd.CategoricalDtype(categories)})
+        codes = table.column(frame, 'FUELTYPE')
+        np.testing.assert_array_equal(codes, fuel_codes(stands['FUELTYPE']))
+        if categories == FUELTYPES:
+            assert np.shares_memory(codes, frame['FUELTYPE'].cat.codes.to_numpy())
+        np.testing.assert_array_equal(table.apply(ROScalc, frame, 'ROS')['ROS'], expected)
+    frame['FUELTYPE'] = frame['FUELTYPE'].cat.add_categories('X1')
+    frame.loc[0, 'FUELTYPE'] = 'X1'
+    with pytest.raises(KeyError):
+        table.column(frame, 'FUELTYPE')
+
+
+def test_pandas_copy_on_write():
+    """ With copy-on-write, result columns wrap the result arrays. """
+    pd = pytest.importorskip('pandas')
+    with pd.option_context('mode.copy_on_write', True):
+        weather = pd.DataFrame(_weather())
+        FFMC = np.arange(SIZE, dtype=float)
+        result = table.with_columns(weather, {'FFMC': FFMC, 'temp': FFMC})
+        assert np.shares_memory(result['FFMC'].to_numpy(), FFMC)
+        assert np.shares_memory(result['ws'].to_numpy(), weather['ws'].to_numpy())
+        assert np.shares_memory(result['temp'].to_numpy(), FFMC)
+        assert list(result.columns) == list(weather.columns) + ['FFMC']
+
+
+def test_arrow(stands):
+    """ Columns and results are zero copy, and dictionary fuel types become FuelType codes. """
+    pa = pytest.importorskip('pyarrow')
+    weather = pa.table(_weather())
+    temp = table.column(weather, 'temp')
+    assert np.shares_memory(temp, weather.column('temp').chunk(0).to_numpy())
+    result = table.apply(ffmcCalc, weather, 'FFMC')
+    expected = ffmcCalc(*_weather().values())
+    np.testing.assert_array_equal(result.column('FFMC').to_numpy(), expected)
+    batch = table.apply(ffmcCalc, pa.RecordBatch.from_pydict(_weather()), 'FFMC')
+    np.testing.assert_array_equal(batch.column('FFMC').to_numpy(), expected)
+
+    frame = pa.table({**stands, 'FUELTYPE': pa.array(stands['FUELTYPE']).dictionary_encode()})
+    np.testing.assert_array_equal(table.column(frame, 'FUELTYPE'),
+                                  fuel_codes(stands['FUELTYPE']))
+    plain = pa.table({**stands, 'FUELTYPE': pa.array(stands['FUELTYPE'])})
+    np.testing.assert_array_equal(table.column(plain, 'FUELTYPE'),
+                                  fuel_codes(stands['FUELTYPE']))
+    frame = frame.append_column('ffmc', pa.array(stands['ISI'] + 40))
+    result = table.apply(fbp, frame, columns={'FFMC': 'ffmc'}, WSV=20, LB=1.5, HR=1)
+    assert result.column_names == frame.column_names + [
+        name for name in FBP_OUTPUTS if name not in frame.column_names]
+    expected = fbp(stands['FUELTYPE'], stands['ISI'] + 40, stands['BUI'], 20, *(
+        stands[name] for name in ('FMC', 'SFC', 'PC', 'PDF', 'CC', 'CBH')), 1.5, 1)
+    for name in FBP_OUTPUTS:
+        np.testing.assert_array_equal(result.column(name).to_numpy(), expected[name])
@@ -0,0 +1,154 @@
+""" Tests for the out= and workspace= arguments of the calculators. """
+import inspect
+import tracemalloc
+import numpy as np
+import pytest
+from pycffdrs.BEcalc import BEcalc
+from pycffdrs.BROScalc import BROScalc
+from pycffdrs.C6calc import C6calc
+from pycffdrs.CFBcalc import CFBcalc
+from pycffdrs.DISTtcalc import DISTtcalc
+from pycffdrs.FIcalc import FIcalc
+from pycffdrs.FMCcalc import FMCcalc
+from pycffdrs.FROScalc import FROScalc
+from pycffdrs.ISIcalc import ISIcalc, fFcalc, fWcalc
+from pycffdrs.ROScalc import ROScalc
+from pycffdrs.TFCcalc import TFCcalc
+from pycffdrs.buiCalc import buiCalc
+from pycffdrs.dcCalc import dcCalc
+from pycffdrs.dmcCalc import dmcCalc
+from pycffdrs.fbp import OUTPUTS, fbp
+from pycffdrs.ffmcCalc import ffmcCalc
+from pycffdrs.fueltypes import FUELTYPES
+from pycffdrs.fwiCalc import fwiCalc
+from pycffdrs.workspace import Workspace, set_float_dtype
+from tests.conftest import random_fbp_inputs
+
+N = 500
+
+
+def _inputs(seed):  # pylint: disable=too-many-locals
+    """ Random arguments for each calculator. """
+    rng = np.random.default_rng(seed)
+
+    def uniform(low, high):
+        return rng.uniform(low, high, N)
+    fbp_inputs = random_fbp_inputs(N, seed)
+    fuel = np.array(FUELTYPES)[fbp_inputs['FUELTYPE']]
+    FFMC, ISI, BUI, WSV, FMC, SFC, PC, PDF, CC, CBH, LB, HR, CFB = (
+        fbp_inputs[name] for name in ('FFMC', 'ISI', 'BUI', 'WSV', 'FMC', 'SFC', 'PC', 'PDF',
+                                      'CC', 'CBH', 'LB', 'HR', 'CFB'))
+    rain = np.where(rng.random(N) < 0.5, 0, uniform(0, 30))
+    return {
+        ffmcCalc: (uniform(0, 101), uniform(-20, 40), uniform(0, 100), uniform(0, 60), rain),
+        dmcCalc: (uniform(0, 200), uniform(-20, 40), uniform(0, 100), rain, uniform(-90, 90),
+                  rng.integers(1, 13, N)),
+        dcCalc: (uniform(0, 800), uniform(-20, 40), uniform(0, 100), rain, uniform(-90, 90),
+                 rng.integers(1, 13, N)),
+        buiCalc: (uniform(0, 300), uniform(0, 800)),
+        fFcalc: (uniform(0, 101),),
+        fWcalc: (uniform(0, 100), True),
+        ISIcalc: (uniform(0, 101), uniform(0, 100)),
+        fwiCalc: (uniform(0, 100), uniform(0, 300)),
+        FMCcalc: (uniform(40, 60), uniform(-120, -60), uniform(0, 2000), uniform(1, 365),
+                  np.zeros(N)),
+        BEcalc: (fuel, BUI),
+        CFBcalc: (fuel, FMC, SFC, uniform(0, 60), CBH),
+        C6calc: (fuel, ISI, BUI, FMC, SFC, CBH),
+        ROScalc: (fuel, ISI, BUI, FMC, SFC, PC, PDF, CC, CBH),
+        BROScalc: (fuel, FFMC, BUI, WSV, FMC, SFC, PC, PDF, CC, CBH),
+        DISTtcalc: (fuel, uniform(0, 60), HR, CFB),
+        FIcalc: (uniform(0, 5), uniform(0, 60)),
+        FROScalc: (uniform(0, 60), uniform(0, 5), LB),
+        TFCcalc: (fuel, uniform(0, 2), CFB, SFC, PC, PDF),
+    }
+
+
+@pytest.mark.parametrize('function', list(_inputs(0)), ids=lambda function: function.__name__)
+def test_out(function):
+    """ Results written to out, with a reused workspace, match the plain call. """
+    workspace = Workspace()
+    # FIcalc and FROScalc need no scratch arrays, and so take no workspace
+    kwargs = ({'workspace': workspace}
+              if 'workspace' in inspect.signature(function).parameters else {})
+    for seed in range(3):
+        args = _inputs(seed)[function]
+        expected = function(*args)
+        out = np.full(N, np.nan)
+        result = function(*args, out=out, **kwargs)
+        assert result is out
+        assert np.array_equal(out, expected)
+
+
+@pytest.mark.parametrize('function', (ffmcCalc, dmcCalc, dcCalc),
+                         ids=lambda function: function.__name__)
+def test_out_yesterday(function):
+    """ The moisture codes can be updated in place, with out being yesterday's code. """
+    args = _inputs(1)[function]
+    expected = function(*args)
+    yesterday = args[0].copy()
+    result = function(yesterday, *args[1:], out=yesterday)
+    assert result is yesterday
+    assert np.array_equal(yesterday, expected)
+
+
+@pytest.mark.parametrize('function', (ffmcCalc, dmcCalc, dcCalc),
+                         ids=lambda function: function.__name__)
+def test_no_allocation(function):
+    """ With a warm workspace, the moisture codes are updated in place without allocating
+    arrays, on days with and without rain. """
+    size = 100 * N
+    args = [np.resize(arg, size) for arg in _inputs(2)[function]]
+    if function is not ffmcCalc:
+        # A single month for the whole grid, as when updating a grid a day at a time
+        args[-1] = 7
+    yesterday = args[0].copy()
+    workspace = Workspace()
+    function(yesterday, *args[1:], out=yesterday, workspace=workspace)
+    tracemalloc.start()
+    try:
+        function(yesterday, *args[1:], out=yesterday, workspace=workspace)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # Less than any array of the grid (the rest being the call's Python objects)
+    assert peak < size
+
+
+def test_out_shape():
+    """ out must have the shape of the result. """
+    with pytest.raises(ValueError):
+        ffmcCalc(*_inputs(0)[ffmcCalc], out=np.empty(N - 1))
+
+
+def test_fbp_out():
+    """ fbp writes into a dictionary of output arrays, reusing its scratch arrays. """
+    workspace = Workspace()
+    out = {name: np.empty(N) for name in OUTPUTS}
+    for seed in (3, 4):
+        inputs = random_fbp_inputs(N, seed)
+        args = (np.array(FUELTYPES)[inputs['FUELTYPE']], *(
+            inputs[name] for name in ('FFMC', 'BUI', 'WSV', 'FMC', 'SFC', 'PC', 'PDF', 'CC',
+                                      'CBH', 'LB', 'HR')))
+        expected = fbp(*args)
+        result = fbp(*args, out=out, workspace=workspace)
+        for name in OUTPUTS:
+            assert result[name] is out[name]
+            assert np.array_equal(out[name], expected[name]), name
+
+
+def test_float_dtype():
+    """ The package wide floating point type applies when no dtype is given per call. """
+    args = _inputs(0)[ffmcCalc]
+    previous = set_float_dtype(np.float32)
+    try:
+        assert ffmcCalc(*args).dtype == np.float32
+        assert ffmcCalc(*args, dtype=np.float64).dtype == np.float64
+        with pytest.raises(ValueError):
+            # out must have the floating point type being computed in
+            ffmcCalc(*args, out=np.empty(N))
+    finally:
+        set_float_dtype(previous)
+    assert ffmcCalc(*args).dtype == np.float64
+    with pytest.raises(ValueError):
+        set_float_dtype(np.float16)